@@ -0,0 +1,214 @@
+"""Admission control for chat runs.
+
+A chat run holds database sessions and an LLM call for its whole duration, so
+runs are limited per worker and per user. Requests over the limits wait in a
+bounded FIFO queue until a slot frees up or their deadline passes. When the
+queue is full or the deadline passes, the request is rejected with a
+Retry-After estimate, and the client should back off instead of piling up.
+"""
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from config import (
+    CHAT_MAX_CONCURRENT_RUNS,
+    CHAT_MAX_QUEUED,
+    CHAT_MAX_RUNS_PER_USER,
+    CHAT_QUEUE_TIMEOUT_SECONDS,
+)
+
+
+class AdmissionRejected(Exception):
+    """The chat run could not be admitted. Retry after `retry_after` seconds."""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class Admission:
+    """A slot held by one chat run. Release it when the run is over."""
+
+    def __init__(self, controller: "AdmissionController", user_id: str):
+        self.controller = controller
+        self.user_id = user_id
+        self.admitted_at = time.perf_counter()
+        self._released = False
+
+    def release(self) -> None:
+        # Safe to call more than once
+        if not self._released:
+            self._released = True
+            self.controller._release(self)
+
+
+class AdmissionController:
+    """
+    Per-worker limits on concurrent chat runs, globally and per user.
+
+    Waiters are admitted in arrival order, skipping users already at their own
+    limit so one user's backlog does not hold up everyone else.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int,
+        max_per_user: int,
+        max_queued: int,
+        queue_timeout: float,
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_per_user = max_per_user
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+
+        self.active = 0
+        self._active_by_user: dict[str, int] = {}
+        self._queued_by_user: dict[str, int] = {}
+        self._waiters: deque[tuple[str, asyncio.Future[Admission]]] = deque()
+
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.waited = 0
+        self.wait_seconds = 0.0
+        # Moving average of how long a run holds its slot, for Retry-After
+        self.mean_run_seconds = 5.0
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def _can_start(self, user_id: str) -> bool:
+        return (
+            self.active < self.max_concurrent
+            and self._active_by_user.get(user_id, 0) < self.max_per_user
+        )
+
+    def _start(self, user_id: str) -> Admission:
+        self.active += 1
+        self._active_by_user[user_id] = self._active_by_user.get(user_id, 0) + 1
+        self.admitted += 1
+        return Admission(self, user_id)
+
+    def _retry_after(self) -> int:
+        # Time for the queued runs, and then this one, to get through the slots
+        backlog = self.queued + 1
+        return max(1, math.ceil(backlog * self.mean_run_seconds / self.max_concurrent))
+
+    def _reject(self, reason: str) -> AdmissionRejected:
+        self.rejected += 1
+        return AdmissionRejected(reason, self._retry_after())
+
+    def _dequeue(self, user_id: str, waiter: asyncio.Future[Admission]) -> None:
+        try:
+            self._waiters.remove((user_id, waiter))
+        except ValueError:
+            return
+        self._queued_by_user[user_id] -= 1
+        if not self._queued_by_user[user_id]:
+            del self._queued_by_user[user_id]
+
+    def _release(self, admission: Admission) -> None:
+        held = time.perf_counter() - admission.admitted_at
+        self.mean_run_seconds = 0.9 * self.mean_run_seconds + 0.1 * held
+
+        self.active -= 1
+        self._active_by_user[admission.user_id] -= 1
+        if not self._active_by_user[admission.user_id]:
+            del self._active_by_user[admission.user_id]
+
+        # Hand freed slots to the oldest waiters that are allowed to start
+        for user_id, waiter in list(self._waiters):
+            if self.active >= self.max_concurrent:
+                break
+            if waiter.done() or not self._can_start(user_id):
+                continue
+            self._dequeue(user_id, waiter)
+            waiter.set_result(self._start(user_id))
+
+    async def acquire(self, user_id: str) -> Admission:
+        """
+        Wait for a slot for one of the user's chat runs.
+
+        Args:
+            user_id: The ID of the user
+
+        Returns:
+            The admission, to be released when the run is over
+
+        Raises:
+            AdmissionRejected: The queue is full, the user already has as many
+                               waiting requests as running ones, or the wait
+                               passed queue_timeout
+        """
+        # Freed slots go straight to eligible waiters, so a free slot here means
+        # no one queued could have taken it
+        if self._can_start(user_id):
+            return self._start(user_id)
+
+        if self.queued >= self.max_queued:
+            raise self._reject("Too many chat requests are waiting")
+        if self._queued_by_user.get(user_id, 0) >= self.max_per_user:
+            raise self._reject("Too many of your chat requests are waiting")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append((user_id, waiter))
+        self._queued_by_user[user_id] = self._queued_by_user.get(user_id, 0) + 1
+        started = time.perf_counter()
+        try:
+            # Unlike wait_for, wait leaves the future alone when it times out
+            await asyncio.wait({waiter}, timeout=self.queue_timeout)
+        except asyncio.CancelledError:
+            # The client went away. A slot granted in the meantime goes back.
+            self._dequeue(user_id, waiter)
+            if waiter.done():
+                waiter.result().release()
+            else:
+                waiter.cancel()
+            raise
+        finally:
+            self.waited += 1
+            self.wait_seconds += time.perf_counter() - started
+
+        if waiter.done():
+            return waiter.result()
+
+        self._dequeue(user_id, waiter)
+        self.timed_out += 1
+        raise self._reject("Timed out waiting for a free chat slot")
+
+    @asynccontextmanager
+    async def admit(self, user_id: str) -> AsyncIterator[Admission]:
+        """Hold a slot for the duration of the block. See `acquire`."""
+        admission = await self.acquire(user_id)
+        try:
+            yield admission
+        finally:
+            admission.release()
+
+    def summary(self) -> dict:
+        return {
+            "active": self.active,
+            "queued": self.queued,
+            "max_concurrent": self.max_concurrent,
+            "max_queued": self.max_queued,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "waited": self.waited,
+            "mean_wait_seconds": self.wait_seconds / self.waited if self.waited else None,
+            "mean_run_seconds": self.mean_run_seconds,
+        }
+
+
+chat_admission = AdmissionController(
+    max_concurrent=CHAT_MAX_CONCURRENT_RUNS,
+    max_per_user=CHAT_MAX_RUNS_PER_USER,
+    max_queued=CHAT_MAX_QUEUED,
+    queue_timeout=CHAT_QUEUE_TIMEOUT_SECONDS,
+)
@@ -0,0 +1,76 @@
+import os
+from typing import Awaitable, Callable
+
+from agents import Agent, RunContextWrapper, Tool
+
+from ai.context import AgentContext
+
+
+class AgentRegistry:
+    """
+    Builds the chat agent once per worker and shares it across requests.
+
+    Instructions come from `instructions_path` when it is set, and the agent is
+    rebuilt the next time it is requested after that file changes, so prompt
+    edits take effect without a restart.
+
+    `dynamic_instructions` adds a per-run section, such as the user's health
+    snapshot, after the shared instructions.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        instructions: str,
+        tools: list[Tool],
+        instructions_path: str | None = None,
+        dynamic_instructions: Callable[
+            [RunContextWrapper[AgentContext]], Awaitable[str | None]
+        ] | None = None,
+    ):
+        self.name = name
+        self.default_instructions = instructions
+        self.tools = tools
+        self.instructions_path = instructions_path
+        self.dynamic_instructions = dynamic_instructions
+        self._agent: Agent[AgentContext] | None = None
+        self._instructions_mtime: float | None = None
+
+    def _instructions_file_mtime(self) -> float | None:
+        if not self.instructions_path:
+            return None
+        try:
+            return os.stat(self.instructions_path).st_mtime
+        except FileNotFoundError:
+            return None
+
+    def _load_instructions(self) -> str:
+        if self._instructions_mtime is None:
+            return self.default_instructions
+        with open(self.instructions_path, encoding="utf-8") as f:
+            return f.read()
+
+    def build(self) -> Agent[AgentContext]:
+        """(Re)build the agent from the current instructions."""
+        self._instructions_mtime = self._instructions_file_mtime()
+        instructions = self._load_instructions()
+
+        async def run_instructions(
+            wrapper: RunContextWrapper[AgentContext], agent: Agent[AgentContext]
+        ) -> str:
+            extra = await self.dynamic_instructions(wrapper)
+            return f"{instructions}\n\n{extra}" if extra else instructions
+
+        self._agent = Agent[AgentContext](
+            name=self.name,
+            instructions=run_instructions if self.dynamic_instructions else instructions,
+            tools=self.tools,
+            # model="gpt-4.1-2025-04-14",
+        )
+        return self._agent
+
+    def get(self) -> Agent[AgentContext]:
+        """Return the shared agent, rebuilding it if the instructions file changed."""
+        if self._agent is None or self._instructions_file_mtime() != self._instructions_mtime:
+            return self.build()
+        return self._agent
@@ -1,13 +1,52 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager, nullcontext
+from functools import partial
+from typing import Any, AsyncIterator
 from uuid import uuid4
 
-from agents import Agent, Runner
-from sqlalchemy.ext.asyncio import AsyncSession
+import anyio
+from agents import ItemHelpers, RunConfig, RunItem, RunResult, RunResultStreaming, Runner
+from openai.types.responses import ResponseTextDeltaEvent
+from pymongo.asynchronous.database import AsyncDatabase
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-from schemas.chat_schemas import ChatRequest, ChatResponse, MessageResponse
+from config import (
+    AGENT_INSTRUCTIONS_PATH,
+    CHAT_COMPACTION_TOKEN_THRESHOLD,
+    CHAT_CONVERSATION_WAIT_SECONDS,
+    CHAT_HISTORY_LIMIT,
+    CHAT_HISTORY_TOKEN_BUDGET,
+    CHAT_LEASE_POLL_SECONDS,
+    CHAT_LEASE_SECONDS,
+    CHAT_SESSION_BACKEND,
+    METRICS_ENABLED,
+)
+from schemas.chat_schemas import ChatRequest, ChatResponse, MessageResponse, TurnUsage
+from schemas.health_snapshot_schemas import HealthSnapshot
+from ai.admission import AdmissionController, AdmissionRejected
+from ai.agent_registry import AgentRegistry
+from ai.compaction import compact_history
 from ai.context import AgentContext
+from ai.conversation_lease import ConversationBusy, ConversationLease
+from ai.fast_path import (
+    MedicationMatch,
+    asks_question,
+    fast_path_stats,
+    is_known_medication,
+    match_fast_path,
+    record_fast_path,
+)
+from ai.health_snapshot import health_snapshot_instructions
+from managers.health_snapshot_manager import HealthSnapshotManager
 from ai.tools import tools
+from metrics import TimedChatSession
 from mongodb_session import MongoDBSession
-from no_sql_db import db as nosql_db
+from sql_alchemy_session import SQLAlchemySession
+
+
+logger = logging.getLogger(__name__)
 
 
 agent_instructions = """
@@ -57,6 +96,8 @@ Use your tools (e.g., to save data or manage reminders) only after you:
 - Have confirmed accuracy with the user.
 - Have ensured the action reflects the user’s intent.
 
+To answer questions about past records, use the find_* tools with the narrowest filters that fit the question (names, dates, a small limit) rather than listing everything.
+
 If user input is ambiguous, incomplete, or emotional without detail, your first job is to ask questions — not store or act.
 
 🧾 Example Interaction
@@ -69,35 +110,486 @@ This will help me log it accurately.
 """
 
 
-async def process_text_message(
-    chat_req: ChatRequest, db: AsyncSession, user_id: str
-) -> ChatResponse:
-    agent = Agent(
-        name="Personal health data manager",
-        instructions=agent_instructions,
-        tools=tools,
-        # model="gpt-4.1-2025-04-14",
+agent_registry = AgentRegistry(
+    name="Personal health data manager",
+    instructions=agent_instructions,
+    tools=tools,
+    instructions_path=AGENT_INSTRUCTIONS_PATH,
+    dynamic_instructions=health_snapshot_instructions,
+)
+
+
+def create_chat_session(
+    conversation_id: str, db: AsyncSession, nosql_db: AsyncDatabase | None
+) -> MongoDBSession | SQLAlchemySession:
+    """Open the conversation's history in the configured CHAT_SESSION_BACKEND."""
+    if CHAT_SESSION_BACKEND == "postgres":
+        session = SQLAlchemySession(
+            conversation_id,
+            db,
+            history_limit=CHAT_HISTORY_LIMIT,
+            token_budget=CHAT_HISTORY_TOKEN_BUDGET,
+        )
+    else:
+        session = MongoDBSession(
+            conversation_id,
+            nosql_db,
+            history_limit=CHAT_HISTORY_LIMIT,
+            token_budget=CHAT_HISTORY_TOKEN_BUDGET,
+            write_behind=True,
+        )
+    if METRICS_ENABLED:
+        return TimedChatSession(session)
+    return session
+
+
+@asynccontextmanager
+async def open_chat_session(
+    conversation_id: str,
+    sessionmaker: async_sessionmaker[AsyncSession],
+    nosql_db: AsyncDatabase | None,
+) -> AsyncIterator[MongoDBSession | SQLAlchemySession]:
+    """Open the conversation's history on a database session of its own."""
+    async with sessionmaker() as db:
+        yield create_chat_session(conversation_id, db, nosql_db)
+
+
+def create_conversation_lease(
+    conversation_id: str,
+    sessionmaker: async_sessionmaker[AsyncSession],
+    nosql_db: AsyncDatabase | None,
+) -> ConversationLease:
+    return ConversationLease(
+        conversation_id,
+        partial(open_chat_session, conversation_id, sessionmaker, nosql_db),
+        ttl=CHAT_LEASE_SECONDS,
+        poll_interval=CHAT_LEASE_POLL_SECONDS,
     )
 
-    conversation_id = (
-        chat_req.conversation_id if chat_req.conversation_id else str(uuid4())
+
+async def load_health_snapshot(
+    sessionmaker: async_sessionmaker[AsyncSession], user_id: str
+) -> HealthSnapshot:
+    async with sessionmaker() as db:
+        return await HealthSnapshotManager.get_user_health_snapshot(user_id, db)
+
+
+def create_agent_context(
+    sessionmaker: async_sessionmaker[AsyncSession], user_id: str
+) -> AgentContext:
+    """Start loading the user's health snapshot and wrap it in the agent's context."""
+    # The snapshot has its own session, so it overlaps the runner's history read
+    health_snapshot = asyncio.create_task(load_health_snapshot(sessionmaker, user_id))
+    return AgentContext(
+        user_id=user_id, sessionmaker=sessionmaker, health_snapshot=health_snapshot
     )
 
-    session = MongoDBSession(conversation_id, nosql_db)
 
-    agent_context = AgentContext(
-        db=db,
-        user_id=user_id,
+# Background compactions by conversation id, at most one per conversation per worker
+_compactions: dict[str, asyncio.Task] = {}
+
+
+async def compact_conversation(
+    conversation_id: str,
+    sessionmaker: async_sessionmaker[AsyncSession],
+    nosql_db: AsyncDatabase | None,
+) -> None:
+    try:
+        # The request's database session is closed by now, so open another
+        async with open_chat_session(conversation_id, sessionmaker, nosql_db) as session:
+            await compact_history(session, CHAT_COMPACTION_TOKEN_THRESHOLD)
+    except Exception:
+        logger.exception("Compacting conversation %s failed", conversation_id)
+    finally:
+        _compactions.pop(conversation_id, None)
+
+
+def schedule_compaction(
+    conversation_id: str,
+    session: MongoDBSession | SQLAlchemySession,
+    sessionmaker: async_sessionmaker[AsyncSession],
+    nosql_db: AsyncDatabase | None,
+) -> None:
+    """
+    Start compacting the conversation in the background once its history passes
+    CHAT_COMPACTION_TOKEN_THRESHOLD.
+
+    The check uses the session's estimate of the history it replayed plus the
+    turn's new items, so a turn under the threshold costs no extra query.
+    """
+    if not CHAT_COMPACTION_TOKEN_THRESHOLD or session.history_tokens is None:
+        return
+    if session.history_tokens + session.added_tokens <= CHAT_COMPACTION_TOKEN_THRESHOLD:
+        return
+    if conversation_id in _compactions:
+        return
+    _compactions[conversation_id] = asyncio.create_task(
+        compact_conversation(conversation_id, sessionmaker, nosql_db)
     )
 
-    result = await Runner.run(
-        starting_agent=agent,
-        input=chat_req.message,
-        context=agent_context,
-        session=session,
+
+async def wait_for_compactions() -> None:
+    """Let the running compactions finish, e.g. before the app shuts down."""
+    await asyncio.gather(*_compactions.values(), return_exceptions=True)
+
+
+def turn_usage(
+    session: MongoDBSession | SQLAlchemySession, result: RunResult | RunResultStreaming
+) -> TurnUsage:
+    usage = result.context_wrapper.usage
+    return TurnUsage(
+        history_tokens=session.history_tokens,
+        model_requests=usage.requests,
+        input_tokens=usage.input_tokens,
+        output_tokens=usage.output_tokens,
+    )
+
+
+async def save_interrupted_turn(
+    session: MongoDBSession | SQLAlchemySession,
+    message: str,
+    new_items: list[RunItem],
+) -> None:
+    """
+    Add what a run that did not complete produced to the conversation history.
+
+    The runner only saves a turn once it completes. Without this, a run that
+    failed, timed out or was cancelled would lose the user's message, and the
+    tool calls whose records are already committed would vanish from the
+    history. Tool calls without an output are left out, since the model rejects
+    a history with unanswered calls.
+    """
+    if session.added_tokens:
+        # The runner saved the turn before the run was interrupted
+        return
+
+    answered = {
+        item.raw_item["call_id"] for item in new_items if item.type == "tool_call_output_item"
+    }
+    items = ItemHelpers.input_to_new_input_list(message) + [
+        item.to_input_item()
+        for item in new_items
+        if item.type != "tool_call_item"
+        or getattr(item.raw_item, "call_id", None) in (None, *answered)
+    ]
+    try:
+        await session.add_items(items)
+    except Exception:
+        logger.exception("Saving an interrupted turn of conversation %s failed", session.session_id)
+
+
+async def reply_on_fast_path(
+    chat_req: ChatRequest,
+    session: MongoDBSession | SQLAlchemySession,
+    sessionmaker: async_sessionmaker[AsyncSession],
+    user_id: str,
+) -> str | None:
+    """
+    Record a formulaic message without the agent when it is understood in full.
+
+    The exchange is added to the conversation history as if the agent had
+    handled it, so later turns see it. A message answering a question the
+    agent just asked goes to the agent, which knows what was asked, and so does
+    an intake of a medication the user has not logged before.
+
+    Returns:
+        The confirmation, or None if the message needs the agent
+    """
+    match = match_fast_path(chat_req.message)
+    if match is None:
+        return None
+    if isinstance(match, MedicationMatch) and not await is_known_medication(
+        match, sessionmaker, user_id
+    ):
+        return None
+    if asks_question(await session.get_items(limit=1)):
+        return None
+
+    reply = await record_fast_path(match, sessionmaker, user_id)
+    await session.add_items(
+        [
+            {"role": "user", "content": chat_req.message},
+            {"role": "assistant", "content": reply},
+        ]
     )
-    output = result.final_output
+    await session.flush()
+    return reply
+
+
+async def run_text_turn(
+    messages: list[str],
+    conversation_id: str,
+    sessionmaker: async_sessionmaker[AsyncSession],
+    nosql_db: AsyncDatabase | None,
+    user_id: str,
+) -> ChatResponse:
+    """
+    Answer one or more queued user messages with a single turn.
+
+    The caller must hold the conversation's lease.
+    """
+    agent = agent_registry.get()
+
+    started = time.perf_counter()
+    usage = None
+    async with sessionmaker() as db:
+        session = create_chat_session(conversation_id, db, nosql_db)
+
+        output = None
+        if len(messages) == 1:
+            output = await reply_on_fast_path(
+                ChatRequest(conversation_id=conversation_id, message=messages[0]),
+                session,
+                sessionmaker,
+                user_id,
+            )
+        if output is not None:
+            fast_path_stats.record_hit(started)
+        else:
+            agent_context = create_agent_context(sessionmaker, user_id)
+
+            # The runner only accepts a string when it manages the history, so
+            # coalesced messages become one user message, one per paragraph
+            message = "\n\n".join(messages)
+            # Run streamed so the items of an interrupted run are still at hand
+            result = Runner.run_streamed(
+                starting_agent=agent,
+                input=message,
+                context=agent_context,
+                session=session,
+            )
+            try:
+                async for _ in result.stream_events():
+                    pass
+                # The events stop without an error when the run is cancelled
+                if result.final_output is None:
+                    raise asyncio.CancelledError
+            except BaseException:
+                result.cancel()
+                await save_interrupted_turn(session, message, result.new_items)
+                raise
+            finally:
+                # A Mongo session buffers the turn's messages and writes them here in one go
+                await session.flush()
+            output = result.final_output
+            usage = turn_usage(session, result)
+            fast_path_stats.record_agent_run(started)
+            schedule_compaction(conversation_id, session, sessionmaker, nosql_db)
 
     return ChatResponse(
-        messages=[MessageResponse(content=output)], conversation_id=conversation_id
+        messages=[MessageResponse(content=output)],
+        conversation_id=conversation_id,
+        usage=usage,
     )
+
+
+async def answer_queued_messages(
+    entry_id: str,
+    conversation_id: str,
+    sessionmaker: async_sessionmaker[AsyncSession],
+    nosql_db: AsyncDatabase | None,
+    user_id: str,
+) -> ChatResponse | None:
+    """
+    Run one turn for every message queued in the conversation, as the lease holder.
+
+    Returns:
+        The reply to the message queued as entry_id, or None if a turn whose
+        worker went away took the message and it will never be answered
+    """
+    async with open_chat_session(conversation_id, sessionmaker, nosql_db) as session:
+        queued = await session.take_queued_messages()
+        if entry_id not in {queued_id for queued_id, _ in queued}:
+            # The previous lease holder answered it already. Messages queued
+            # since then go back to the inbox for their own callers to answer.
+            await session.requeue_messages([queued_id for queued_id, _ in queued])
+            reply = await session.take_reply(entry_id)
+            return ChatResponse.model_validate(reply) if reply is not None else None
+
+    others = [queued_id for queued_id, _ in queued if queued_id != entry_id]
+    try:
+        response = await run_text_turn(
+            [message for _, message in queued], conversation_id, sessionmaker, nosql_db, user_id
+        )
+    except BaseException:
+        # The other requests get their messages answered by the next lease holder
+        async with open_chat_session(conversation_id, sessionmaker, nosql_db) as session:
+            await session.requeue_messages(others)
+            await session.delete_message(entry_id)
+        raise
+
+    async with open_chat_session(conversation_id, sessionmaker, nosql_db) as session:
+        if others:
+            await session.store_reply(others, response.model_dump())
+        await session.delete_message(entry_id)
+    return response
+
+
+async def process_text_message(
+    chat_req: ChatRequest,
+    sessionmaker: async_sessionmaker[AsyncSession],
+    nosql_db: AsyncDatabase | None,
+    user_id: str,
+    admission: AdmissionController | None = None,
+) -> ChatResponse:
+    """
+    Answer a chat message, one turn at a time per conversation across workers.
+
+    The message is queued in the conversation's inbox. The request that gets
+    the conversation's lease answers every queued message with one turn, and
+    the others pick up the reply it stores for them. Only the lease holder
+    takes a slot from `admission`, so messages waiting on a busy conversation
+    do not hold slots other users' runs need.
+
+    Raises:
+        AdmissionRejected: The lease holder could not get a slot for the turn
+        ConversationBusy: The message was neither answered nor picked up within
+                          CHAT_CONVERSATION_WAIT_SECONDS
+    """
+    conversation_id = (
+        chat_req.conversation_id if chat_req.conversation_id else str(uuid4())
+    )
+    entry_id = str(uuid4())
+    lease = create_conversation_lease(conversation_id, sessionmaker, nosql_db)
+
+    async with open_chat_session(conversation_id, sessionmaker, nosql_db) as session:
+        await session.enqueue_message(entry_id, chat_req.message)
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + CHAT_CONVERSATION_WAIT_SECONDS
+    while True:
+        if await lease.try_acquire():
+            async with lease.held():
+                try:
+                    async with admission.admit(user_id) if admission else nullcontext():
+                        response = await answer_queued_messages(
+                            entry_id, conversation_id, sessionmaker, nosql_db, user_id
+                        )
+                except AdmissionRejected:
+                    # Nothing was taken from the inbox yet. The other messages
+                    # are answered by the next lease holder.
+                    async with open_chat_session(
+                        conversation_id, sessionmaker, nosql_db
+                    ) as session:
+                        await session.withdraw_message(entry_id)
+                    raise
+            if response is None:
+                break
+            return response
+        else:
+            async with open_chat_session(conversation_id, sessionmaker, nosql_db) as session:
+                reply = await session.take_reply(entry_id)
+            if reply is not None:
+                return ChatResponse.model_validate(reply)
+
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            break
+        await lease.wait(min(remaining, CHAT_LEASE_POLL_SECONDS))
+
+    async with open_chat_session(conversation_id, sessionmaker, nosql_db) as session:
+        await session.withdraw_message(entry_id)
+    raise ConversationBusy(retry_after=max(1, round(CHAT_LEASE_SECONDS / 3)))
+
+
+async def stream_text_message(
+    chat_req: ChatRequest,
+    sessionmaker: async_sessionmaker[AsyncSession],
+    nosql_db: AsyncDatabase | None,
+    user_id: str,
+    run_config: RunConfig | None = None,
+) -> AsyncIterator[tuple[str, dict[str, Any]]]:
+    """
+    Run the agent in streaming mode and yield its progress as (event, data) pairs.
+
+    Events are "conversation" first, then "delta" for each text chunk,
+    "tool_call_started" and "tool_call_finished" around tool calls, and
+    "message" with the final output and the turn's token usage once the turn
+    is saved. Raises ConversationBusy if another turn of the conversation
+    keeps it busy for CHAT_CONVERSATION_WAIT_SECONDS.
+
+    Args:
+        chat_req: The user's message
+        sessionmaker: Factory of the database sessions used by the history and tools
+        nosql_db: The Mongo database, None unless chat history is stored there
+        user_id: The ID of the user
+        run_config: Optional run settings, e.g. a different model
+
+    Returns:
+        An async iterator of (event name, event data) pairs
+    """
+    agent = agent_registry.get()
+
+    conversation_id = (
+        chat_req.conversation_id if chat_req.conversation_id else str(uuid4())
+    )
+
+    yield "conversation", {"conversation_id": conversation_id}
+
+    # Waits for a turn of the conversation running elsewhere to finish. Streamed
+    # messages are not coalesced, since each stream shows its own reply.
+    lease = create_conversation_lease(conversation_id, sessionmaker, nosql_db)
+    await lease.acquire(CHAT_CONVERSATION_WAIT_SECONDS)
+    async with lease.held():
+        started = time.perf_counter()
+        async with sessionmaker() as db:
+            session = create_chat_session(conversation_id, db, nosql_db)
+
+            reply = await reply_on_fast_path(chat_req, session, sessionmaker, user_id)
+            if reply is not None:
+                fast_path_stats.record_hit(started)
+                yield "delta", {"text": reply}
+                yield "message", {
+                    "content": reply, "conversation_id": conversation_id, "usage": None
+                }
+                return
+
+            agent_context = create_agent_context(sessionmaker, user_id)
+
+            result = Runner.run_streamed(
+                starting_agent=agent,
+                input=chat_req.message,
+                context=agent_context,
+                session=session,
+                run_config=run_config,
+            )
+            try:
+                async for event in result.stream_events():
+                    if event.type == "raw_response_event":
+                        if isinstance(event.data, ResponseTextDeltaEvent):
+                            yield "delta", {"text": event.data.delta}
+                    elif event.type == "run_item_stream_event":
+                        if event.name == "tool_called":
+                            yield "tool_call_started", {
+                                "call_id": event.item.raw_item.call_id,
+                                "name": event.item.raw_item.name,
+                            }
+                        elif event.name == "tool_output":
+                            yield "tool_call_finished", {
+                                "call_id": event.item.raw_item["call_id"],
+                                "output": str(event.item.output),
+                            }
+                # The events stop without an error when the run is cancelled
+                if result.final_output is None:
+                    raise asyncio.CancelledError
+            except BaseException:
+                # Stops the background run, e.g. when the client disconnected mid-stream
+                result.cancel()
+                # Shielded, since a disconnect cancels every await of the stream
+                with anyio.CancelScope(shield=True):
+                    await save_interrupted_turn(session, chat_req.message, result.new_items)
+                raise
+            finally:
+                # The runner saved the turn to the session when the run completed, and
+                # a Mongo session writes it now
+                with anyio.CancelScope(shield=True):
+                    await session.flush()
+            usage = turn_usage(session, result)
+            fast_path_stats.record_agent_run(started)
+            schedule_compaction(conversation_id, session, sessionmaker, nosql_db)
+
+    yield "message", {
+        "content": result.final_output,
+        "conversation_id": conversation_id,
+        "usage": usage.model_dump(),
+    }
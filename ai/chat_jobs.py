@@ -0,0 +1,157 @@
+"""Background execution of chat messages submitted as jobs.
+
+Submitting a job stores it in chat_jobs and queues its id for this worker's
+pool of CHAT_JOB_WORKERS tasks, so the number of concurrent agent runs does
+not depend on how many HTTP requests are open. Clients poll the job, or long
+poll with a wait, until it succeeds or fails.
+
+A job is claimed with a conditional UPDATE before it runs, so when a worker
+restarts and queues the jobs left waiting in the table, no job runs twice.
+Jobs that were running when their worker stopped are reported as failed
+rather than retried, since their tool calls may already have saved records.
+"""
+import asyncio
+import logging
+from datetime import timedelta
+
+from pymongo.asynchronous.database import AsyncDatabase
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from config import (
+    CHAT_JOB_MAX_QUEUED,
+    CHAT_JOB_TIMEOUT_SECONDS,
+    CHAT_JOB_WORKERS,
+)
+from schemas.chat_schemas import ChatRequest
+from managers.chat_job_manager import INTERRUPTED_ERROR, ChatJobManager
+from ai.ai_agents import process_text_message
+from ai.conversation_lease import ConversationBusy
+
+
+logger = logging.getLogger(__name__)
+
+FAILED_ERROR = "The assistant failed to respond"
+TIMED_OUT_ERROR = "The assistant took too long to respond"
+
+
+class ChatJobPool:
+    """A fixed number of tasks that run queued chat jobs, one per worker process."""
+
+    def __init__(self, workers: int, max_queued: int, run_timeout: float):
+        self.workers = workers
+        self.max_queued = max_queued
+        self.run_timeout = run_timeout
+        # Jobs still running after this long cannot be alive anymore
+        self.stale_after = timedelta(seconds=run_timeout + 60)
+        self._queue: asyncio.Queue[str] = asyncio.Queue()
+        self._finished: dict[str, asyncio.Event] = {}
+        self._tasks: list[asyncio.Task] = []
+        self.sessionmaker: async_sessionmaker[AsyncSession] | None = None
+        self.nosql_db: AsyncDatabase | None = None
+
+    @property
+    def queued(self) -> int:
+        return self._queue.qsize()
+
+    @property
+    def is_full(self) -> bool:
+        # Checked before a job is stored, so concurrent submits can overshoot a little
+        return self.queued >= self.max_queued
+
+    async def start(
+        self, sessionmaker: async_sessionmaker[AsyncSession], nosql_db: AsyncDatabase | None
+    ) -> None:
+        """Start the workers and queue the jobs left waiting by a previous run."""
+        self.sessionmaker = sessionmaker
+        self.nosql_db = nosql_db
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+        # In the background, so the app starts even if the database is slow to answer
+        self._tasks.append(asyncio.create_task(self._recover()))
+
+    async def stop(self) -> None:
+        """Stop the workers. Jobs they were running are marked as failed."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, job_id: str) -> None:
+        """Queue a stored job to run in this worker."""
+        self._finished.setdefault(job_id, asyncio.Event())
+        self._queue.put_nowait(job_id)
+
+    async def wait(self, job_id: str, timeout: float) -> None:
+        """Wait up to timeout for a job of this worker to finish.
+
+        Jobs run by other workers cannot be watched, so this just sleeps and
+        the caller reads the job again.
+        """
+        finished = self._finished.get(job_id)
+        if finished is None:
+            await asyncio.sleep(timeout)
+            return
+        try:
+            await asyncio.wait_for(finished.wait(), timeout)
+        except TimeoutError:
+            pass
+
+    async def _recover(self) -> None:
+        try:
+            async with self.sessionmaker() as db:
+                job_ids = await ChatJobManager.recover_chat_jobs(
+                    db, self.stale_after, self.max_queued
+                )
+        except Exception:
+            logger.exception("Recovering chat jobs failed")
+            return
+        for job_id in job_ids:
+            self.submit(job_id)
+
+    async def _work(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except Exception:
+                logger.exception("Chat job %s could not be recorded", job_id)
+            finally:
+                finished = self._finished.pop(job_id, None)
+                if finished is not None:
+                    finished.set()
+
+    async def _run(self, job_id: str) -> None:
+        async with self.sessionmaker() as db:
+            job = await ChatJobManager.claim_chat_job(job_id, db)
+        if job is None:
+            # Another worker took it, or it already finished
+            return
+
+        chat_req = ChatRequest(conversation_id=job.conversation_id, message=job.message)
+        response = error = None
+        try:
+            async with asyncio.timeout(self.run_timeout):
+                response = await process_text_message(
+                    chat_req, self.sessionmaker, self.nosql_db, str(job.user_id)
+                )
+        except TimeoutError:
+            error = TIMED_OUT_ERROR
+        except ConversationBusy as e:
+            error = str(e)
+        except asyncio.CancelledError:
+            # The app is shutting down
+            async with self.sessionmaker() as db:
+                await ChatJobManager.finish_chat_job(job_id, db, error=INTERRUPTED_ERROR)
+            raise
+        except Exception:
+            logger.exception("Chat job %s failed", job_id)
+            error = FAILED_ERROR
+
+        async with self.sessionmaker() as db:
+            await ChatJobManager.finish_chat_job(job_id, db, response=response, error=error)
+
+
+chat_job_pool = ChatJobPool(
+    workers=CHAT_JOB_WORKERS,
+    max_queued=CHAT_JOB_MAX_QUEUED,
+    run_timeout=CHAT_JOB_TIMEOUT_SECONDS,
+)
@@ -0,0 +1,100 @@
+"""Rolling compaction of chat history.
+
+Once a conversation's replayed history passes CHAT_COMPACTION_TOKEN_THRESHOLD,
+its older turns are summarized by a small agent and the summary replaces them
+in the history the model sees. The raw messages stay stored, marked archived.
+Compaction runs after the turn's reply, so it never delays a response.
+"""
+import json
+
+from agents import Agent, Runner
+from agents.items import TResponseInputItem
+
+from config import CHAT_COMPACTION_KEEP_TOKENS, CHAT_COMPACTION_MODEL
+from mongodb_session import MongoDBSession
+from session_history import compaction_split, estimate_tokens, summary_item
+from sql_alchemy_session import SQLAlchemySession
+
+
+summarizer_instructions = """
+You maintain the running summary of a conversation between a user and their
+personal health data assistant. You receive the previous summary, if any, and
+the turns that follow it. Write a new summary that replaces both.
+
+Keep: health facts the user shared, what was saved to their record and what was
+not, open questions, pending clarifications, and the user's stated preferences.
+Drop: greetings, repeated disclaimers and tool call details.
+
+Write plain, dense prose of at most 300 words. Never add facts that are not in
+the conversation.
+"""
+
+summarizer = Agent(
+    name="Conversation summarizer",
+    instructions=summarizer_instructions,
+    model=CHAT_COMPACTION_MODEL,
+)
+
+
+def _item_text(item: TResponseInputItem) -> str | None:
+    item_type = item.get("type", "message")
+    if item_type == "message":
+        content = item.get("content")
+        if not isinstance(content, str):
+            content = " ".join(
+                part.get("text") or part.get("refusal") or "" for part in content or []
+            )
+        return f"{item.get('role')}: {content}"
+    if item_type == "function_call":
+        return f"tool call {item.get('name')}: {item.get('arguments')}"
+    if item_type == "function_call_output":
+        output = item.get("output")
+        return f"tool result: {output if isinstance(output, str) else json.dumps(output)}"
+    # Reasoning and other internal items add nothing to the summary
+    return None
+
+
+def render_transcript(summary: str | None, items: list[TResponseInputItem]) -> str:
+    """Render the previous summary and the turns to fold into it for the summarizer."""
+    lines = []
+    if summary is not None:
+        lines.append(summary_item(summary)["content"])
+        lines.append("")
+    lines.append("Conversation turns that follow:")
+    lines.extend(text for text in map(_item_text, items) if text is not None)
+    return "\n".join(lines)
+
+
+async def compact_history(
+    session: MongoDBSession | SQLAlchemySession, token_threshold: int
+) -> bool:
+    """
+    Fold the older turns of a conversation into its summary if it is over the threshold.
+
+    Args:
+        session: The conversation's session, on a database connection of its own
+        token_threshold: Estimated tokens of summary and messages above which
+                         the history is compacted
+
+    Returns:
+        True if a new summary was stored, False if the history was under the
+        threshold or another compaction stored a summary first
+    """
+    current = await session.get_summary()
+    summary, summary_version = current if current else (None, 0)
+    active = await session.get_active_items()
+    items = [item for _, item in active]
+
+    tokens = sum(estimate_tokens(item) for item in items)
+    if summary is not None:
+        tokens += estimate_tokens(summary_item(summary))
+    if tokens <= token_threshold:
+        return False
+
+    split = compaction_split(items, CHAT_COMPACTION_KEEP_TOKENS)
+    if split == 0:
+        return False
+
+    result = await Runner.run(summarizer, input=render_transcript(summary, items[:split]))
+    position, _ = active[split - 1]
+    return await session.archive_through(result.final_output, position, summary_version)
@@ -1,9 +1,23 @@
+import asyncio
 from dataclasses import dataclass
 
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from schemas.health_snapshot_schemas import HealthSnapshot
 
 
 @dataclass
 class AgentContext:
-    db: AsyncSession
     user_id: str
+    sessionmaker: async_sessionmaker[AsyncSession]
+    # Loaded while the runner reads the history, awaited by the dynamic instructions
+    health_snapshot: asyncio.Task[HealthSnapshot] | None = None
+
+    def session(self) -> AsyncSession:
+        """
+        Open a database session for one tool call.
+
+        The runner executes a turn's tool calls concurrently and an AsyncSession
+        cannot be shared between them, so each call takes its own pooled session.
+        """
+        return self.sessionmaker()
@@ -0,0 +1,117 @@
+"""Serialization of a conversation's turns across workers.
+
+Two turns of one conversation must not run at once: both would read the same
+history and interleave their writes. A turn therefore runs under a lease kept
+in the session store, extended while the turn runs and expiring on its own if
+its worker dies.
+
+Messages that arrive while a turn is running are queued in the session's
+inbox. Whoever takes the lease next answers everything queued with a single
+run and stores the reply for the other waiting requests.
+"""
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncContextManager, AsyncIterator, Callable
+from uuid import uuid4
+
+import anyio
+
+from mongodb_session import MongoDBSession
+from sql_alchemy_session import SQLAlchemySession
+
+
+logger = logging.getLogger(__name__)
+
+ChatSessionOpener = Callable[[], AsyncContextManager[MongoDBSession | SQLAlchemySession]]
+
+
+class ConversationBusy(Exception):
+    """The conversation stayed busy past the wait deadline. Retry after `retry_after` seconds."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("The conversation is busy with another message")
+        self.retry_after = retry_after
+
+
+class ConversationLease:
+    """
+    The lease on one conversation, held by this request while it runs a turn.
+
+    Every store operation opens its own session through `open_session`, so the
+    lease can be extended while the turn uses the request's database session.
+    """
+
+    # Woken when a lease is released in this worker, so local waiters need not poll
+    _released: dict[str, asyncio.Event] = {}
+
+    def __init__(
+        self,
+        conversation_id: str,
+        open_session: ChatSessionOpener,
+        ttl: float,
+        poll_interval: float,
+    ):
+        self.conversation_id = conversation_id
+        self.open_session = open_session
+        self.ttl = ttl
+        self.poll_interval = poll_interval
+        self.owner = str(uuid4())
+
+    async def try_acquire(self) -> bool:
+        async with self.open_session() as session:
+            return await session.acquire_lease(self.owner, self.ttl)
+
+    async def acquire(self, timeout: float) -> None:
+        """
+        Wait for the lease.
+
+        Raises:
+            ConversationBusy: The lease was not free within timeout seconds
+        """
+        deadline = asyncio.get_running_loop().time() + timeout
+        while not await self.try_acquire():
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                raise ConversationBusy(retry_after=max(1, round(self.ttl / 3)))
+            await self.wait(min(remaining, self.poll_interval))
+
+    async def wait(self, timeout: float) -> None:
+        """Sleep until a lease on the conversation is released here, or timeout."""
+        released = self._released.setdefault(self.conversation_id, asyncio.Event())
+        try:
+            await asyncio.wait_for(released.wait(), timeout)
+        except TimeoutError:
+            pass
+
+    async def release(self) -> None:
+        try:
+            async with self.open_session() as session:
+                await session.release_lease(self.owner)
+        finally:
+            released = self._released.pop(self.conversation_id, None)
+            if released is not None:
+                released.set()
+
+    async def _keep_alive(self) -> None:
+        while True:
+            await asyncio.sleep(self.ttl / 3)
+            try:
+                if not await self.try_acquire():
+                    logger.warning("Lost the lease on conversation %s", self.conversation_id)
+                    return
+            except Exception:
+                # The lease may still be extended on the next attempt
+                logger.exception("Extending the lease on conversation %s failed", self.conversation_id)
+
+    @asynccontextmanager
+    async def held(self) -> AsyncIterator[None]:
+        """Extend the acquired lease in the background until the block exits, then release it."""
+        keep_alive = asyncio.create_task(self._keep_alive())
+        try:
+            yield
+        finally:
+            keep_alive.cancel()
+            # Shielded, since a disconnected stream cancels every await of its body
+            with anyio.CancelScope(shield=True):
+                await self.release()
@@ -0,0 +1,294 @@
+"""Rule-based handling of formulaic logging messages that skips the agent.
+
+Messages such as "BP 128/82 this morning", "took 500mg metformin" or
+"weight 71.3 kg" are recorded directly through the managers. A message only
+takes the fast path when all of it is understood, every reading is
+physiologically plausible and a medication is one the user has logged before;
+anything else, including questions, negations, times other than "now", new
+medications and answers to a question the agent just asked, goes to the agent.
+"""
+import re
+import time
+from dataclasses import dataclass
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from managers.health_measurement_manager import HealthMeasurementManager
+from managers.medication_intake_manager import MedicationIntakeManager
+from managers.measurement_parser import ParsedMetric, parse_measurements
+from schemas.health_measurement_schemas import HealthMeasurementCreate
+from schemas.medication_intake_schemas import MedicationIntakeCreate
+
+
+MAX_FAST_PATH_LENGTH = 120
+
+# Time phrases that all mean the reading or dose is from around now
+_NOW_PHRASES = r"just now|right now|now|today|this morning|this afternoon|this evening|tonight"
+_TRAILING_TIME = re.compile(rf"^(.*?)[\s,]+({_NOW_PHRASES})\s*$")
+# Mass and volume units are left out: "500 ml of water" is not a medication
+_DOSE = r"\d+(?:\.\d+)?\s*(?:mg|mcg|iu|units?|tablets?|pills?|capsules?)"
+_MEDICATION = r"[a-z][a-z0-9\-]*(?: [a-z][a-z0-9\-]*){0,2}"
+_TOOK = r"(?:i\s+)?(?:took|have taken)"
+_DOSE_FIRST = re.compile(rf"^{_TOOK}\s+(?P<dose>{_DOSE})\s+(?:of\s+)?(?P<name>{_MEDICATION})$")
+_NAME_FIRST = re.compile(rf"^{_TOOK}\s+(?:my\s+)?(?P<name>{_MEDICATION})\s+(?P<dose>{_DOSE})$")
+# Anything hinting that the message is not a plain statement of a new event
+_AMBIGUOUS = re.compile(
+    r"\?|\b(?:not|no|didn'?t|don'?t|forgot|skip(?:ped)?|missed|yesterday|ago|last|should|"
+    r"can|could|would|will|remind|what|why|how|when|is|was|help|pain|feel)\b"
+)
+_SEGMENT_SEPARATOR = re.compile(r"[;\n]+|,(?!\d)|\s+and\s+")
+
+# Words that cannot be part of a medication name: function words, and food,
+# drinks and activities that follow "took" in everyday speech
+NOT_MEDICATION_WORDS = {
+    "a", "an", "the", "my", "some", "any", "more", "another", "one", "it", "this",
+    "that", "these", "those", "them", "of", "to", "for", "with", "and", "in", "on",
+    "at", "me", "your", "his", "her", "their", "our", "dose", "doses", "shot", "shots",
+    "water", "coffee", "tea", "juice", "milk", "soda", "beer", "wine", "alcohol",
+    "sugar", "salt", "food", "breakfast", "lunch", "dinner", "snack", "meal", "candy",
+    "chocolate", "drink", "drinks", "walk", "nap", "rest", "break", "bath", "shower",
+}
+
+# Metric code -> (lowest, highest) plausible value in the canonical unit. A
+# reading outside the range is more likely a typo than a measurement.
+METRIC_BOUNDS = {
+    "bp_systolic": (60, 260),
+    "bp_diastolic": (30, 160),
+    "heart_rate": (25, 250),
+    "weight": (2, 350),
+    "height": (40, 250),
+    "temperature": (30, 44),
+    "glucose": (20, 800),
+    "spo2": (50, 100),
+    "respiratory_rate": (4, 60),
+}
+
+METRIC_NAMES = {
+    "heart_rate": "heart rate",
+    "weight": "weight",
+    "height": "height",
+    "temperature": "temperature",
+    "glucose": "glucose",
+    "spo2": "oxygen saturation",
+    "respiratory_rate": "respiratory rate",
+}
+
+
+@dataclass(frozen=True)
+class MeasurementMatch:
+    measurements: str
+    metrics: list[ParsedMetric]
+    context: str | None
+
+
+@dataclass(frozen=True)
+class MedicationMatch:
+    medication_name: str
+    dosage: str
+    notes: str | None
+
+
+def _split_time(text: str) -> tuple[str, str | None]:
+    match = _TRAILING_TIME.match(text)
+    if match:
+        return match.group(1), match.group(2)
+    return text, None
+
+
+def _is_medication_name(name: str) -> bool:
+    return not any(word in NOT_MEDICATION_WORDS for word in name.split())
+
+
+def _is_plausible(metrics: list[ParsedMetric]) -> bool:
+    by_code = {metric.metric: metric.value for metric in metrics}
+    for code, value in by_code.items():
+        lowest, highest = METRIC_BOUNDS.get(code, (float("-inf"), float("inf")))
+        if not lowest <= value <= highest:
+            return False
+    if "bp_systolic" in by_code and by_code["bp_systolic"] <= by_code["bp_diastolic"]:
+        return False
+    return True
+
+
+def _item_text(item: dict) -> str:
+    content = item.get("content")
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return " ".join(
+            part.get("text") or "" for part in content if isinstance(part, dict)
+        )
+    return ""
+
+
+def asks_question(history: list[dict]) -> bool:
+    """
+    Whether the conversation ends with the agent asking the user something.
+
+    A short reply to a clarifying question only makes sense in that context,
+    so it must go to the agent even when it looks like a standalone record.
+
+    Args:
+        history: The latest items of the conversation history
+
+    Returns:
+        True if the last item is an assistant message containing a question
+    """
+    if not history or history[-1].get("role") != "assistant":
+        return False
+    return "?" in _item_text(history[-1])
+
+
+def match_fast_path(message: str) -> MeasurementMatch | MedicationMatch | None:
+    """
+    Recognize a message that can be recorded without the agent.
+
+    Args:
+        message: The user's chat message
+
+    Returns:
+        The recognized measurement or medication intake, or None when the
+        message needs the agent
+    """
+    text = message.strip().rstrip(".!").strip()
+    lowered = text.lower()
+    if not text or len(text) > MAX_FAST_PATH_LENGTH or _AMBIGUOUS.search(lowered):
+        return None
+
+    body, when = _split_time(lowered)
+    original_body = text[: len(body)]
+
+    medication = _DOSE_FIRST.match(body) or _NAME_FIRST.match(body)
+    if medication:
+        name = medication.group("name")
+        if not _is_medication_name(name):
+            return None
+        return MedicationMatch(
+            medication_name=name[0].upper() + name[1:],
+            dosage=re.sub(r"\s+", " ", medication.group("dose")),
+            notes=when,
+        )
+
+    # Every segment has to be a reading the parser understands. It skips readings
+    # without a unit where one is required, such as "weight 71".
+    metrics = []
+    for segment in _SEGMENT_SEPARATOR.split(body):
+        if not segment.strip():
+            continue
+        parsed = parse_measurements(segment)
+        if not parsed:
+            return None
+        metrics.extend(parsed)
+    if not metrics or len({metric.metric for metric in metrics}) != len(metrics):
+        return None
+    if not _is_plausible(metrics):
+        return None
+    return MeasurementMatch(measurements=original_body, metrics=metrics, context=when)
+
+
+def _format_value(value: float, unit: str) -> str:
+    return f"{round(value, 1):g}{'' if unit == '%' else ' '}{unit}"
+
+
+def _describe_metrics(metrics: list[ParsedMetric]) -> str:
+    by_code = {metric.metric: metric for metric in metrics}
+    parts = []
+    if "bp_systolic" in by_code and "bp_diastolic" in by_code:
+        parts.append(
+            f"blood pressure {by_code['bp_systolic'].value:g}/{by_code['bp_diastolic'].value:g} mmHg"
+        )
+    for metric in metrics:
+        if metric.metric in METRIC_NAMES:
+            parts.append(f"{METRIC_NAMES[metric.metric]} {_format_value(metric.value, metric.unit)}")
+    return " and ".join(parts)
+
+
+async def is_known_medication(
+    match: MedicationMatch, sessionmaker: async_sessionmaker[AsyncSession], user_id: str
+) -> bool:
+    """Whether the user has logged the matched medication before.
+
+    The matcher cannot tell a medication from any other words after "took", so
+    only medications already in the user's log are recorded without the agent.
+    """
+    async with sessionmaker() as db:
+        return await MedicationIntakeManager.has_user_medication_intake(
+            user_id, match.medication_name, db
+        )
+
+
+async def record_fast_path(
+    match: MeasurementMatch | MedicationMatch,
+    sessionmaker: async_sessionmaker[AsyncSession],
+    user_id: str,
+) -> str:
+    """
+    Record a recognized message through the managers.
+
+    Args:
+        match: The result of `match_fast_path`
+        sessionmaker: Factory of database sessions
+        user_id: The ID of the user
+
+    Returns:
+        The confirmation shown to the user
+    """
+    async with sessionmaker() as db:
+        if isinstance(match, MedicationMatch):
+            await MedicationIntakeManager.insert_medication_intake(
+                MedicationIntakeCreate(
+                    medication_name=match.medication_name,
+                    dosage=match.dosage,
+                    notes=match.notes,
+                ),
+                user_id,
+                db,
+            )
+            return (
+                f"I've saved {match.dosage} of {match.medication_name} to your "
+                "medication log."
+            )
+
+        await HealthMeasurementManager.insert_health_measurement(
+            HealthMeasurementCreate(measurements=match.measurements, context=match.context),
+            user_id,
+            db,
+        )
+        return f"I've saved your {_describe_metrics(match.metrics)} to your health record."
+
+
+class FastPathStats:
+    """Per-worker counters comparing fast-path replies with agent runs."""
+
+    def __init__(self):
+        self.hits = 0
+        self.hit_seconds = 0.0
+        self.agent_runs = 0
+        self.agent_seconds = 0.0
+
+    def record_hit(self, started: float) -> None:
+        self.hits += 1
+        self.hit_seconds += time.perf_counter() - started
+
+    def record_agent_run(self, started: float) -> None:
+        self.agent_runs += 1
+        self.agent_seconds += time.perf_counter() - started
+
+    def summary(self) -> dict:
+        messages = self.hits + self.agent_runs
+        mean_hit = self.hit_seconds / self.hits if self.hits else None
+        mean_agent = self.agent_seconds / self.agent_runs if self.agent_runs else None
+        saved = None
+        if mean_hit is not None and mean_agent is not None:
+            saved = self.hits * (mean_agent - mean_hit)
+        return {
+            "messages": messages,
+            "hits": self.hits,
+            "hit_rate": self.hits / messages if messages else None,
+            "mean_hit_seconds": mean_hit,
+            "mean_agent_seconds": mean_agent,
+            "estimated_seconds_saved": saved,
+        }
+
+
+fast_path_stats = FastPathStats()
@@ -0,0 +1,53 @@
+from agents import RunContextWrapper
+
+from ai.context import AgentContext
+from schemas.health_snapshot_schemas import HealthSnapshot
+
+
+def _date(value) -> str:
+    return value.strftime("%Y-%m-%d")
+
+
+def format_health_snapshot(snapshot: HealthSnapshot) -> str:
+    """Render a snapshot as the compact instructions section the agent reads."""
+    lines = ["📋 What You Already Know About This User"]
+
+    if snapshot.conditions:
+        lines.append("Active conditions: " + "; ".join(
+            f"{c.name}{f' ({c.severity})' if c.severity else ''} since {_date(c.event_date)}"
+            for c in snapshot.conditions
+        ))
+    if snapshot.medications:
+        lines.append("Current medications: " + "; ".join(
+            f"{m.medication_name}{f' {m.dosage}' if m.dosage else ''}, last taken {_date(m.last_taken_at)}"
+            for m in snapshot.medications
+        ))
+    if snapshot.vitals:
+        lines.append("Latest vitals: " + "; ".join(
+            f"{v.metric} {v.value:g} {v.unit} on {_date(v.recorded_at)}"
+            for v in snapshot.vitals
+        ))
+    if snapshot.visits:
+        lines.append("Recent doctor visits: " + "; ".join(
+            f"{_date(v.visit_datetime)} {v.reason}"
+            f"{f' with {v.doctor_name}' if v.doctor_name else ''}"
+            f"{f', diagnosis: {v.diagnosis}' if v.diagnosis else ''}"
+            for v in snapshot.visits
+        ))
+
+    if len(lines) == 1:
+        lines.append("No health records yet.")
+    else:
+        lines.append(
+            "Use these records to link new events to existing ones and to skip questions "
+            "they already answer. Do not repeat them back unless the user asks."
+        )
+    return "\n".join(lines)
+
+
+async def health_snapshot_instructions(
+    wrapper: RunContextWrapper[AgentContext],
+) -> str | None:
+    if wrapper.context.health_snapshot is None:
+        return None
+    return format_health_snapshot(await wrapper.context.health_snapshot)
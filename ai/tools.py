@@ -1,4 +1,5 @@
 from datetime import datetime, UTC
+from typing import Literal
 
 from agents import function_tool, RunContextWrapper
 
@@ -8,17 +9,33 @@ from managers.condition_manager import ConditionManager
 from managers.health_measurement_manager import HealthMeasurementManager
 from managers.diagnostic_procedure_manager import DiagnosticProcedureManager
 from managers.medication_intake_manager import MedicationIntakeManager
-from schemas.visit_schemas import VisitCreate, Visit, VisitUpdate
-from schemas.condition_schemas import ConditionCreate, Condition
+from managers.health_metric_manager import HealthMetricManager
+from managers.search import DEFAULT_SEARCH_LIMIT
+from schemas.visit_schemas import VisitCreate, Visit, VisitUpdate, VisitSummary
+from schemas.condition_schemas import (
+    ConditionCreate,
+    Condition,
+    ConditionSummary,
+    ConditionUpdate,
+)
+from schemas.health_metric_schemas import MetricReading
 from schemas.health_measurement_schemas import (
     HealthMeasurement,
     HealthMeasurementCreate,
+    HealthMeasurementUpdate,
 )
 from schemas.diagnostic_procedure_schemas import (
     DiagnosticProcedureCreate,
     DiagnosticProcedure,
+    DiagnosticProcedureSummary,
+    DiagnosticProcedureUpdate,
+)
+from schemas.medication_intake_schemas import (
+    MedicationIntake,
+    MedicationIntakeCreate,
+    MedicationIntakeSummary,
+    MedicationIntakeUpdate,
 )
-from schemas.medication_intake_schemas import MedicationIntake, MedicationIntakeCreate
 
 
 @function_tool
@@ -59,9 +76,10 @@ async def record_doctor_visit(
         DatabaseError: If the visit record cannot be saved to the database.
         ValidationError: If required fields are missing or invalid.
     """
-    return await VisitManager.insert_doctor_visit(
-        visit_data, wrapper.context.user_id, wrapper.context.db
-    )
+    async with wrapper.context.session() as db:
+        return await VisitManager.insert_doctor_visit(
+            visit_data, wrapper.context.user_id, db
+        )
 
 
 @function_tool
@@ -94,9 +112,10 @@ async def update_doctor_visit_details(
         DatabaseError: If the update cannot be performed.
         PermissionError: If the user doesn't own the visit record being updated.
     """
-    return await VisitManager.update_doctor_visit(
-        visit_id, visit_updates, wrapper.context.user_id, wrapper.context.db
-    )
+    async with wrapper.context.session() as db:
+        return await VisitManager.update_doctor_visit(
+            visit_id, visit_updates, wrapper.context.user_id, db
+        )
 
 
 @function_tool
@@ -131,9 +150,10 @@ async def report_condition(
     Raises:
         DatabaseError: If the condition cannot be saved to the database.
     """
-    return await ConditionManager.insert_condition(
-        condition_data, wrapper.context.user_id, wrapper.context.db
-    )
+    async with wrapper.context.session() as db:
+        return await ConditionManager.insert_condition(
+            condition_data, wrapper.context.user_id, db
+        )
 
 
 @function_tool
@@ -169,9 +189,10 @@ async def record_health_measurement(
         DatabaseError: If the measurement cannot be saved to the database.
         ValidationError: If required measurement data is missing or invalid.
     """
-    return await HealthMeasurementManager.insert_health_measurement(
-        measurement_data, wrapper.context.user_id, wrapper.context.db
-    )
+    async with wrapper.context.session() as db:
+        return await HealthMeasurementManager.insert_health_measurement(
+            measurement_data, wrapper.context.user_id, db
+        )
 
 
 @function_tool
@@ -209,9 +230,10 @@ async def record_diagnostic_procedure(
         DatabaseError: If the procedure record cannot be saved to the database.
         ValidationError: If required procedure information is missing or invalid.
     """
-    return await DiagnosticProcedureManager.insert_diagnostic_procedure(
-        procedure_data, wrapper.context.user_id, wrapper.context.db
-    )
+    async with wrapper.context.session() as db:
+        return await DiagnosticProcedureManager.insert_diagnostic_procedure(
+            procedure_data, wrapper.context.user_id, db
+        )
 
 
 @function_tool
@@ -250,9 +272,298 @@ async def record_medication_intake(
         ValidationError: If required medication information is missing or invalid.
         ReferenceError: If condition_id is provided but the condition doesn't exist or belong to the user.
     """
-    return await MedicationIntakeManager.insert_medication_intake(
-        intake_data, wrapper.context.user_id, wrapper.context.db
-    )
+    async with wrapper.context.session() as db:
+        return await MedicationIntakeManager.insert_medication_intake(
+            intake_data, wrapper.context.user_id, db
+        )
+
+
+@function_tool
+async def update_condition_details(
+    wrapper: RunContextWrapper[AgentContext],
+    condition_id: str,
+    condition_updates: ConditionUpdate,
+) -> Condition | None:
+    """
+    Updates an existing health condition record with new information or corrections.
+
+    Use this tool when users report how a previously recorded condition has developed,
+    or want to correct its details.
+
+    Examples of when to use:
+    - "My headache from yesterday is gone now" → outcome="resolved"
+    - "Actually the back pain is severe, not mild" → severity="severe"
+
+    Args:
+        condition_id (str): The unique identifier of the condition to update.
+        condition_updates (ConditionUpdate): Fields to update (only non-None values will be updated).
+
+    Returns:
+        Condition: The updated condition record, or None if the condition was not found.
+    """
+    async with wrapper.context.session() as db:
+        return await ConditionManager.update_condition(
+            condition_id, condition_updates, wrapper.context.user_id, db
+        )
+
+
+@function_tool
+async def update_health_measurement_details(
+    wrapper: RunContextWrapper[AgentContext],
+    measurement_id: str,
+    measurement_updates: HealthMeasurementUpdate,
+) -> HealthMeasurement | None:
+    """
+    Updates an existing health measurement record with corrections or extra context.
+
+    Examples of when to use:
+    - "Sorry, my blood pressure was 130/85, not 120/80" → measurements="BP: 130/85"
+    - "That reading was taken after my run" → context="after exercise"
+
+    Args:
+        measurement_id (str): The unique identifier of the measurement to update.
+        measurement_updates (HealthMeasurementUpdate): Fields to update (only non-None values will be updated).
+
+    Returns:
+        HealthMeasurement: The updated measurement record, or None if the measurement was not found.
+    """
+    async with wrapper.context.session() as db:
+        return await HealthMeasurementManager.update_health_measurement(
+            measurement_id, measurement_updates, wrapper.context.user_id, db
+        )
+
+
+@function_tool
+async def update_diagnostic_procedure_details(
+    wrapper: RunContextWrapper[AgentContext],
+    procedure_id: str,
+    procedure_updates: DiagnosticProcedureUpdate,
+) -> DiagnosticProcedure | None:
+    """
+    Updates an existing diagnostic procedure record, typically to add results once they arrive.
+
+    Examples of when to use:
+    - "My blood work results came back normal" → results="normal"
+    - "The MRI was done at City Hospital" → provider="City Hospital"
+
+    Args:
+        procedure_id (str): The unique identifier of the procedure to update.
+        procedure_updates (DiagnosticProcedureUpdate): Fields to update (only non-None values will be updated).
+
+    Returns:
+        DiagnosticProcedure: The updated procedure record, or None if the procedure was not found.
+    """
+    async with wrapper.context.session() as db:
+        return await DiagnosticProcedureManager.update_diagnostic_procedure(
+            procedure_id, procedure_updates, wrapper.context.user_id, db
+        )
+
+
+@function_tool
+async def update_medication_intake_details(
+    wrapper: RunContextWrapper[AgentContext],
+    intake_id: str,
+    intake_updates: MedicationIntakeUpdate,
+) -> MedicationIntake | None:
+    """
+    Updates an existing medication intake record with corrections or side effects.
+
+    Examples of when to use:
+    - "It was 400mg of ibuprofen, not 200mg" → dosage="400mg"
+    - "The pill made me dizzy" → notes="caused dizziness"
+
+    Args:
+        intake_id (str): The unique identifier of the medication intake to update.
+        intake_updates (MedicationIntakeUpdate): Fields to update (only non-None values will be updated).
+
+    Returns:
+        MedicationIntake: The updated intake record, or None if the intake was not found.
+    """
+    async with wrapper.context.session() as db:
+        return await MedicationIntakeManager.update_medication_intake(
+            intake_id, intake_updates, wrapper.context.user_id, db
+        )
+
+
+@function_tool
+async def find_conditions(
+    wrapper: RunContextWrapper[AgentContext],
+    name: str | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    limit: int = DEFAULT_SEARCH_LIMIT,
+) -> list[ConditionSummary]:
+    """
+    Looks up the user's recorded conditions, most recent first.
+
+    Use it to check what the user has already reported, or to find a condition's id
+    before updating it or linking a medication to it. Filter as narrowly as the
+    question allows instead of listing everything.
+
+    Examples of when to use:
+    - "Is my migraine from last week recorded?" → name="migraine", start=a week ago
+    - "What illnesses did I have this year?" → start=January 1st
+
+    Args:
+        name: Part of the condition name to match, case-insensitive
+        start: Only conditions that started at or after this time
+        end: Only conditions that started before this time
+        limit: Maximum number of conditions to return (at most 50)
+
+    Returns:
+        list[ConditionSummary]: Matching conditions with id, date, name, severity and outcome.
+    """
+    async with wrapper.context.session() as db:
+        return await ConditionManager.search_user_conditions(
+            wrapper.context.user_id, db, name=name, start=start, end=end, limit=limit
+        )
+
+
+@function_tool
+async def find_doctor_visits(
+    wrapper: RunContextWrapper[AgentContext],
+    text: str | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    limit: int = DEFAULT_SEARCH_LIMIT,
+) -> list[VisitSummary]:
+    """
+    Looks up the user's doctor visits, most recent first.
+
+    Examples of when to use:
+    - "When did I last see Dr. Smith?" → text="Smith", limit=1
+    - "What did the cardiologist say?" → text="cardio"
+
+    Args:
+        text: Part of the visit reason, doctor name or diagnosis to match, case-insensitive
+        start: Only visits at or after this time
+        end: Only visits before this time
+        limit: Maximum number of visits to return (at most 50)
+
+    Returns:
+        list[VisitSummary]: Matching visits with id, date, reason, doctor, diagnosis and treatment.
+    """
+    async with wrapper.context.session() as db:
+        return await VisitManager.search_user_doctor_visits(
+            wrapper.context.user_id, db, text=text, start=start, end=end, limit=limit
+        )
+
+
+@function_tool
+async def find_diagnostic_procedures(
+    wrapper: RunContextWrapper[AgentContext],
+    name: str | None = None,
+    procedure_type: str | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    limit: int = DEFAULT_SEARCH_LIMIT,
+) -> list[DiagnosticProcedureSummary]:
+    """
+    Looks up the user's tests and diagnostic procedures, most recent first.
+
+    Examples of when to use:
+    - "What were my last blood test results?" → name="blood", limit=1
+    - "Have I had any imaging done this year?" → procedure_type="imaging", start=January 1st
+
+    Args:
+        name: Part of the procedure name to match, case-insensitive
+        procedure_type: Exact procedure type, e.g. "lab", "imaging", "biopsy", "endoscopy"
+        start: Only procedures at or after this time
+        end: Only procedures before this time
+        limit: Maximum number of procedures to return (at most 50)
+
+    Returns:
+        list[DiagnosticProcedureSummary]: Matching procedures with id, date, name, type and results.
+    """
+    async with wrapper.context.session() as db:
+        return await DiagnosticProcedureManager.search_user_diagnostic_procedures(
+            wrapper.context.user_id,
+            db,
+            name=name,
+            procedure_type=procedure_type,
+            start=start,
+            end=end,
+            limit=limit,
+        )
+
+
+@function_tool
+async def find_medication_intakes(
+    wrapper: RunContextWrapper[AgentContext],
+    medication_name: str | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    limit: int = DEFAULT_SEARCH_LIMIT,
+) -> list[MedicationIntakeSummary]:
+    """
+    Looks up the user's medication intakes, most recent first.
+
+    Examples of when to use:
+    - "When did I last take ibuprofen?" → medication_name="ibuprofen", limit=1
+    - "What did I take yesterday?" → start=yesterday 00:00, end=today 00:00
+
+    Args:
+        medication_name: Part of the medication name to match, case-insensitive
+        start: Only intakes at or after this time
+        end: Only intakes before this time
+        limit: Maximum number of intakes to return (at most 50)
+
+    Returns:
+        list[MedicationIntakeSummary]: Matching intakes with id, time, medication, dosage and reason.
+    """
+    async with wrapper.context.session() as db:
+        return await MedicationIntakeManager.search_user_medication_intakes(
+            wrapper.context.user_id,
+            db,
+            medication_name=medication_name,
+            start=start,
+            end=end,
+            limit=limit,
+        )
+
+
+@function_tool
+async def find_metric_readings(
+    wrapper: RunContextWrapper[AgentContext],
+    metric: Literal[
+        "bp_systolic",
+        "bp_diastolic",
+        "heart_rate",
+        "weight",
+        "height",
+        "temperature",
+        "glucose",
+        "spo2",
+        "respiratory_rate",
+    ] | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    limit: int = DEFAULT_SEARCH_LIMIT,
+) -> list[MetricReading]:
+    """
+    Looks up the user's measured values, most recent first, in canonical units.
+
+    Readings are parsed out of recorded health measurements: blood pressure in mmHg,
+    heart rate in bpm, weight in kg, height in cm, temperature in C, glucose in mg/dL,
+    SpO2 in % and respiratory rate in breaths/min.
+
+    Examples of when to use:
+    - "What was my blood pressure this morning?" → metric=None, start=today (systolic and diastolic are separate metrics)
+    - "How has my weight changed this month?" → metric="weight", start=first of the month
+
+    Args:
+        metric: The metric to return, or None for all metrics
+        start: Only readings recorded at or after this time
+        end: Only readings recorded before this time
+        limit: Maximum number of readings to return (at most 50)
+
+    Returns:
+        list[MetricReading]: Matching readings with the source measurement id, metric, value, unit and time.
+    """
+    async with wrapper.context.session() as db:
+        return await HealthMetricManager.search_user_metric_readings(
+            wrapper.context.user_id, db, metric=metric, start=start, end=end, limit=limit
+        )
 
 
 @function_tool
@@ -267,5 +578,15 @@ tools = [
     record_doctor_visit,
     record_health_measurement,
     report_condition,
+    update_doctor_visit_details,
+    update_condition_details,
+    update_health_measurement_details,
+    update_diagnostic_procedure_details,
+    update_medication_intake_details,
+    find_conditions,
+    find_doctor_visits,
+    find_diagnostic_procedures,
+    find_medication_intakes,
+    find_metric_readings,
     get_real_current_datetime,
 ]
@@ -0,0 +1,66 @@
+"""Compare building the chat agent per request with reusing the shared one.
+
+Also times deriving the JSON schemas of the tool argument models, which
+function_tool does once at import.
+
+Usage:
+    python -m benchmarks.agent_construction [--iterations 10000]
+"""
+import argparse
+import time
+
+from agents import Agent
+
+from ai.ai_agents import agent_instructions, agent_registry
+from ai.tools import tools
+from schemas.visit_schemas import VisitCreate, VisitUpdate
+from schemas.condition_schemas import ConditionCreate
+from schemas.health_measurement_schemas import HealthMeasurementCreate
+from schemas.diagnostic_procedure_schemas import DiagnosticProcedureCreate
+from schemas.medication_intake_schemas import MedicationIntakeCreate
+
+
+TOOL_ARGUMENT_MODELS = (
+    VisitCreate,
+    VisitUpdate,
+    ConditionCreate,
+    HealthMeasurementCreate,
+    DiagnosticProcedureCreate,
+    MedicationIntakeCreate,
+)
+
+
+def per_call_us(fn, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) / iterations * 1_000_000
+
+
+def main(iterations: int) -> None:
+    agent_registry.build()
+
+    construct = per_call_us(
+        lambda: Agent(
+            name="Personal health data manager",
+            instructions=agent_instructions,
+            tools=list(tools),
+        ),
+        iterations,
+    )
+    shared = per_call_us(agent_registry.get, iterations)
+    schemas = per_call_us(
+        lambda: [model.model_json_schema() for model in TOOL_ARGUMENT_MODELS],
+        max(iterations // 100, 1),
+    )
+
+    print(f"new Agent per request:     {construct:10.2f} us")
+    print(f"shared agent lookup:       {shared:10.2f} us")
+    print(f"tool argument schemas:     {schemas:10.2f} us")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=10000)
+    args = parser.parse_args()
+    main(args.iterations)
@@ -0,0 +1,125 @@
+"""Count database round trips and latency per manager insert.
+
+Each insert_* method is called repeatedly for a throwaway user, counting the
+BEGIN, statement and COMMIT round trips it makes. The former ORM
+add/commit/refresh path is measured alongside for comparison.
+
+Usage:
+    python -m benchmarks.insert_round_trips [--iterations 200]
+
+Runs against TEST_DB_NAME when it is set, otherwise against DB_NAME.
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime
+from uuid import UUID, uuid4
+
+from sqlalchemy import delete, event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from config import DATABASE_URL, TEST_DATABASE_URL, TEST_DB_NAME
+from models.user_model import UserModel
+from models.visit_model import DoctorVisitModel
+from models.condition_model import ConditionModel
+from models.health_measurement_model import HealthMeasurementModel
+from models.health_metric_model import HealthMetricModel
+from models.diagnostic_procedure_model import DiagnosticProcedureModel
+from models.medication_intake_model import MedicationIntakeModel
+from managers.visit_manager import VisitManager
+from managers.condition_manager import ConditionManager
+from managers.health_measurement_manager import HealthMeasurementManager
+from managers.diagnostic_procedure_manager import DiagnosticProcedureManager
+from managers.medication_intake_manager import MedicationIntakeManager
+from schemas.visit_schemas import Visit, VisitCreate
+from schemas.condition_schemas import ConditionCreate
+from schemas.health_measurement_schemas import HealthMeasurementCreate
+from schemas.diagnostic_procedure_schemas import DiagnosticProcedureCreate
+from schemas.medication_intake_schemas import MedicationIntakeCreate
+
+
+async def legacy_insert_doctor_visit(
+    visit_data: VisitCreate, user_id: str, db: AsyncSession
+) -> Visit:
+    # The add/commit/refresh path the managers used before INSERT ... RETURNING
+    visit = DoctorVisitModel(**visit_data.model_dump(), user_id=UUID(user_id))
+    db.add(visit)
+    await db.commit()
+    await db.refresh(visit)
+    return Visit.model_validate(visit)
+
+
+WRITES = {
+    "legacy insert_doctor_visit": (
+        legacy_insert_doctor_visit,
+        VisitCreate(visit_datetime=datetime.now(), reason="routine checkup"),
+    ),
+    "insert_doctor_visit": (
+        VisitManager.insert_doctor_visit,
+        VisitCreate(visit_datetime=datetime.now(), reason="routine checkup"),
+    ),
+    "insert_condition": (ConditionManager.insert_condition, ConditionCreate(name="headache")),
+    "insert_health_measurement": (
+        HealthMeasurementManager.insert_health_measurement,
+        HealthMeasurementCreate(measurements="BP: 120/80"),
+    ),
+    "insert_diagnostic_procedure": (
+        DiagnosticProcedureManager.insert_diagnostic_procedure,
+        DiagnosticProcedureCreate(name="Complete Blood Count"),
+    ),
+    "insert_medication_intake": (
+        MedicationIntakeManager.insert_medication_intake,
+        MedicationIntakeCreate(medication_name="Ibuprofen", dosage="200mg"),
+    ),
+}
+
+
+async def main(iterations: int) -> None:
+    engine = create_async_engine(TEST_DATABASE_URL if TEST_DB_NAME else DATABASE_URL)
+    round_trips = 0
+
+    def count(*args, **kwargs):
+        nonlocal round_trips
+        round_trips += 1
+
+    async with AsyncSession(engine, expire_on_commit=False) as db:
+        user = UserModel(id=uuid4(), email=f"bench-{uuid4()}@example.com")
+        db.add(user)
+        await db.commit()
+        user_id = str(user.id)
+
+        for name in ("begin", "commit", "before_cursor_execute"):
+            event.listen(engine.sync_engine, name, count)
+        try:
+            for label, (write, data) in WRITES.items():
+                round_trips = 0
+                started = time.perf_counter()
+                for _ in range(iterations):
+                    await write(data, user_id, db)
+                elapsed = time.perf_counter() - started
+                print(
+                    f"{label:30} {round_trips / iterations:4.1f} round trips"
+                    f" {elapsed / iterations * 1000:7.2f} ms/write"
+                )
+        finally:
+            for name in ("begin", "commit", "before_cursor_execute"):
+                event.remove(engine.sync_engine, name, count)
+            for model in (
+                HealthMetricModel,
+                HealthMeasurementModel,
+                MedicationIntakeModel,
+                ConditionModel,
+                DoctorVisitModel,
+                DiagnosticProcedureModel,
+            ):
+                await db.execute(delete(model).where(model.user_id == user.id))
+            await db.execute(delete(UserModel).where(UserModel.id == user.id))
+            await db.commit()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.iterations))
@@ -0,0 +1,66 @@
+"""Compare rows/sec of single-row and bulk health measurement inserts.
+
+Creates a throwaway user, inserts the same readings through both write paths
+and deletes everything it wrote afterwards.
+
+Usage:
+    python -m benchmarks.measurement_inserts [--rows 1000]
+
+Runs against TEST_DB_NAME when it is set, otherwise against DB_NAME.
+"""
+import argparse
+import asyncio
+import time
+from uuid import uuid4
+
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from config import DATABASE_URL, TEST_DATABASE_URL, TEST_DB_NAME
+from models.user_model import UserModel
+from models.health_measurement_model import HealthMeasurementModel
+from models.health_metric_model import HealthMetricModel
+from managers.health_measurement_manager import HealthMeasurementManager
+from schemas.health_measurement_schemas import HealthMeasurementCreate
+
+
+async def main(rows: int) -> None:
+    engine = create_async_engine(TEST_DATABASE_URL if TEST_DB_NAME else DATABASE_URL)
+    readings = [
+        HealthMeasurementCreate(measurements=f"BP: {110 + i % 30}/{70 + i % 15}, HR: {60 + i % 40} bpm")
+        for i in range(rows)
+    ]
+
+    async with AsyncSession(engine, expire_on_commit=False) as db:
+        user = UserModel(id=uuid4(), email=f"bench-{uuid4()}@example.com")
+        db.add(user)
+        await db.commit()
+        user_id = str(user.id)
+
+        try:
+            started = time.perf_counter()
+            for reading in readings:
+                await HealthMeasurementManager.insert_health_measurement(reading, user_id, db)
+            single = time.perf_counter() - started
+
+            started = time.perf_counter()
+            await HealthMeasurementManager.insert_health_measurements_bulk(readings, user_id, db)
+            bulk = time.perf_counter() - started
+        finally:
+            await db.execute(delete(HealthMetricModel).where(HealthMetricModel.user_id == user.id))
+            await db.execute(
+                delete(HealthMeasurementModel).where(HealthMeasurementModel.user_id == user.id)
+            )
+            await db.execute(delete(UserModel).where(UserModel.id == user.id))
+            await db.commit()
+    await engine.dispose()
+
+    print(f"single-row: {rows / single:10.0f} rows/sec ({single:.2f}s for {rows} rows)")
+    print(f"bulk:       {rows / bulk:10.0f} rows/sec ({bulk:.2f}s for {rows} rows)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows))
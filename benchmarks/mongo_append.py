@@ -0,0 +1,120 @@
+"""Compare round trips and latency of appending a chat turn to MongoDBSession.
+
+"sequential" replays the previous add_items: find_one on the session, insert_one
+when it is new, insert_many for the messages and update_one for updated_at.
+"direct" is add_items without buffering, and "write-behind" buffers the turn's
+add_items calls and writes them with one flush.
+
+Usage:
+    python -m benchmarks.mongo_append [--uri mongodb://localhost:27017]
+        [--turns 500] [--calls-per-turn 3]
+
+Writes to a throwaway database that is dropped afterwards.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from datetime import datetime, UTC
+
+from pymongo import AsyncMongoClient
+from pymongo.monitoring import CommandListener
+
+from mongodb_session import MongoDBSession
+
+
+class CommandCounter(CommandListener):
+    def __init__(self):
+        self.count = 0
+
+    def started(self, event):
+        self.count += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+async def sequential_add_items(session: MongoDBSession, items: list) -> None:
+    existing_session_entity = await session.sessions_collection.find_one(
+        {"session_id": session.session_id}
+    )
+    if not existing_session_entity:
+        await session.sessions_collection.insert_one(
+            {
+                "session_id": session.session_id,
+                "created_at": datetime.now(UTC),
+                "updated_at": datetime.now(UTC),
+            }
+        )
+    await session.messages_collection.insert_many(
+        [
+            {
+                "session_id": session.session_id,
+                "message_data": json.dumps(item),
+                "created_at": datetime.now(UTC),
+            }
+            for item in items
+        ]
+    )
+    await session.sessions_collection.update_one(
+        {"session_id": session.session_id}, {"$set": {"updated_at": datetime.now(UTC)}}
+    )
+
+
+def turn_items(turn: int, calls: int) -> list[list[dict]]:
+    return [
+        [
+            {"role": "user" if call == 0 else "assistant", "content": f"turn {turn} part {call}"}
+        ]
+        for call in range(calls)
+    ]
+
+
+async def run_mode(db, counter: CommandCounter, mode: str, turns: int, calls: int) -> None:
+    timings = []
+    commands_before = counter.count
+    for turn in range(turns):
+        session = MongoDBSession(
+            f"{mode}-{turn % 50}", db, write_behind=mode == "write-behind"
+        )
+        started = time.perf_counter()
+        for items in turn_items(turn, calls):
+            if mode == "sequential":
+                await sequential_add_items(session, items)
+            else:
+                await session.add_items(items)
+        await session.flush()
+        timings.append((time.perf_counter() - started) * 1000)
+
+    timings.sort()
+    round_trips = (counter.count - commands_before) / turns
+    print(
+        f"{mode:>12}: {round_trips:.1f} commands per turn, "
+        f"p50 {statistics.median(timings):.2f} ms, p95 {timings[int(turns * 0.95) - 1]:.2f} ms"
+    )
+
+
+async def main(uri: str, turns: int, calls: int) -> None:
+    counter = CommandCounter()
+    client = AsyncMongoClient(uri, event_listeners=[counter])
+    db = client["mongo_append_benchmark"]
+    try:
+        await MongoDBSession.init_collections(db)
+        for mode in ("sequential", "direct", "write-behind"):
+            await run_mode(db, counter, mode, turns, calls)
+    finally:
+        await client.drop_database("mongo_append_benchmark")
+        await client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--uri", default="mongodb://localhost:27017")
+    parser.add_argument("--turns", type=int, default=500)
+    parser.add_argument("--calls-per-turn", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(main(args.uri, args.turns, args.calls_per_turn))
@@ -0,0 +1,78 @@
+"""Measure history load latency of MongoDBSession against a seeded local mongod.
+
+Seeds `--messages` messages spread over `--sessions` conversations, then times
+get_items for one conversation. Latency should stay flat as --messages grows.
+--legacy seeds JSON string rows, to compare with native BSON messages.
+
+Usage:
+    python -m benchmarks.mongo_history [--uri mongodb://localhost:27017]
+        [--messages 1000000] [--sessions 10000] [--runs 200] [--legacy]
+
+Writes to a throwaway database that is dropped afterwards.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from datetime import datetime, timedelta, UTC
+
+from pymongo import AsyncMongoClient
+
+from mongodb_session import MESSAGE_SCHEMA_VERSION, MongoDBSession
+
+
+async def seed(session: MongoDBSession, messages: int, sessions: int, legacy: bool) -> None:
+    started = datetime.now(UTC)
+    batch = []
+    for i in range(messages):
+        item = {"role": "user" if i % 2 == 0 else "assistant", "content": f"message {i}"}
+        doc = {
+            "session_id": f"session-{i % sessions}",
+            "created_at": started + timedelta(milliseconds=i),
+        }
+        if legacy:
+            doc["message_data"] = json.dumps(item)
+        else:
+            doc["message_data"] = item
+            doc["schema_version"] = MESSAGE_SCHEMA_VERSION
+        batch.append(doc)
+        if len(batch) == 10000:
+            await session.messages_collection.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        await session.messages_collection.insert_many(batch, ordered=False)
+
+
+async def main(uri: str, messages: int, sessions: int, runs: int, legacy: bool) -> None:
+    client = AsyncMongoClient(uri)
+    db = client["mongo_history_benchmark"]
+    session = MongoDBSession("session-0", db, history_limit=100, token_budget=8000)
+    try:
+        await MongoDBSession.init_collections(db)
+        await seed(session, messages, sessions, legacy)
+
+        timings = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            items = await session.get_items()
+            timings.append((time.perf_counter() - started) * 1000)
+
+        timings.sort()
+        storage = "JSON string" if legacy else "BSON"
+        print(f"{messages} {storage} messages, {sessions} sessions, {len(items)} items per load")
+        print(f"p50 {statistics.median(timings):.2f} ms, p95 {timings[int(runs * 0.95) - 1]:.2f} ms")
+    finally:
+        await client.drop_database("mongo_history_benchmark")
+        await client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--uri", default="mongodb://localhost:27017")
+    parser.add_argument("--messages", type=int, default=1_000_000)
+    parser.add_argument("--sessions", type=int, default=10_000)
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--legacy", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(main(args.uri, args.messages, args.sessions, args.runs, args.legacy))
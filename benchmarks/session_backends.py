@@ -0,0 +1,111 @@
+"""Compare chat history latency of the Mongo and Postgres session backends.
+
+For each backend, appends `--turns` turns of `--items-per-turn` items to a
+fresh conversation, timing add_items and the get_items that loads the history
+before each turn, as the Runner does.
+
+Usage:
+    python -m benchmarks.session_backends [--uri mongodb://localhost:27017]
+        [--turns 200] [--items-per-turn 4]
+
+Postgres runs against TEST_DB_NAME when it is set, otherwise against DB_NAME,
+and needs migrations/0005_agent_sessions.sql and
+0007_agent_session_compaction.sql applied. Mongo writes to a
+throwaway database. Both conversations are deleted afterwards.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from uuid import uuid4
+
+from pymongo import AsyncMongoClient
+
+from config import (
+    CHAT_HISTORY_LIMIT,
+    CHAT_HISTORY_TOKEN_BUDGET,
+    DATABASE_URL,
+    TEST_DATABASE_URL,
+    TEST_DB_NAME,
+)
+from db import create_engine, create_sessionmaker
+from mongodb_session import MongoDBSession
+from sql_alchemy_session import SQLAlchemySession
+
+
+def turn_items(turn: int, count: int) -> list[dict]:
+    items = [{"role": "user", "content": f"turn {turn}: BP 120/80 this morning"}]
+    items.extend(
+        {"role": "assistant", "content": f"turn {turn} reply {i}: I've saved that reading."}
+        for i in range(count - 1)
+    )
+    return items
+
+
+def summary(timings: list[float]) -> str:
+    timings = sorted(timings)
+    return (
+        f"p50 {statistics.median(timings):.2f} ms, "
+        f"p95 {timings[int(len(timings) * 0.95) - 1]:.2f} ms"
+    )
+
+
+async def run_backend(name: str, session, turns: int, items_per_turn: int) -> None:
+    reads, writes = [], []
+    for turn in range(turns):
+        started = time.perf_counter()
+        await session.get_items()
+        reads.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        await session.add_items(turn_items(turn, items_per_turn))
+        await session.flush()
+        writes.append((time.perf_counter() - started) * 1000)
+
+    await session.clear_session()
+    print(f"{name:>8}: get_items {summary(reads)}; add_items {summary(writes)}")
+
+
+async def main(uri: str, turns: int, items_per_turn: int) -> None:
+    client = AsyncMongoClient(uri)
+    nosql_db = client["session_backends_benchmark"]
+    engine = create_engine(TEST_DATABASE_URL if TEST_DB_NAME else DATABASE_URL)
+    try:
+        await MongoDBSession.init_collections(nosql_db)
+        await run_backend(
+            "mongo",
+            MongoDBSession(
+                str(uuid4()),
+                nosql_db,
+                history_limit=CHAT_HISTORY_LIMIT,
+                token_budget=CHAT_HISTORY_TOKEN_BUDGET,
+            ),
+            turns,
+            items_per_turn,
+        )
+
+        async with create_sessionmaker(engine)() as db:
+            await run_backend(
+                "postgres",
+                SQLAlchemySession(
+                    str(uuid4()),
+                    db,
+                    history_limit=CHAT_HISTORY_LIMIT,
+                    token_budget=CHAT_HISTORY_TOKEN_BUDGET,
+                ),
+                turns,
+                items_per_turn,
+            )
+    finally:
+        await client.drop_database("session_backends_benchmark")
+        await client.close()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--uri", default="mongodb://localhost:27017")
+    parser.add_argument("--turns", type=int, default=200)
+    parser.add_argument("--items-per-turn", type=int, default=4)
+    args = parser.parse_args()
+    asyncio.run(main(args.uri, args.turns, args.items_per_turn))
@@ -29,3 +29,45 @@ MONGO_PASS = environ.get("MONGO_PASS")
 MONGO_URI = environ.get("MONGO_URI")
 MONGO_APP = environ.get("MONGO_APP")
 MONGO_DB = environ["MONGO_DB"]
+
+CHAT_HISTORY_LIMIT = int(environ.get("CHAT_HISTORY_LIMIT") or 100)
+CHAT_HISTORY_TOKEN_BUDGET = int(environ.get("CHAT_HISTORY_TOKEN_BUDGET") or 8000)
+
+# Where chat history is stored: "mongo" or "postgres"
+CHAT_SESSION_BACKEND = environ.get("CHAT_SESSION_BACKEND") or "mongo"
+if CHAT_SESSION_BACKEND not in ("mongo", "postgres"):
+    raise ValueError(f"Unknown CHAT_SESSION_BACKEND: {CHAT_SESSION_BACKEND!r}")
+
+AGENT_INSTRUCTIONS_PATH = environ.get("AGENT_INSTRUCTIONS_PATH")
+
+# Once the replayed history passes this many estimated tokens, older turns are
+# summarized in the background, keeping the newest CHAT_COMPACTION_KEEP_TOKENS
+# verbatim. 0 turns compaction off.
+CHAT_COMPACTION_TOKEN_THRESHOLD = int(environ.get("CHAT_COMPACTION_TOKEN_THRESHOLD") or 6000)
+CHAT_COMPACTION_KEEP_TOKENS = int(environ.get("CHAT_COMPACTION_KEEP_TOKENS") or 2000)
+CHAT_COMPACTION_MODEL = environ.get("CHAT_COMPACTION_MODEL") or None
+
+# Admission control for chat runs, per worker. Requests over the limits wait up
+# to CHAT_QUEUE_TIMEOUT_SECONDS in a queue of CHAT_MAX_QUEUED, then get a 429.
+CHAT_MAX_CONCURRENT_RUNS = int(environ.get("CHAT_MAX_CONCURRENT_RUNS") or 8)
+CHAT_MAX_RUNS_PER_USER = int(environ.get("CHAT_MAX_RUNS_PER_USER") or 2)
+CHAT_MAX_QUEUED = int(environ.get("CHAT_MAX_QUEUED") or 32)
+CHAT_QUEUE_TIMEOUT_SECONDS = float(environ.get("CHAT_QUEUE_TIMEOUT_SECONDS") or 10)
+
+# Background chat jobs: CHAT_JOB_WORKERS runs at a time per worker process,
+# at most CHAT_JOB_MAX_QUEUED waiting, each stopped after CHAT_JOB_TIMEOUT_SECONDS.
+# Long polls wait up to CHAT_JOB_MAX_WAIT_SECONDS.
+CHAT_JOB_WORKERS = int(environ.get("CHAT_JOB_WORKERS") or 4)
+CHAT_JOB_MAX_QUEUED = int(environ.get("CHAT_JOB_MAX_QUEUED") or 100)
+CHAT_JOB_TIMEOUT_SECONDS = float(environ.get("CHAT_JOB_TIMEOUT_SECONDS") or 120)
+CHAT_JOB_MAX_WAIT_SECONDS = float(environ.get("CHAT_JOB_MAX_WAIT_SECONDS") or 30)
+
+# Turns of one conversation run one at a time under a lease of CHAT_LEASE_SECONDS,
+# extended while the turn runs. A message waits up to CHAT_CONVERSATION_WAIT_SECONDS
+# for its turn, checking every CHAT_LEASE_POLL_SECONDS.
+CHAT_LEASE_SECONDS = float(environ.get("CHAT_LEASE_SECONDS") or 30)
+CHAT_LEASE_POLL_SECONDS = float(environ.get("CHAT_LEASE_POLL_SECONDS") or 0.25)
+CHAT_CONVERSATION_WAIT_SECONDS = float(environ.get("CHAT_CONVERSATION_WAIT_SECONDS") or 60)
+
+# Serve Prometheus metrics at /metrics and install the timing hooks behind them
+METRICS_ENABLED = (environ.get("METRICS_ENABLED") or "").lower() in ("1", "true", "yes")
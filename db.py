@@ -1,14 +1,26 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from fastapi import Request
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base
 
 from config import DATABASE_URL
 
-engine = create_async_engine(DATABASE_URL)
-SessionLocal = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
-
 Base = declarative_base()
 
 
-async def get_db():
-    async with SessionLocal() as session:
+def create_engine(url: str = DATABASE_URL) -> AsyncEngine:
+    return create_async_engine(url)
+
+
+def create_sessionmaker(engine: AsyncEngine) -> async_sessionmaker[AsyncSession]:
+    return async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+
+async def get_db(request: Request):
+    # The engine and session factory are created once per worker in the app lifespan
+    async with request.app.state.sessionmaker() as session:
         yield session
+
+
+def get_sessionmaker(request: Request) -> async_sessionmaker[AsyncSession]:
+    # For callers that open several sessions, e.g. one per agent tool call
+    return request.app.state.sessionmaker
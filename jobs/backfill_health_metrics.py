@@ -0,0 +1,25 @@
+"""Parse existing free-text health measurements into the typed health_metrics table.
+
+Usage:
+    python -m jobs.backfill_health_metrics [--chunk-size 1000]
+"""
+import argparse
+import asyncio
+
+from db import create_engine, create_sessionmaker
+from managers.health_metric_manager import HealthMetricManager
+
+
+async def main(chunk_size: int) -> None:
+    engine = create_engine()
+    async with create_sessionmaker(engine)() as db:
+        processed = await HealthMetricManager.backfill_health_metrics(db, chunk_size)
+    await engine.dispose()
+    print(f"Processed {processed} health measurements")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(main(args.chunk_size))
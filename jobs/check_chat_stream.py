@@ -0,0 +1,155 @@
+"""Fail if /chat/stream sends its events out of order or loses a cancelled turn.
+
+Drives the body of /chat/stream with a scripted model, in three runs:
+- a tool call and then a reply: "conversation" first, each tool call started
+  before it finished, deltas that add up to the reply, and a final "message"
+  with the conversation id and the turn's usage
+- a failing model call: a single "error" event after "conversation", and no
+  "message"
+- a client that disconnects while the model is answering after a tool call:
+  the user's message and the tool call are still saved to the history
+
+The history is stored in the configured CHAT_SESSION_BACKEND and cleared at the
+end.
+
+Usage:
+    python -m jobs.check_chat_stream
+
+Runs against TEST_DB_NAME when it is set, otherwise against DB_NAME.
+"""
+import argparse
+import asyncio
+import json
+import sys
+from uuid import uuid4
+
+import anyio
+from agents import RunConfig, set_tracing_disabled
+
+from config import CHAT_SESSION_BACKEND, DATABASE_URL, MONGO_DB, TEST_DATABASE_URL, TEST_DB_NAME
+from db import create_engine, create_sessionmaker
+from no_sql_db import create_mongo_client
+from mongodb_session import MongoDBSession
+from schemas.chat_schemas import ChatRequest
+from ai.ai_agents import agent_registry, open_chat_session
+from routers.chat_router import stream_sse_events
+from jobs.scripted_model import HANG, ScriptedModel
+
+
+TOOL_CALL = [("get_real_current_datetime", {})]
+REPLY = "You have no records yet, but I can help you add some."
+
+
+def parse_sse(chunk: str) -> tuple[str, dict]:
+    event, data = chunk.strip().split("\n")
+    return event.removeprefix("event: "), json.loads(data.removeprefix("data: "))
+
+
+async def collect(chat_req, sessionmaker, nosql_db, user_id, script) -> list[tuple[str, dict]]:
+    run_config = RunConfig(model=ScriptedModel(script))
+    return [
+        parse_sse(chunk)
+        async for chunk in stream_sse_events(chat_req, sessionmaker, nosql_db, user_id, run_config)
+    ]
+
+
+def check_order(events: list[tuple[str, dict]], conversation_id: str) -> list[str]:
+    names = [name for name, _ in events]
+    failures = []
+    if names[0] != "conversation" or names[-1] != "message" or names.count("message") != 1:
+        failures.append(f"Expected conversation first and one message last, got {names}")
+        return failures
+
+    started = [data["call_id"] for name, data in events if name == "tool_call_started"]
+    finished = [data["call_id"] for name, data in events if name == "tool_call_finished"]
+    if len(started) != 1 or started != finished:
+        failures.append(f"Expected one tool call started and finished, got {names}")
+    elif names.index("tool_call_started") > names.index("tool_call_finished"):
+        failures.append(f"Tool call finished before it started: {names}")
+    if "delta" not in names or names.index("delta") < names.index("tool_call_finished"):
+        failures.append(f"Expected the reply's deltas after the tool call, got {names}")
+
+    message = events[-1][1]
+    deltas = "".join(data["text"] for name, data in events if name == "delta")
+    if deltas.strip() != REPLY or message["content"] != REPLY:
+        failures.append(f"Deltas {deltas!r} and message {message['content']!r} differ from the reply")
+    if message["conversation_id"] != conversation_id:
+        failures.append(f"Message has conversation_id {message['conversation_id']!r}")
+    if not message["usage"] or message["usage"]["model_requests"] != 2:
+        failures.append(f"Expected the usage of two model requests, got {message['usage']}")
+    return failures
+
+
+def check_error(events: list[tuple[str, dict]]) -> list[str]:
+    names = [name for name, _ in events]
+    if names != ["conversation", "error"] or not events[-1][1].get("detail"):
+        return [f"Expected conversation and one error event, got {events}"]
+    return []
+
+
+async def check_cancelled(chat_req, sessionmaker, nosql_db, user_id) -> list[str]:
+    run_config = RunConfig(model=ScriptedModel([TOOL_CALL, HANG]))
+    names = []
+
+    async def consume(cancel_scope: anyio.CancelScope) -> None:
+        async for chunk in stream_sse_events(chat_req, sessionmaker, nosql_db, user_id, run_config):
+            name, _ = parse_sse(chunk)
+            names.append(name)
+            if name == "tool_call_finished":
+                # Starlette cancels the body like this when the client goes away
+                cancel_scope.cancel()
+
+    async with anyio.create_task_group() as task_group:
+        task_group.start_soon(consume, task_group.cancel_scope)
+
+    async with open_chat_session(chat_req.conversation_id, sessionmaker, nosql_db) as session:
+        history = await session.get_items()
+    saved = [item.get("type") or item.get("role") for item in history]
+    if saved != ["user", "function_call", "function_call_output"]:
+        return [f"Expected the cancelled turn's message and tool call in the history, got {saved}"]
+    if "message" in names:
+        return [f"A cancelled stream sent a message event: {names}"]
+    return []
+
+
+async def main() -> int:
+    set_tracing_disabled(True)
+    agent_registry.build()
+    engine = create_engine(TEST_DATABASE_URL if TEST_DB_NAME else DATABASE_URL)
+    sessionmaker = create_sessionmaker(engine)
+    mongo_client = nosql_db = None
+    if CHAT_SESSION_BACKEND == "mongo":
+        mongo_client = create_mongo_client()
+        nosql_db = mongo_client[MONGO_DB]
+        await MongoDBSession.init_collections(nosql_db)
+
+    user_id = str(uuid4())
+    conversation_ids = [str(uuid4()) for _ in range(3)]
+    completed, failed, cancelled = (
+        ChatRequest(conversation_id=conversation_id, message="What do you have on record for me?")
+        for conversation_id in conversation_ids
+    )
+    failures = []
+    try:
+        events = await collect(completed, sessionmaker, nosql_db, user_id, [TOOL_CALL, REPLY])
+        failures += check_order(events, completed.conversation_id)
+        events = await collect(failed, sessionmaker, nosql_db, user_id, [RuntimeError("Model failed")])
+        failures += check_error(events)
+        failures += await check_cancelled(cancelled, sessionmaker, nosql_db, user_id)
+    finally:
+        for conversation_id in conversation_ids:
+            async with open_chat_session(conversation_id, sessionmaker, nosql_db) as session:
+                await session.clear_session()
+        if mongo_client is not None:
+            await mongo_client.close()
+        await engine.dispose()
+
+    for failure in failures:
+        print(failure, file=sys.stderr)
+    print(f"Checked 3 streamed runs, {len(failures)} failures")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    argparse.ArgumentParser(description=__doc__).parse_args()
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,97 @@
+"""Fail if the chat fast path records a message it should leave to the agent.
+
+Runs the fast-path matcher over a fixed set of messages, each with the record
+it must produce or None when the agent has to handle it, and checks that a
+reply to a question from the agent is never recorded directly.
+
+Usage:
+    python -m jobs.check_fast_path
+"""
+import argparse
+import sys
+
+from ai.fast_path import MeasurementMatch, MedicationMatch, asks_question, match_fast_path
+
+
+# Message -> the expected medication (name, dosage), measured metric codes, or None
+MATCHER_CASES = {
+    # Medication intakes
+    "took 500mg metformin": ("Metformin", "500mg"),
+    "I took 2 tablets of ibuprofen this morning": ("Ibuprofen", "2 tablets"),
+    "took my lisinopril 10 mg": ("Lisinopril", "10 mg"),
+    "I have taken 1000 iu vitamin d": ("Vitamin d", "1000 iu"),
+    # Food, drinks and function words are not medications
+    "had 500 ml of water": None,
+    "had 3 g of sugar": None,
+    "had 2 tablets of coffee": None,
+    "took 2 tablets of coffee": None,
+    "took 2 pills of the": None,
+    "took 500 ml of water": None,
+    "took 2 pills of my": None,
+    # Measurements
+    "BP 128/82 this morning": {"bp_systolic", "bp_diastolic"},
+    "weight 71.3 kg": {"weight"},
+    "HR 72, SpO2 98%": {"heart_rate", "spo2"},
+    "temp 38.2 c tonight": {"temperature"},
+    # Implausible readings
+    "HR 900": None,
+    "BP 300/10": None,
+    "BP 80/120": None,
+    "SpO2 140%": None,
+    "weight 900 kg": None,
+    "temp 52 c": None,
+    # Anything else needs the agent
+    "weight 71": None,
+    "took metformin yesterday": None,
+    "did I take my metformin?": None,
+    "BP 128/82 and I feel dizzy": None,
+}
+
+# (last assistant message, whether the fast path must be skipped)
+HISTORY_CASES = [
+    ("Which dose did you take, and when?", True),
+    ("How much did you take?", True),
+    ("I've saved your heart rate 72 bpm to your health record.", False),
+    (None, False),
+]
+
+
+def describe(match: MeasurementMatch | MedicationMatch | None):
+    if isinstance(match, MedicationMatch):
+        return (match.medication_name, match.dosage)
+    if isinstance(match, MeasurementMatch):
+        return {metric.metric for metric in match.metrics}
+    return None
+
+
+def main() -> int:
+    failures = 0
+    for message, expected in MATCHER_CASES.items():
+        actual = describe(match_fast_path(message))
+        if actual != expected:
+            failures += 1
+            print(f"{message!r}: expected {expected}, got {actual}", file=sys.stderr)
+
+    for reply, skips in HISTORY_CASES:
+        history = [{"role": "user", "content": "I took something"}]
+        if reply is not None:
+            # Runner output items carry the text in content parts
+            history.append(
+                {
+                    "type": "message",
+                    "role": "assistant",
+                    "content": [{"type": "output_text", "text": reply}],
+                }
+            )
+        if asks_question(history) != skips:
+            failures += 1
+            print(f"After {reply!r}: expected asks_question {skips}", file=sys.stderr)
+
+    checked = len(MATCHER_CASES) + len(HISTORY_CASES)
+    print(f"Checked {checked} cases, {failures} failed")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    argparse.ArgumentParser(description=__doc__).parse_args()
+    sys.exit(main())
@@ -0,0 +1,54 @@
+"""Fail if the measurement parser stores a reading it cannot read unambiguously.
+
+Runs the parser over a fixed set of free-text measurement entries, each with
+the metrics it must produce in canonical units.
+
+Usage:
+    python -m jobs.check_measurement_parser
+"""
+import argparse
+import sys
+
+from managers.measurement_parser import parse_measurements
+
+
+# Measurement entry -> the expected {metric code: value in the canonical unit}
+PARSER_CASES = {
+    "BP: 120/80, HR: 75 bpm": {"bp_systolic": 120, "bp_diastolic": 80, "heart_rate": 75},
+    "Weight: 150 lbs": {"weight": 68.0389},
+    "Weight: 71.3 kg; Height: 1.8 m": {"weight": 71.3, "height": 180},
+    "Temperature: 99.2°F": {"temperature": 37.33},
+    "temp 37.5 c": {"temperature": 37.5},
+    "Glucose: 5.5 mmol/L": {"glucose": 99.1001},
+    "SpO2: 98%, RR 16": {"spo2": 98, "respiratory_rate": 16},
+    "HR 72": {"heart_rate": 72},
+    # Thousands separators are part of the number
+    "Weight: 1,200 lbs": {"weight": 544.3108},
+    "Weight: 1,200 lbs, HR: 80": {"weight": 544.3108, "heart_rate": 80},
+    "HR: 80,Weight: 70 kg": {"heart_rate": 80, "weight": 70},
+    # Metrics written in more than one unit need the unit
+    "Weight: 150": {},
+    "temp 98.6": {},
+    "Height: 180, HR: 60": {"heart_rate": 60},
+    "Glucose: 110": {},
+    # Unknown labels and units
+    "Mood: 7": {},
+    "Weight: 70 stone": {},
+}
+
+
+def main() -> int:
+    failures = 0
+    for measurements, expected in PARSER_CASES.items():
+        actual = {metric.metric: metric.value for metric in parse_measurements(measurements)}
+        if actual != expected:
+            failures += 1
+            print(f"{measurements!r}: expected {expected}, got {actual}", file=sys.stderr)
+
+    print(f"Checked {len(PARSER_CASES)} cases, {failures} failed")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    argparse.ArgumentParser(description=__doc__).parse_args()
+    sys.exit(main())
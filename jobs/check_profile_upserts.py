@@ -0,0 +1,88 @@
+"""Fail if concurrent profile PUTs for one user create more than one profile.
+
+Creates a user, sends N PUT /profiles/ requests for them at once through the
+app, and checks that exactly one response is 201 Created, the rest are 200 OK,
+and a single profile row exists. The user, and their profile with it, is
+deleted at the end.
+
+Usage:
+    python -m jobs.check_profile_upserts [--requests 20]
+
+Runs against TEST_DB_NAME when it is set, otherwise against DB_NAME. Needs
+httpx from the dev dependency group, which `uv sync` installs.
+"""
+import argparse
+import asyncio
+import sys
+from collections import Counter
+from uuid import uuid4
+
+import httpx
+from sqlalchemy import delete, func, insert, select
+
+from config import DATABASE_URL, TEST_DATABASE_URL, TEST_DB_NAME
+from db import create_engine, create_sessionmaker
+from auth.token import create_access_token
+from models.user_model import UserModel
+from models.profile_model import ProfileModel
+from schemas.user_schemas import User
+from main import app
+
+
+async def main(requests: int) -> int:
+    engine = create_engine(TEST_DATABASE_URL if TEST_DB_NAME else DATABASE_URL)
+    sessionmaker = create_sessionmaker(engine)
+    # The lifespan does not run here, so only the state the route needs is set
+    app.state.sessionmaker = sessionmaker
+
+    user_id = uuid4()
+    user = User(
+        id=user_id,
+        first_name="Upsert",
+        last_name="Check",
+        email=f"upsert-check-{user_id}@example.com",
+    )
+    async with sessionmaker() as db:
+        await db.execute(insert(UserModel).values(**user.model_dump()))
+        await db.commit()
+
+    headers = {"Authorization": f"Bearer {create_access_token(user)}"}
+    body = {"sex": "female", "birth_date": "1990-01-01", "blood_type": "A+"}
+    try:
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://check"
+        ) as client:
+            responses = await asyncio.gather(
+                *(client.put("/profiles/", json=body, headers=headers) for _ in range(requests))
+            )
+
+        async with sessionmaker() as db:
+            profiles = (
+                await db.execute(
+                    select(func.count()).where(ProfileModel.user_id == user.id)
+                )
+            ).scalar_one()
+    finally:
+        async with sessionmaker() as db:
+            await db.execute(delete(UserModel).where(UserModel.id == user.id))
+            await db.commit()
+        await engine.dispose()
+
+    statuses = Counter(response.status_code for response in responses)
+    failures = []
+    if statuses[201] != 1 or statuses[200] != requests - 1:
+        failures.append(f"Expected one 201 and {requests - 1} 200 responses, got {dict(statuses)}")
+    if profiles != 1:
+        failures.append(f"Expected one profile row, found {profiles}")
+
+    for failure in failures:
+        print(failure, file=sys.stderr)
+    print(f"{requests} concurrent PUTs answered {dict(statuses)} and left {profiles} profile rows")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=20)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.requests)))
@@ -0,0 +1,218 @@
+"""Fail if a manager query plans a sequential scan on a seeded record table.
+
+Seeds users and records inside a transaction that is rolled back at the end,
+runs every manager read query, and EXPLAINs each statement it issued.
+Sequential scans are disabled for the session, so the planner only falls back
+to one when no index can serve the query.
+
+Usage:
+    python -m jobs.check_query_plans [--users 50] [--rows-per-user 100]
+
+Runs against TEST_DB_NAME when it is set, otherwise against DB_NAME.
+"""
+import argparse
+import asyncio
+import json
+import sys
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from sqlalchemy import event, insert, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from config import DATABASE_URL, TEST_DATABASE_URL, TEST_DB_NAME
+from models.user_model import UserModel
+from models.condition_model import ConditionModel
+from models.visit_model import DoctorVisitModel
+from models.health_measurement_model import HealthMeasurementModel
+from models.health_metric_model import HealthMetricModel
+from models.diagnostic_procedure_model import DiagnosticProcedureModel
+from models.medication_intake_model import MedicationIntakeModel
+from managers.condition_manager import ConditionManager
+from managers.visit_manager import VisitManager
+from managers.health_measurement_manager import HealthMeasurementManager
+from managers.health_metric_manager import HealthMetricManager
+from managers.diagnostic_procedure_manager import DiagnosticProcedureManager
+from managers.medication_intake_manager import MedicationIntakeManager
+from managers.health_snapshot_manager import HealthSnapshotManager
+from managers.timeline_manager import TimelineManager
+
+
+SEEDED_TABLES = {
+    ConditionModel.__tablename__,
+    DoctorVisitModel.__tablename__,
+    HealthMeasurementModel.__tablename__,
+    HealthMetricModel.__tablename__,
+    DiagnosticProcedureModel.__tablename__,
+    MedicationIntakeModel.__tablename__,
+}
+
+
+async def seed(db: AsyncSession, users: int, rows_per_user: int) -> tuple[str, str]:
+    """Insert records for `users` users and return one user's id and condition id."""
+    now = datetime.now().replace(microsecond=0)
+    user_ids = [uuid4() for _ in range(users)]
+    await db.execute(
+        insert(UserModel),
+        [{"id": user_id, "email": f"plan-check-{user_id}@example.com"} for user_id in user_ids],
+    )
+
+    conditions, visits, measurements, metrics, procedures, intakes = [], [], [], [], [], []
+    for user_id in user_ids:
+        for i in range(rows_per_user):
+            at = now - timedelta(hours=i)
+            condition_id, measurement_id = uuid4(), uuid4()
+            conditions.append(
+                {"id": condition_id, "user_id": user_id, "event_date": at, "name": "headache"}
+            )
+            visits.append(
+                {"user_id": user_id, "visit_datetime": at, "reason": "routine checkup"}
+            )
+            measurements.append(
+                {
+                    "id": measurement_id,
+                    "user_id": user_id,
+                    "recorded_at": at,
+                    "measurements": "BP: 120/80",
+                }
+            )
+            metrics.extend(
+                HealthMetricManager.build_metric_rows(measurement_id, user_id, "BP: 120/80", at)
+            )
+            procedures.append(
+                {"user_id": user_id, "procedure_datetime": at, "name": "Complete Blood Count"}
+            )
+            intakes.append(
+                {
+                    "user_id": user_id,
+                    "intake_datetime": at,
+                    "medication_name": "Ibuprofen",
+                    "condition_id": condition_id,
+                }
+            )
+
+    for model, rows in (
+        (ConditionModel, conditions),
+        (DoctorVisitModel, visits),
+        (HealthMeasurementModel, measurements),
+        (HealthMetricModel, metrics),
+        (DiagnosticProcedureModel, procedures),
+        (MedicationIntakeModel, intakes),
+    ):
+        await db.execute(insert(model), rows)
+        await db.execute(text(f"ANALYZE {model.__tablename__}"))
+
+    return str(user_ids[0]), str(conditions[0]["id"])
+
+
+async def run_manager_queries(db: AsyncSession, user_id: str, condition_id: str) -> None:
+    until = datetime.now()
+    since = until - timedelta(days=1)
+
+    visits = await VisitManager.select_user_doctor_visits_by_user_id(user_id, db, limit=10)
+    await VisitManager.select_user_doctor_visits_by_user_id(
+        user_id, db, cursor=visits.next_cursor, limit=10
+    )
+    await VisitManager.select_user_doctor_visits_by_user_id(user_id, db, start=since)
+    await ConditionManager.select_user_conditions_by_user_id(user_id, db, source="user")
+    await HealthMeasurementManager.select_user_health_measurements_by_user_id(
+        user_id, db, start=since, source="user"
+    )
+    await HealthMetricManager.select_user_metric_trends(user_id, db, metrics=["bp_systolic"])
+    await DiagnosticProcedureManager.select_user_diagnostic_procedures_by_user_id(user_id, db)
+    await MedicationIntakeManager.select_user_medication_intakes_by_user_id(user_id, db)
+    await MedicationIntakeManager.select_medication_intakes_by_condition(
+        condition_id, user_id, db
+    )
+    await MedicationIntakeManager.has_user_medication_intake(user_id, "ibuprofen", db)
+    await HealthSnapshotManager.select_user_health_snapshot(user_id, db)
+    await ConditionManager.search_user_conditions(user_id, db, name="head", start=since)
+    await VisitManager.search_user_doctor_visits(user_id, db, text="checkup")
+    await DiagnosticProcedureManager.search_user_diagnostic_procedures(
+        user_id, db, procedure_type="lab"
+    )
+    await MedicationIntakeManager.search_user_medication_intakes(
+        user_id, db, medication_name="ibu"
+    )
+    await HealthMetricManager.search_user_metric_readings(user_id, db)
+    await HealthMetricManager.search_user_metric_readings(user_id, db, metric="bp_systolic")
+    # The agent's search tools combine the text filters with date ranges
+    await ConditionManager.search_user_conditions(
+        user_id, db, name="head", start=since, end=until
+    )
+    await VisitManager.search_user_doctor_visits(
+        user_id, db, text="checkup", start=since, end=until
+    )
+    await DiagnosticProcedureManager.search_user_diagnostic_procedures(
+        user_id, db, name="blood", procedure_type="lab", start=since, end=until
+    )
+    await MedicationIntakeManager.search_user_medication_intakes(
+        user_id, db, medication_name="ibu", start=since, end=until
+    )
+    await HealthMetricManager.search_user_metric_readings(
+        user_id, db, metric="bp_systolic", start=since, end=until
+    )
+
+    timeline = await TimelineManager.select_user_timeline(user_id, db, limit=10)
+    await TimelineManager.select_user_timeline(
+        user_id, db, cursor=timeline.next_cursor, limit=10
+    )
+    await TimelineManager.select_user_timeline(
+        user_id, db, types=["visit", "medication_intake"], start=since, end=until
+    )
+
+
+def find_seq_scans(plan: dict) -> list[str]:
+    tables = []
+    if plan.get("Node Type") == "Seq Scan" and plan.get("Relation Name") in SEEDED_TABLES:
+        tables.append(plan["Relation Name"])
+    for child in plan.get("Plans", []):
+        tables.extend(find_seq_scans(child))
+    return tables
+
+
+async def main(users: int, rows_per_user: int) -> int:
+    engine = create_async_engine(TEST_DATABASE_URL if TEST_DB_NAME else DATABASE_URL)
+    captured: list[tuple[str, tuple]] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        # Compound selects may start with a parenthesised branch
+        if statement.lstrip(" \n(").upper().startswith(("SELECT", "WITH")):
+            captured.append((statement, parameters))
+
+    failures = 0
+    async with AsyncSession(engine) as db:
+        await db.execute(text("SET LOCAL enable_seqscan = off"))
+        user_id, condition_id = await seed(db, users, rows_per_user)
+
+        event.listen(engine.sync_engine, "before_cursor_execute", capture)
+        try:
+            await run_manager_queries(db, user_id, condition_id)
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+        conn = await db.connection()
+        for statement, parameters in captured:
+            plan = (
+                await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+            ).scalar_one()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            scanned = find_seq_scans(plan[0]["Plan"])
+            if scanned:
+                failures += 1
+                print(f"Seq scan on {', '.join(scanned)}:\n{statement}\n", file=sys.stderr)
+
+        await db.rollback()
+    await engine.dispose()
+
+    print(f"Checked {len(captured)} queries, {failures} with sequential scans")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--rows-per-user", type=int, default=100)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.users, args.rows_per_user)))
@@ -0,0 +1,172 @@
+"""Fail if concurrent agent tool calls share a database session or leak one.
+
+Drives the chat agent with a scripted model that calls several find_* tools in
+one response, which the runner executes concurrently. Every session the tools
+open is tracked, to check that the calls overlapped, that each had its own
+session on its own pooled connection, and that every connection went back to
+the pool.
+
+It also checks that a lease holder whose own message was answered by the
+previous holder puts the messages queued since then back in the inbox, so their
+callers still get them answered.
+
+Usage:
+    python -m jobs.check_tool_sessions
+
+Runs against TEST_DB_NAME when it is set, otherwise against DB_NAME. The tools
+only read, for a user id that has no records. The inbox entries are stored in
+the configured CHAT_SESSION_BACKEND and cleared at the end.
+"""
+import argparse
+import asyncio
+import sys
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+from uuid import uuid4
+
+from agents import Runner, set_tracing_disabled
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from config import CHAT_SESSION_BACKEND, DATABASE_URL, MONGO_DB, TEST_DATABASE_URL, TEST_DB_NAME
+from db import create_engine, create_sessionmaker
+from no_sql_db import create_mongo_client
+from mongodb_session import MongoDBSession
+from ai.ai_agents import (
+    agent_registry,
+    answer_queued_messages,
+    load_health_snapshot,
+    open_chat_session,
+)
+from ai.context import AgentContext
+from jobs.scripted_model import ScriptedModel
+
+
+TOOL_CALLS = [
+    ("find_conditions", {"name": "migraine"}),
+    ("find_doctor_visits", {"text": "smith"}),
+    ("find_diagnostic_procedures", {"procedure_type": "lab"}),
+    ("find_medication_intakes", {"medication_name": "ibuprofen"}),
+    ("find_metric_readings", {"metric": "heart_rate"}),
+]
+
+
+class TrackedSessions:
+    """Stands in for the tools' sessionmaker and records each session it hands out."""
+
+    def __init__(self, sessionmaker: async_sessionmaker[AsyncSession]):
+        self.sessionmaker = sessionmaker
+        self.opened = 0
+        self.closed = 0
+        self.open = 0
+        self.max_open = 0
+        self.connections: set[int] = set()
+
+    @asynccontextmanager
+    async def _session(self) -> AsyncIterator[AsyncSession]:
+        async with self.sessionmaker() as db:
+            self.opened += 1
+            self.open += 1
+            self.max_open = max(self.max_open, self.open)
+            try:
+                yield db
+                connection = await (await db.connection()).get_raw_connection()
+                self.connections.add(id(connection.driver_connection))
+            finally:
+                self.open -= 1
+                self.closed += 1
+
+    def __call__(self):
+        return self._session()
+
+
+async def check_requeued_messages(sessionmaker, nosql_db, user_id: str) -> list[str]:
+    """Message A was answered by the previous lease holder and B was queued since."""
+    conversation_id = str(uuid4())
+    entry_a, entry_b = str(uuid4()), str(uuid4())
+    reply = {"messages": [{"content": "Noted."}], "conversation_id": conversation_id}
+    try:
+        async with open_chat_session(conversation_id, sessionmaker, nosql_db) as session:
+            await session.enqueue_message(entry_a, "I took 200 mg ibuprofen")
+            await session.take_queued_messages()
+            await session.store_reply([entry_a], reply)
+            await session.enqueue_message(entry_b, "And 10 mg lisinopril")
+
+        # A's caller gets the lease after the previous holder and finds its reply
+        response = await answer_queued_messages(
+            entry_a, conversation_id, sessionmaker, nosql_db, user_id
+        )
+        async with open_chat_session(conversation_id, sessionmaker, nosql_db) as session:
+            queued = await session.take_queued_messages()
+    finally:
+        async with open_chat_session(conversation_id, sessionmaker, nosql_db) as session:
+            await session.delete_message(entry_b)
+            await session.clear_session()
+
+    failures = []
+    if response is None or response.messages[0].content != "Noted.":
+        failures.append(f"Expected A's stored reply, got {response}")
+    if [queued_id for queued_id, _ in queued] != [entry_b]:
+        failures.append(f"Expected B back in the inbox for its caller, got {queued}")
+    return failures
+
+
+async def main() -> int:
+    set_tracing_disabled(True)
+    engine = create_engine(TEST_DATABASE_URL if TEST_DB_NAME else DATABASE_URL)
+    sessionmaker = create_sessionmaker(engine)
+    sessions = TrackedSessions(sessionmaker)
+    mongo_client = nosql_db = None
+    if CHAT_SESSION_BACKEND == "mongo":
+        mongo_client = create_mongo_client()
+        nosql_db = mongo_client[MONGO_DB]
+        await MongoDBSession.init_collections(nosql_db)
+
+    user_id = str(uuid4())
+    context = AgentContext(
+        user_id=user_id,
+        sessionmaker=sessions,
+        health_snapshot=asyncio.create_task(load_health_snapshot(sessionmaker, user_id)),
+    )
+    agent = agent_registry.build().clone(model=ScriptedModel([TOOL_CALLS, "Nothing found."]))
+    result = await Runner.run(agent, "What do you have on record?", context=context)
+    checked_out = engine.pool.checkedout()
+    try:
+        requeue_failures = await check_requeued_messages(sessionmaker, nosql_db, user_id)
+    finally:
+        if mongo_client is not None:
+            await mongo_client.close()
+        await engine.dispose()
+
+    outputs = [item.output for item in result.new_items if item.type == "tool_call_output_item"]
+    calls = len(TOOL_CALLS)
+    failures = []
+    if len(outputs) != calls or not all(isinstance(output, list) for output in outputs):
+        # Tool errors are reported to the model as text instead of raised
+        failures.append(f"Expected {calls} lists from the tools, got {outputs}")
+    if sessions.opened != calls:
+        failures.append(f"Expected one session per tool call, {sessions.opened} were opened")
+    if sessions.max_open != calls:
+        failures.append(f"Only {sessions.max_open} of {calls} tool sessions were open at once")
+    if len(sessions.connections) != sessions.opened:
+        failures.append(
+            f"{sessions.opened} sessions ran on {len(sessions.connections)} connections"
+        )
+    if sessions.closed != sessions.opened or checked_out:
+        failures.append(
+            f"{sessions.opened - sessions.closed} sessions were not closed and "
+            f"{checked_out} connections not returned to the pool"
+        )
+    failures += requeue_failures
+
+    for failure in failures:
+        print(failure, file=sys.stderr)
+    print(
+        f"{calls} concurrent tool calls used {sessions.opened} sessions, "
+        f"at most {sessions.max_open} at once, on {len(sessions.connections)} connections"
+    )
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    argparse.ArgumentParser(description=__doc__).parse_args()
+    sys.exit(asyncio.run(main()))
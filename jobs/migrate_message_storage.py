@@ -0,0 +1,69 @@
+"""Convert legacy agent messages from JSON strings to native BSON subdocuments.
+
+Walks the messages collection in _id order, one chunk at a time, and rewrites
+each legacy row in place with a single bulk_write per chunk. Rows whose JSON
+cannot be parsed are left untouched and counted. The job is safe to re-run
+and can run while the app serves traffic, since the session reads both formats.
+
+Usage:
+    python -m jobs.migrate_message_storage [--chunk-size 1000]
+"""
+import argparse
+import asyncio
+import json
+
+from pymongo import ASCENDING, UpdateOne
+
+from config import MONGO_DB
+from no_sql_db import create_mongo_client
+from mongodb_session import MESSAGE_SCHEMA_VERSION
+
+
+async def main(chunk_size: int, messages_table: str) -> None:
+    client = create_mongo_client()
+    messages_collection = client[MONGO_DB][messages_table]
+
+    migrated = skipped = 0
+    last_id = None
+    try:
+        while True:
+            query = {"schema_version": {"$exists": False}}
+            if last_id is not None:
+                query["_id"] = {"$gt": last_id}
+            chunk = await messages_collection.find(
+                query, {"message_data": True}
+            ).sort("_id", ASCENDING).limit(chunk_size).to_list()
+            if not chunk:
+                break
+            last_id = chunk[-1]["_id"]
+
+            updates = []
+            for doc in chunk:
+                try:
+                    item = json.loads(doc["message_data"])
+                except (TypeError, json.JSONDecodeError):
+                    skipped += 1
+                    continue
+                updates.append(
+                    UpdateOne(
+                        # Guard against a concurrent run converting the row first
+                        {"_id": doc["_id"], "schema_version": {"$exists": False}},
+                        {"$set": {"message_data": item, "schema_version": MESSAGE_SCHEMA_VERSION}},
+                    )
+                )
+
+            if updates:
+                result = await messages_collection.bulk_write(updates, ordered=False)
+                migrated += result.modified_count
+    finally:
+        await client.close()
+
+    print(f"Migrated {migrated} messages, skipped {skipped} unreadable messages")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--messages-table", default="agent_messages")
+    args = parser.parse_args()
+    asyncio.run(main(args.chunk_size, args.messages_table))
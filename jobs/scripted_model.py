@@ -0,0 +1,113 @@
+"""A model that replays a script, for checks that drive the agent without OpenAI.
+
+Each model call takes the next step of the script:
+- a string is the final reply, streamed a word at a time
+- a list of (tool name, arguments) pairs is one response calling those tools
+- an exception is raised, as a failed model call would
+- HANG waits until the run is cancelled
+"""
+import asyncio
+import json
+from typing import Any, AsyncIterator
+from uuid import uuid4
+
+from agents import Model, ModelResponse, Usage
+from openai.types.responses import (
+    Response,
+    ResponseCompletedEvent,
+    ResponseFunctionToolCall,
+    ResponseOutputMessage,
+    ResponseOutputText,
+    ResponseTextDeltaEvent,
+    ResponseUsage,
+)
+from openai.types.responses.response_usage import InputTokensDetails, OutputTokensDetails
+
+
+HANG = object()
+
+ScriptStep = str | list[tuple[str, dict[str, Any]]] | BaseException | object
+
+
+class ScriptedModel(Model):
+    def __init__(self, script: list[ScriptStep]):
+        self.script = list(script)
+        # The input of every call, to check what the agent was shown
+        self.inputs: list[Any] = []
+
+    async def _next_output(self, input: Any) -> list:
+        self.inputs.append(input)
+        step = self.script.pop(0)
+        if step is HANG:
+            await asyncio.Event().wait()
+        if isinstance(step, BaseException):
+            raise step
+        if isinstance(step, str):
+            return [
+                ResponseOutputMessage(
+                    id=f"msg_{uuid4().hex}",
+                    type="message",
+                    role="assistant",
+                    status="completed",
+                    content=[ResponseOutputText(type="output_text", text=step, annotations=[])],
+                )
+            ]
+        return [
+            ResponseFunctionToolCall(
+                id=f"fc_{uuid4().hex}",
+                type="function_call",
+                call_id=f"call_{uuid4().hex}",
+                name=name,
+                arguments=json.dumps(arguments),
+            )
+            for name, arguments in step
+        ]
+
+    async def get_response(self, system_instructions, input, *args, **kwargs) -> ModelResponse:
+        output = await self._next_output(input)
+        return ModelResponse(
+            output=output,
+            usage=Usage(requests=1, input_tokens=10, output_tokens=10, total_tokens=20),
+            response_id=None,
+        )
+
+    async def stream_response(
+        self, system_instructions, input, *args, **kwargs
+    ) -> AsyncIterator[Any]:
+        output = await self._next_output(input)
+        sequence_number = 0
+        for item in output:
+            if item.type != "message":
+                continue
+            for word in item.content[0].text.split(" "):
+                yield ResponseTextDeltaEvent(
+                    type="response.output_text.delta",
+                    item_id=item.id,
+                    output_index=0,
+                    content_index=0,
+                    delta=f"{word} ",
+                    logprobs=[],
+                    sequence_number=sequence_number,
+                )
+                sequence_number += 1
+        yield ResponseCompletedEvent(
+            type="response.completed",
+            sequence_number=sequence_number,
+            response=Response(
+                id=f"resp_{uuid4().hex}",
+                created_at=0,
+                model="scripted",
+                object="response",
+                output=output,
+                parallel_tool_calls=True,
+                tool_choice="auto",
+                tools=[],
+                usage=ResponseUsage(
+                    input_tokens=10,
+                    input_tokens_details=InputTokensDetails(cached_tokens=0),
+                    output_tokens=10,
+                    output_tokens_details=OutputTokensDetails(reasoning_tokens=0),
+                    total_tokens=20,
+                ),
+            ),
+        )
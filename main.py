@@ -1,10 +1,60 @@
+from contextlib import asynccontextmanager
+
+from agents import add_trace_processor
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from config import CHAT_SESSION_BACKEND, METRICS_ENABLED, MONGO_DB
+from db import create_engine, create_sessionmaker
+from no_sql_db import create_mongo_client
+from mongodb_session import MongoDBSession
 from routers.main_router import main_router
+from ai.ai_agents import agent_registry, wait_for_compactions
+from ai.chat_jobs import chat_job_pool
+from ai.admission import chat_admission
+from ai.fast_path import fast_path_stats
+from managers.health_snapshot_manager import health_snapshot_cache
+from metrics import (
+    AgentSpanTimer,
+    MongoCommandTimer,
+    RequestTimingMiddleware,
+    instrument_engine,
+    metrics_endpoint,
+    register_summary,
+)
+
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Build the agent and its tools once per worker instead of on every chat request
+    agent_registry.build()
 
-app = FastAPI()
+    app.state.engine = create_engine()
+    if METRICS_ENABLED:
+        instrument_engine(app.state.engine)
+    app.state.sessionmaker = create_sessionmaker(app.state.engine)
+    # Mongo is only needed when it holds the chat history
+    app.state.mongo_client = None
+    app.state.nosql_db = None
+    try:
+        if CHAT_SESSION_BACKEND == "mongo":
+            app.state.mongo_client = create_mongo_client(
+                event_listeners=[MongoCommandTimer()] if METRICS_ENABLED else []
+            )
+            app.state.nosql_db = app.state.mongo_client[MONGO_DB]
+            await MongoDBSession.init_collections(app.state.nosql_db)
+        await chat_job_pool.start(app.state.sessionmaker, app.state.nosql_db)
+        yield
+    finally:
+        await chat_job_pool.stop()
+        # Background compactions still use the database clients
+        await wait_for_compactions()
+        if app.state.mongo_client is not None:
+            await app.state.mongo_client.close()
+        await app.state.engine.dispose()
+
+
+app = FastAPI(lifespan=lifespan)
 app.include_router(main_router)
 
 app.add_middleware(
@@ -14,3 +64,19 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+
+if METRICS_ENABLED:
+    app.add_middleware(RequestTimingMiddleware)
+    app.add_route("/metrics", metrics_endpoint, include_in_schema=False)
+    add_trace_processor(AgentSpanTimer())
+    register_summary("chat_fast_path", fast_path_stats.summary)
+    register_summary("chat_admission", chat_admission.summary)
+    register_summary("chat_jobs", lambda: {"queued": chat_job_pool.queued})
+    register_summary(
+        "health_snapshot_cache",
+        lambda: {
+            "hits": health_snapshot_cache.hits,
+            "misses": health_snapshot_cache.misses,
+            "size": health_snapshot_cache.size,
+        },
+    )
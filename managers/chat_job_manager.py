@@ -0,0 +1,166 @@
+from uuid import UUID
+from datetime import timedelta
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Row, func, select, update
+
+from models.chat_job_model import ChatJobModel
+from schemas.chat_schemas import ChatJob, ChatRequest, ChatResponse
+from managers.statements import insert_returning
+
+
+# Final statuses, after which a job never changes again
+FINISHED_STATUSES = ("succeeded", "failed")
+
+INTERRUPTED_ERROR = "The job was interrupted by a restart"
+
+
+class ChatJobManager:
+    @staticmethod
+    async def insert_chat_job(
+        chat_req: ChatRequest, conversation_id: str, user_id: str, db: AsyncSession
+    ) -> ChatJob:
+        """
+        Insert a queued chat job.
+
+        Args:
+            chat_req: The user's message
+            conversation_id: The conversation the reply belongs to
+            user_id: The user's unique identifier
+            db: Database session
+
+        Returns:
+            The created job
+        """
+        job = await insert_returning(
+            db,
+            ChatJobModel,
+            {
+                "user_id": UUID(user_id),
+                "conversation_id": conversation_id,
+                "message": chat_req.message,
+            },
+        )
+        await db.commit()
+        return ChatJob.model_validate(job)
+
+    @staticmethod
+    async def select_user_chat_job(
+        job_id: str, user_id: str, db: AsyncSession, stale_after: timedelta
+    ) -> ChatJob | None:
+        """
+        Retrieve one of a user's chat jobs.
+
+        Args:
+            job_id: The job's unique identifier
+            user_id: The user's unique identifier
+            db: Database session
+            stale_after: How long a job can run before it must have been
+                         interrupted, e.g. by a restart of its worker
+
+        Returns:
+            The job, reported as failed if it has been running for longer than
+            stale_after, or None if the user has no such job
+        """
+        # Compared in the database, whose clock set started_at
+        stale = ChatJobModel.started_at < func.now() - stale_after
+        row = (
+            await db.execute(
+                select(ChatJobModel, stale).where(
+                    ChatJobModel.id == UUID(job_id), ChatJobModel.user_id == UUID(user_id)
+                )
+            )
+        ).one_or_none()
+        if row is None:
+            return None
+
+        job, is_stale = row
+        chat_job = ChatJob.model_validate(job)
+        if chat_job.status == "running" and is_stale:
+            chat_job.status = "failed"
+            chat_job.error = INTERRUPTED_ERROR
+        return chat_job
+
+    @staticmethod
+    async def claim_chat_job(job_id: str, db: AsyncSession) -> Row | None:
+        """
+        Mark a queued job as running, unless another worker claimed it first.
+
+        Args:
+            job_id: The job's unique identifier
+            db: Database session
+
+        Returns:
+            The job's user_id, conversation_id and message, or None if the job
+            is no longer queued
+        """
+        result = await db.execute(
+            update(ChatJobModel)
+            .where(ChatJobModel.id == UUID(job_id), ChatJobModel.status == "queued")
+            .values(status="running", started_at=func.now())
+            .returning(ChatJobModel.user_id, ChatJobModel.conversation_id, ChatJobModel.message)
+        )
+        job = result.one_or_none()
+        await db.commit()
+        return job
+
+    @staticmethod
+    async def finish_chat_job(
+        job_id: str,
+        db: AsyncSession,
+        response: ChatResponse | None = None,
+        error: str | None = None,
+    ) -> None:
+        """
+        Record the outcome of a running job.
+
+        Args:
+            job_id: The job's unique identifier
+            db: Database session
+            response: The reply, if the run succeeded
+            error: Why the run failed, otherwise
+        """
+        await db.execute(
+            update(ChatJobModel)
+            .where(ChatJobModel.id == UUID(job_id), ChatJobModel.status == "running")
+            .values(
+                status="succeeded" if response is not None else "failed",
+                response=response.model_dump() if response is not None else None,
+                error=error,
+                finished_at=func.now(),
+            )
+        )
+        await db.commit()
+
+    @staticmethod
+    async def recover_chat_jobs(
+        db: AsyncSession, stale_after: timedelta, limit: int
+    ) -> list[str]:
+        """
+        Fail jobs left running by a worker that went away, and list queued ones.
+
+        Args:
+            db: Database session
+            stale_after: How long a job can run before it must have been interrupted
+            limit: Maximum number of queued jobs to return
+
+        Returns:
+            IDs of the oldest queued jobs, to run again
+        """
+        await db.execute(
+            update(ChatJobModel)
+            .where(
+                ChatJobModel.status == "running",
+                ChatJobModel.started_at < func.now() - stale_after,
+            )
+            .values(status="failed", error=INTERRUPTED_ERROR, finished_at=func.now())
+        )
+        await db.commit()
+
+        job_ids = await db.execute(
+            select(ChatJobModel.id)
+            .where(ChatJobModel.status == "queued")
+            .order_by(ChatJobModel.created_at)
+            .limit(limit)
+        )
+        return [str(job_id) for job_id in job_ids.scalars().all()]
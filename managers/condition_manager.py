@@ -1,10 +1,21 @@
 from uuid import UUID
+from datetime import datetime
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from models.condition_model import ConditionModel
-from schemas.condition_schemas import ConditionCreate, Condition
+from schemas.condition_schemas import (
+    ConditionCreate,
+    ConditionUpdate,
+    Condition,
+    ConditionSummary,
+)
+from schemas.pagination_schemas import Page
+from managers.pagination import DEFAULT_PAGE_SIZE, fetch_page, filter_time_range
+from managers.search import DEFAULT_SEARCH_LIMIT, fetch_newest, filter_text_match
+from managers.health_snapshot_manager import HealthSnapshotManager
+from managers.statements import insert_returning, update_returning
 
 
 class ConditionManager:
@@ -23,34 +34,105 @@ class ConditionManager:
         Returns:
             The created condition record
         """
-        condition = ConditionModel(**condition_data.model_dump(), user_id=UUID(user_id))
-        db.add(condition)
+        condition = await insert_returning(
+            db, ConditionModel, {**condition_data.model_dump(), "user_id": UUID(user_id)}
+        )
         await db.commit()
-        await db.refresh(condition)
+        HealthSnapshotManager.invalidate_user_health_snapshot(user_id)
         return Condition.model_validate(condition)
 
     @staticmethod
     async def select_user_conditions_by_user_id(
-        user_id: str, db: AsyncSession
-    ) -> list[Condition]:
+        user_id: str,
+        db: AsyncSession,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        source: str | None = None,
+        cursor: str | None = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+    ) -> Page[Condition]:
         """
-        Retrieve all conditions for a specific user.
+        Retrieve a page of conditions for a specific user, ordered by event date (most recent first).
         
         Args:
             user_id: The user's unique identifier
             db: Database session
+            start: Only include conditions that started on or after this time
+            end: Only include conditions that started before this time
+            source: Only include conditions from this source (e.g. "user", "device")
+            cursor: Cursor returned with the previous page
+            limit: Maximum number of conditions to return (capped at MAX_PAGE_SIZE)
             
         Returns:
-            List of all conditions for the user
-        """
-        conditions = (
-            (
-                await db.execute(
-                    select(ConditionModel).where(ConditionModel.user_id == UUID(user_id))
-                )
-            )
-            .scalars()
-            .all()
+            A page of conditions for the user
+        """
+        stmt = select(ConditionModel).where(ConditionModel.user_id == UUID(user_id))
+        stmt = filter_time_range(stmt, ConditionModel.event_date, start, end)
+        if source is not None:
+            stmt = stmt.where(ConditionModel.source == source)
+        return await fetch_page(
+            db, stmt, ConditionModel.event_date, ConditionModel.id, Condition, cursor, limit
+        )
+
+    @staticmethod
+    async def search_user_conditions(
+        user_id: str,
+        db: AsyncSession,
+        name: str | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        limit: int = DEFAULT_SEARCH_LIMIT,
+    ) -> list[ConditionSummary]:
+        """
+        Find a user's conditions, most recent first, with only the fields the agent needs.
+        
+        Args:
+            user_id: The user's unique identifier
+            db: Database session
+            name: Only include conditions whose name contains this text
+            start: Only include conditions that started on or after this time
+            end: Only include conditions that started before this time
+            limit: Maximum number of conditions to return (capped at MAX_SEARCH_LIMIT)
+            
+        Returns:
+            The matching conditions
+        """
+        stmt = select(
+            ConditionModel.id,
+            ConditionModel.event_date,
+            ConditionModel.name,
+            ConditionModel.severity,
+            ConditionModel.outcome,
+        ).where(ConditionModel.user_id == UUID(user_id))
+        stmt = filter_time_range(stmt, ConditionModel.event_date, start, end)
+        stmt = filter_text_match(stmt, [ConditionModel.name], name)
+        return await fetch_newest(
+            db, stmt, ConditionModel.event_date, ConditionModel.id, ConditionSummary, limit
         )
-        return [Condition.model_validate(condition) for condition in conditions]
-    
\ No newline at end of file
+
+    @staticmethod
+    async def update_condition(
+        condition_id: str, condition_data: ConditionUpdate, user_id: str, db: AsyncSession
+    ) -> Condition | None:
+        """
+        Update an existing condition record.
+        
+        Args:
+            condition_id: The condition's unique identifier
+            condition_data: The updated condition data
+            user_id: The user's unique identifier (for security)
+            db: Database session
+            
+        Returns:
+            The updated condition record, or None if not found
+        """
+        # Only update fields that are not None
+        update_data = {k: v for k, v in condition_data.model_dump().items() if v is not None}
+        
+        if not update_data:
+            return None
+
+        condition = await update_returning(db, ConditionModel, condition_id, user_id, update_data)
+        await db.commit()
+        HealthSnapshotManager.invalidate_user_health_snapshot(user_id)
+        return Condition.model_validate(condition) if condition else None
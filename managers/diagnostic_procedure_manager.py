@@ -1,10 +1,21 @@
 from uuid import UUID
+from datetime import datetime
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from models.diagnostic_procedure_model import DiagnosticProcedureModel
-from schemas.diagnostic_procedure_schemas import DiagnosticProcedureCreate, DiagnosticProcedure
+from schemas.diagnostic_procedure_schemas import (
+    DiagnosticProcedureCreate,
+    DiagnosticProcedureUpdate,
+    DiagnosticProcedure,
+    DiagnosticProcedureSummary,
+)
+from schemas.pagination_schemas import Page
+from managers.pagination import DEFAULT_PAGE_SIZE, fetch_page, filter_time_range
+from managers.search import DEFAULT_SEARCH_LIMIT, fetch_newest, filter_text_match
+from managers.health_snapshot_manager import HealthSnapshotManager
+from managers.statements import insert_returning, update_returning
 
 
 class DiagnosticProcedureManager:
@@ -23,35 +34,118 @@ class DiagnosticProcedureManager:
         Returns:
             The created diagnostic procedure record
         """
-        procedure = DiagnosticProcedureModel(**procedure_data.model_dump(), user_id=UUID(user_id))
-        db.add(procedure)
+        procedure = await insert_returning(
+            db,
+            DiagnosticProcedureModel,
+            {**procedure_data.model_dump(), "user_id": UUID(user_id)},
+        )
         await db.commit()
-        await db.refresh(procedure)
+        HealthSnapshotManager.invalidate_user_health_snapshot(user_id)
         return DiagnosticProcedure.model_validate(procedure)
 
     @staticmethod
     async def select_user_diagnostic_procedures_by_user_id(
-        user_id: str, db: AsyncSession
-    ) -> list[DiagnosticProcedure]:
+        user_id: str,
+        db: AsyncSession,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        cursor: str | None = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+    ) -> Page[DiagnosticProcedure]:
         """
-        Retrieve all diagnostic procedures for a specific user, ordered by procedure date (most recent first).
+        Retrieve a page of diagnostic procedures for a specific user, ordered by procedure date (most recent first).
         
         Args:
             user_id: The user's unique identifier
             db: Database session
+            start: Only include diagnostic procedures performed on or after this time
+            end: Only include diagnostic procedures performed before this time
+            cursor: Cursor returned with the previous page
+            limit: Maximum number of diagnostic procedures to return (capped at MAX_PAGE_SIZE)
             
         Returns:
-            List of all diagnostic procedures for the user
-        """
-        procedures = (
-            (
-                await db.execute(
-                    select(DiagnosticProcedureModel)
-                    .where(DiagnosticProcedureModel.user_id == UUID(user_id))
-                    .order_by(DiagnosticProcedureModel.procedure_datetime.desc())
-                )
-            )
-            .scalars()
-            .all()
+            A page of diagnostic procedures for the user
+        """
+        stmt = select(DiagnosticProcedureModel).where(DiagnosticProcedureModel.user_id == UUID(user_id))
+        stmt = filter_time_range(stmt, DiagnosticProcedureModel.procedure_datetime, start, end)
+        return await fetch_page(
+            db,
+            stmt,
+            DiagnosticProcedureModel.procedure_datetime,
+            DiagnosticProcedureModel.id,
+            DiagnosticProcedure,
+            cursor,
+            limit,
+        )
+
+    @staticmethod
+    async def search_user_diagnostic_procedures(
+        user_id: str,
+        db: AsyncSession,
+        name: str | None = None,
+        procedure_type: str | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        limit: int = DEFAULT_SEARCH_LIMIT,
+    ) -> list[DiagnosticProcedureSummary]:
+        """
+        Find a user's diagnostic procedures, most recent first, with only the fields the agent needs.
+        
+        Args:
+            user_id: The user's unique identifier
+            db: Database session
+            name: Only include procedures whose name contains this text
+            procedure_type: Only include procedures of this type (e.g. "lab", "imaging")
+            start: Only include procedures on or after this time
+            end: Only include procedures before this time
+            limit: Maximum number of procedures to return (capped at MAX_SEARCH_LIMIT)
+            
+        Returns:
+            The matching diagnostic procedures
+        """
+        stmt = select(
+            DiagnosticProcedureModel.id,
+            DiagnosticProcedureModel.procedure_datetime,
+            DiagnosticProcedureModel.name,
+            DiagnosticProcedureModel.type,
+            DiagnosticProcedureModel.results,
+        ).where(DiagnosticProcedureModel.user_id == UUID(user_id))
+        stmt = filter_time_range(stmt, DiagnosticProcedureModel.procedure_datetime, start, end)
+        stmt = filter_text_match(stmt, [DiagnosticProcedureModel.name], name)
+        if procedure_type is not None:
+            stmt = stmt.where(DiagnosticProcedureModel.type == procedure_type)
+        return await fetch_newest(
+            db,
+            stmt,
+            DiagnosticProcedureModel.procedure_datetime,
+            DiagnosticProcedureModel.id,
+            DiagnosticProcedureSummary,
+            limit,
         )
-        return [DiagnosticProcedure.model_validate(procedure) for procedure in procedures]
\ No newline at end of file
+
+    @staticmethod
+    async def update_diagnostic_procedure(
+        procedure_id: str, procedure_data: DiagnosticProcedureUpdate, user_id: str, db: AsyncSession
+    ) -> DiagnosticProcedure | None:
+        """
+        Update an existing diagnostic procedure record.
+        
+        Args:
+            procedure_id: The diagnostic procedure's unique identifier
+            procedure_data: The updated diagnostic procedure data
+            user_id: The user's unique identifier (for security)
+            db: Database session
+            
+        Returns:
+            The updated diagnostic procedure record, or None if not found
+        """
+        # Only update fields that are not None
+        update_data = {k: v for k, v in procedure_data.model_dump().items() if v is not None}
+        
+        if not update_data:
+            return None
+
+        procedure = await update_returning(db, DiagnosticProcedureModel, procedure_id, user_id, update_data)
+        await db.commit()
+        HealthSnapshotManager.invalidate_user_health_snapshot(user_id)
+        return DiagnosticProcedure.model_validate(procedure) if procedure else None
@@ -1,10 +1,26 @@
-from uuid import UUID
+from uuid import UUID, uuid4
+from datetime import datetime
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import delete, func, insert, select
 
 from models.health_measurement_model import HealthMeasurementModel
-from schemas.health_measurement_schemas import HealthMeasurementCreate, HealthMeasurement
+from models.health_metric_model import HealthMetricModel
+from schemas.health_measurement_schemas import (
+    HealthMeasurementCreate,
+    HealthMeasurementUpdate,
+    HealthMeasurement,
+)
+from schemas.pagination_schemas import Page
+from managers.health_metric_manager import HealthMetricManager
+from managers.pagination import (
+    DEFAULT_PAGE_SIZE,
+    fetch_page,
+    filter_time_range,
+    strip_timezone,
+)
+from managers.health_snapshot_manager import HealthSnapshotManager
+from managers.statements import insert_returning, update_returning
 
 
 class HealthMeasurementManager:
@@ -13,7 +29,8 @@ class HealthMeasurementManager:
         measurement_data: HealthMeasurementCreate, user_id: str, db: AsyncSession
     ) -> HealthMeasurement:
         """
-        Insert a new health measurement record into the database.
+        Insert a new health measurement record into the database, along with the
+        typed metrics parsed from its measurements text.
         
         Args:
             measurement_data: The health measurement data to insert
@@ -23,35 +40,150 @@ class HealthMeasurementManager:
         Returns:
             The created health measurement record
         """
-        measurement = HealthMeasurementModel(**measurement_data.model_dump(), user_id=UUID(user_id))
-        db.add(measurement)
+        measurement = await insert_returning(
+            db,
+            HealthMeasurementModel,
+            {**measurement_data.model_dump(), "user_id": UUID(user_id)},
+        )
+        metric_rows = HealthMetricManager.build_metric_rows(
+            measurement.id,
+            measurement.user_id,
+            measurement.measurements,
+            measurement.recorded_at,
+        )
+        if metric_rows:
+            await db.execute(insert(HealthMetricModel), metric_rows)
         await db.commit()
-        await db.refresh(measurement)
+        HealthSnapshotManager.invalidate_user_health_snapshot(user_id)
         return HealthMeasurement.model_validate(measurement)
 
     @staticmethod
-    async def select_user_health_measurements_by_user_id(
-        user_id: str, db: AsyncSession
-    ) -> list[HealthMeasurement]:
+    async def insert_health_measurements_bulk(
+        measurements: list[HealthMeasurementCreate], user_id: str, db: AsyncSession
+    ) -> list[UUID]:
         """
-        Retrieve all health measurements for a specific user, ordered by recorded date (most recent first).
+        Insert many health measurement records, and their parsed metrics, in one transaction.
+        
+        Rows are written with batched multi-row INSERTs instead of one
+        add/commit/refresh cycle per measurement.
         
         Args:
+            measurements: The health measurements to insert
             user_id: The user's unique identifier
             db: Database session
             
         Returns:
-            List of all health measurements for the user
-        """
-        measurements = (
-            (
-                await db.execute(
-                    select(HealthMeasurementModel)
-                    .where(HealthMeasurementModel.user_id == UUID(user_id))
-                    .order_by(HealthMeasurementModel.recorded_at.desc())
+            The ids of the created records, in input order
+        """
+        if not measurements:
+            return []
+
+        # Readings without a timestamp get the same value the column default would give
+        now = (await db.execute(select(func.localtimestamp()))).scalar_one()
+        owner_id = UUID(user_id)
+
+        measurement_rows, metric_rows = [], []
+        for measurement_data in measurements:
+            row = measurement_data.model_dump()
+            row["id"] = uuid4()
+            row["user_id"] = owner_id
+            row["recorded_at"] = strip_timezone(row["recorded_at"]) or now
+            measurement_rows.append(row)
+            metric_rows.extend(
+                HealthMetricManager.build_metric_rows(
+                    row["id"], owner_id, row["measurements"], row["recorded_at"]
                 )
             )
-            .scalars()
-            .all()
+
+        await db.execute(insert(HealthMeasurementModel), measurement_rows)
+        if metric_rows:
+            await db.execute(insert(HealthMetricModel), metric_rows)
+        await db.commit()
+        HealthSnapshotManager.invalidate_user_health_snapshot(user_id)
+        return [row["id"] for row in measurement_rows]
+
+    @staticmethod
+    async def select_user_health_measurements_by_user_id(
+        user_id: str,
+        db: AsyncSession,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        source: str | None = None,
+        cursor: str | None = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+    ) -> Page[HealthMeasurement]:
+        """
+        Retrieve a page of health measurements for a specific user, ordered by recorded date (most recent first).
+        
+        Args:
+            user_id: The user's unique identifier
+            db: Database session
+            start: Only include health measurements recorded on or after this time
+            end: Only include health measurements recorded before this time
+            source: Only include health measurements from this source (e.g. "user", "device")
+            cursor: Cursor returned with the previous page
+            limit: Maximum number of health measurements to return (capped at MAX_PAGE_SIZE)
+            
+        Returns:
+            A page of health measurements for the user
+        """
+        stmt = select(HealthMeasurementModel).where(HealthMeasurementModel.user_id == UUID(user_id))
+        stmt = filter_time_range(stmt, HealthMeasurementModel.recorded_at, start, end)
+        if source is not None:
+            stmt = stmt.where(HealthMeasurementModel.source == source)
+        return await fetch_page(
+            db,
+            stmt,
+            HealthMeasurementModel.recorded_at,
+            HealthMeasurementModel.id,
+            HealthMeasurement,
+            cursor,
+            limit,
+        )
+
+    @staticmethod
+    async def update_health_measurement(
+        measurement_id: str,
+        measurement_data: HealthMeasurementUpdate,
+        user_id: str,
+        db: AsyncSession,
+    ) -> HealthMeasurement | None:
+        """
+        Update an existing health measurement record, re-parsing its typed metrics
+        when the measurements text or time changes.
+        
+        Args:
+            measurement_id: The health measurement's unique identifier
+            measurement_data: The updated health measurement data
+            user_id: The user's unique identifier (for security)
+            db: Database session
+            
+        Returns:
+            The updated health measurement record, or None if not found
+        """
+        # Only update fields that are not None
+        update_data = {k: v for k, v in measurement_data.model_dump().items() if v is not None}
+        
+        if not update_data:
+            return None
+
+        measurement = await update_returning(
+            db, HealthMeasurementModel, measurement_id, user_id, update_data
         )
-        return [HealthMeasurement.model_validate(measurement) for measurement in measurements]
\ No newline at end of file
+        if measurement and update_data.keys() & {"measurements", "recorded_at"}:
+            await db.execute(
+                delete(HealthMetricModel).where(
+                    HealthMetricModel.measurement_id == measurement.id
+                )
+            )
+            metric_rows = HealthMetricManager.build_metric_rows(
+                measurement.id,
+                measurement.user_id,
+                measurement.measurements,
+                measurement.recorded_at,
+            )
+            if metric_rows:
+                await db.execute(insert(HealthMetricModel), metric_rows)
+        await db.commit()
+        HealthSnapshotManager.invalidate_user_health_snapshot(user_id)
+        return HealthMeasurement.model_validate(measurement) if measurement else None
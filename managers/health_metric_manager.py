@@ -0,0 +1,206 @@
+from uuid import UUID
+from datetime import datetime
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Float, cast, func, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by, insert
+
+from models.health_measurement_model import HealthMeasurementModel
+from models.health_metric_model import HealthMetricModel
+from schemas.health_metric_schemas import MetricReading, MetricTrend, TrendBucket
+from managers.measurement_parser import parse_measurements
+from managers.metric_trends import compute_metric_trend
+from managers.pagination import filter_time_range
+from managers.search import DEFAULT_SEARCH_LIMIT, fetch_newest
+
+
+class HealthMetricManager:
+    @staticmethod
+    def build_metric_rows(
+        measurement_id: UUID,
+        user_id: UUID,
+        measurements: str,
+        recorded_at: datetime | None,
+    ) -> list[dict]:
+        """
+        Parse a free-text measurement entry into health_metrics rows.
+        
+        Args:
+            measurement_id: The source measurement's unique identifier
+            user_id: The user's unique identifier
+            measurements: The free-text measurement entry
+            recorded_at: When the measurement was taken, or None to use the database default
+            
+        Returns:
+            Column values for each metric parsed from the entry
+        """
+        rows = []
+        for parsed in parse_measurements(measurements):
+            row = {
+                "measurement_id": measurement_id,
+                "user_id": user_id,
+                "metric": parsed.metric,
+                "value": parsed.value,
+                "unit": parsed.unit,
+            }
+            # Left unset, recorded_at falls back to now(), which matches the
+            # measurement's own default within the same transaction
+            if recorded_at is not None:
+                row["recorded_at"] = recorded_at
+            rows.append(row)
+        return rows
+
+    @staticmethod
+    async def backfill_health_metrics(db: AsyncSession, chunk_size: int = 1000) -> int:
+        """
+        Parse existing health measurements into health_metrics, one chunk per transaction.
+        
+        Measurements are walked in primary key order so only one chunk is held in memory,
+        and metrics that already exist are left untouched, so the job can be re-run safely.
+        
+        Args:
+            db: Database session
+            chunk_size: Number of measurements to read per chunk
+            
+        Returns:
+            The number of measurements processed
+        """
+        processed = 0
+        last_id = None
+        while True:
+            stmt = (
+                select(
+                    HealthMeasurementModel.id,
+                    HealthMeasurementModel.user_id,
+                    HealthMeasurementModel.measurements,
+                    HealthMeasurementModel.recorded_at,
+                )
+                .order_by(HealthMeasurementModel.id)
+                .limit(chunk_size)
+            )
+            if last_id is not None:
+                stmt = stmt.where(HealthMeasurementModel.id > last_id)
+
+            rows = (await db.execute(stmt)).all()
+            if not rows:
+                break
+
+            metric_rows = [
+                metric_row
+                for row in rows
+                for metric_row in HealthMetricManager.build_metric_rows(
+                    row.id, row.user_id, row.measurements, row.recorded_at
+                )
+            ]
+            if metric_rows:
+                await db.execute(
+                    insert(HealthMetricModel).on_conflict_do_nothing(
+                        index_elements=["measurement_id", "metric"]
+                    ),
+                    metric_rows,
+                )
+            await db.commit()
+
+            processed += len(rows)
+            last_id = rows[-1].id
+
+        return processed
+
+    @staticmethod
+    async def search_user_metric_readings(
+        user_id: str,
+        db: AsyncSession,
+        metric: str | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        limit: int = DEFAULT_SEARCH_LIMIT,
+    ) -> list[MetricReading]:
+        """
+        Find a user's typed readings, most recent first.
+        
+        Args:
+            user_id: The user's unique identifier
+            db: Database session
+            metric: Only include readings of this metric code (e.g. "weight", "bp_systolic")
+            start: Only include readings recorded on or after this time
+            end: Only include readings recorded before this time
+            limit: Maximum number of readings to return (capped at MAX_SEARCH_LIMIT)
+            
+        Returns:
+            The matching readings
+        """
+        stmt = select(
+            HealthMetricModel.measurement_id,
+            HealthMetricModel.metric,
+            HealthMetricModel.value,
+            HealthMetricModel.unit,
+            HealthMetricModel.recorded_at,
+        ).where(HealthMetricModel.user_id == UUID(user_id))
+        stmt = filter_time_range(stmt, HealthMetricModel.recorded_at, start, end)
+        if metric is not None:
+            stmt = stmt.where(HealthMetricModel.metric == metric)
+        return await fetch_newest(
+            db, stmt, HealthMetricModel.recorded_at, HealthMetricModel.id, MetricReading, limit
+        )
+
+    @staticmethod
+    async def select_user_metric_trends(
+        user_id: str,
+        db: AsyncSession,
+        metrics: list[str] | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        bucket: TrendBucket = "day",
+        window: int = 7,
+    ) -> list[MetricTrend]:
+        """
+        Compute trend statistics for a user's metrics.
+        
+        Each metric's series is aggregated into two arrays in the database, so a single
+        query returns one row per metric and the statistics are computed with NumPy.
+        
+        Args:
+            user_id: The user's unique identifier
+            db: Database session
+            metrics: Metric codes to include, or None for all of them
+            start: Only include readings recorded on or after this time
+            end: Only include readings recorded before this time
+            bucket: Bucket width of the returned series ("hour", "day" or "week")
+            window: Number of buckets in the rolling mean
+            
+        Returns:
+            One trend per metric that has readings in the range
+        """
+        epoch = cast(func.extract("epoch", HealthMetricModel.recorded_at), Float)
+        stmt = (
+            select(
+                HealthMetricModel.metric,
+                func.min(HealthMetricModel.unit).label("unit"),
+                func.array_agg(
+                    aggregate_order_by(epoch, HealthMetricModel.recorded_at)
+                ).label("timestamps"),
+                func.array_agg(
+                    aggregate_order_by(HealthMetricModel.value, HealthMetricModel.recorded_at)
+                ).label("readings"),
+            )
+            .where(HealthMetricModel.user_id == UUID(user_id))
+            .group_by(HealthMetricModel.metric)
+            .order_by(HealthMetricModel.metric)
+        )
+        stmt = filter_time_range(stmt, HealthMetricModel.recorded_at, start, end)
+        if metrics:
+            stmt = stmt.where(HealthMetricModel.metric.in_(metrics))
+
+        rows = (await db.execute(stmt)).all()
+        return [
+            compute_metric_trend(
+                row.metric,
+                row.unit,
+                np.asarray(row.timestamps, dtype=np.float64),
+                np.asarray(row.readings, dtype=np.float64),
+                bucket,
+                window,
+            )
+            for row in rows
+        ]
@@ -0,0 +1,183 @@
+import time
+from datetime import datetime, timedelta
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.condition_model import ConditionModel
+from models.visit_model import DoctorVisitModel
+from models.health_metric_model import HealthMetricModel
+from models.medication_intake_model import MedicationIntakeModel
+from schemas.health_snapshot_schemas import (
+    HealthSnapshot,
+    SnapshotCondition,
+    SnapshotMedication,
+    SnapshotVisit,
+    SnapshotVital,
+)
+
+
+SNAPSHOT_CONDITIONS = 10
+SNAPSHOT_MEDICATIONS = 10
+SNAPSHOT_VISITS = 3
+CURRENT_MEDICATION_DAYS = 30
+
+
+class HealthSnapshotCache:
+    """
+    Per-worker cache of health snapshots, invalidated by the managers' writes.
+
+    Entries also expire after `ttl` seconds, which bounds how stale a snapshot
+    can be after a write served by another worker.
+    """
+
+    def __init__(self, ttl: float = 300, max_users: int = 10000):
+        self.ttl = ttl
+        self.max_users = max_users
+        self._entries: dict[str, tuple[float, HealthSnapshot]] = {}
+        # Bumped on every write, so a read that raced a write is not cached
+        self._versions: dict[str, int] = {}
+        self._epoch = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def size(self) -> int:
+        return len(self._entries)
+
+    def get(self, user_id: str) -> HealthSnapshot | None:
+        entry = self._entries.get(user_id)
+        if entry is None or entry[0] < time.monotonic():
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[1]
+
+    def version(self, user_id: str) -> tuple[int, int]:
+        return self._epoch, self._versions.get(user_id, 0)
+
+    def set(self, user_id: str, snapshot: HealthSnapshot, version: tuple[int, int]) -> None:
+        if version != self.version(user_id):
+            return
+        self._entries.pop(user_id, None)
+        if len(self._entries) >= self.max_users:
+            # Dicts keep insertion order, so this evicts the oldest entry
+            del self._entries[next(iter(self._entries))]
+        self._entries[user_id] = (time.monotonic() + self.ttl, snapshot)
+
+    def invalidate(self, user_id: str) -> None:
+        self._entries.pop(user_id, None)
+        if user_id not in self._versions and len(self._versions) >= self.max_users:
+            # Starting a new epoch invalidates every in-flight read at once
+            self._versions.clear()
+            self._epoch += 1
+        self._versions[user_id] = self._versions.get(user_id, 0) + 1
+
+
+health_snapshot_cache = HealthSnapshotCache()
+
+
+class HealthSnapshotManager:
+    @staticmethod
+    async def select_user_health_snapshot(user_id: str, db: AsyncSession) -> HealthSnapshot:
+        """
+        Read a compact summary of a user's health records.
+        
+        Each part is a small newest-first query served by the per-user indexes.
+        
+        Args:
+            user_id: The user's unique identifier
+            db: Database session
+            
+        Returns:
+            The user's active conditions, current medications, latest vitals and
+            most recent doctor visits
+        """
+        user_uuid = UUID(user_id)
+
+        conditions = await db.execute(
+            select(ConditionModel.name, ConditionModel.severity, ConditionModel.event_date)
+            .where(ConditionModel.user_id == user_uuid, ConditionModel.outcome.is_(None))
+            .order_by(ConditionModel.event_date.desc(), ConditionModel.id.desc())
+            .limit(SNAPSHOT_CONDITIONS)
+        )
+
+        latest_intakes = (
+            select(
+                MedicationIntakeModel.medication_name,
+                MedicationIntakeModel.dosage,
+                MedicationIntakeModel.intake_datetime.label("last_taken_at"),
+            )
+            .distinct(MedicationIntakeModel.medication_name)
+            .where(
+                MedicationIntakeModel.user_id == user_uuid,
+                MedicationIntakeModel.intake_datetime
+                >= datetime.now() - timedelta(days=CURRENT_MEDICATION_DAYS),
+            )
+            .order_by(
+                MedicationIntakeModel.medication_name,
+                MedicationIntakeModel.intake_datetime.desc(),
+            )
+            .subquery()
+        )
+        medications = await db.execute(
+            select(latest_intakes)
+            .order_by(latest_intakes.c.last_taken_at.desc())
+            .limit(SNAPSHOT_MEDICATIONS)
+        )
+
+        vitals = await db.execute(
+            select(
+                HealthMetricModel.metric,
+                HealthMetricModel.value,
+                HealthMetricModel.unit,
+                HealthMetricModel.recorded_at,
+            )
+            .distinct(HealthMetricModel.metric)
+            .where(HealthMetricModel.user_id == user_uuid)
+            .order_by(HealthMetricModel.metric, HealthMetricModel.recorded_at.desc())
+        )
+
+        visits = await db.execute(
+            select(
+                DoctorVisitModel.visit_datetime,
+                DoctorVisitModel.reason,
+                DoctorVisitModel.doctor_name,
+                DoctorVisitModel.diagnosis,
+            )
+            .where(DoctorVisitModel.user_id == user_uuid)
+            .order_by(DoctorVisitModel.visit_datetime.desc(), DoctorVisitModel.id.desc())
+            .limit(SNAPSHOT_VISITS)
+        )
+
+        return HealthSnapshot(
+            conditions=[SnapshotCondition.model_validate(row._mapping) for row in conditions],
+            medications=[SnapshotMedication.model_validate(row._mapping) for row in medications],
+            vitals=[SnapshotVital.model_validate(row._mapping) for row in vitals],
+            visits=[SnapshotVisit.model_validate(row._mapping) for row in visits],
+        )
+
+    @staticmethod
+    async def get_user_health_snapshot(user_id: str, db: AsyncSession) -> HealthSnapshot:
+        """
+        Return a user's health snapshot from the cache, reading it on a miss.
+        
+        Args:
+            user_id: The user's unique identifier
+            db: Database session
+            
+        Returns:
+            The user's health snapshot
+        """
+        snapshot = health_snapshot_cache.get(user_id)
+        if snapshot is None:
+            version = health_snapshot_cache.version(user_id)
+            snapshot = await HealthSnapshotManager.select_user_health_snapshot(user_id, db)
+            health_snapshot_cache.set(user_id, snapshot, version)
+        return snapshot
+
+    @staticmethod
+    def invalidate_user_health_snapshot(user_id: str) -> None:
+        """Drop a user's cached snapshot after one of their records is written."""
+        health_snapshot_cache.invalidate(str(user_id))
@@ -0,0 +1,130 @@
+import re
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class ParsedMetric:
+    metric: str
+    value: float
+    unit: str
+
+
+# Metric code -> labels users and devices write before the value
+METRIC_LABELS = {
+    "blood_pressure": ("bp", "blood pressure"),
+    "heart_rate": ("hr", "heart rate", "pulse"),
+    "weight": ("weight", "wt"),
+    "height": ("height",),
+    "temperature": ("temperature", "temp"),
+    "glucose": ("glucose", "blood sugar", "sugar"),
+    "spo2": ("spo2", "oxygen", "o2 sat", "oxygen saturation"),
+    "respiratory_rate": ("rr", "respiratory rate", "respiration"),
+}
+
+# Metric code -> (canonical unit, {written unit: factor to canonical})
+METRIC_UNITS = {
+    "blood_pressure": ("mmHg", {"mmhg": 1.0}),
+    "heart_rate": ("bpm", {"bpm": 1.0, "/min": 1.0}),
+    "weight": (
+        "kg",
+        {"kg": 1.0, "kgs": 1.0, "lb": 0.45359237, "lbs": 0.45359237, "pounds": 0.45359237},
+    ),
+    "height": ("cm", {"cm": 1.0, "m": 100.0, "in": 2.54, "inches": 2.54}),
+    "temperature": ("C", {"c": 1.0, "°c": 1.0}),  # Fahrenheit handled separately
+    "glucose": ("mg/dL", {"mg/dl": 1.0, "mmol/l": 18.0182}),
+    "spo2": ("%", {"%": 1.0}),
+    "respiratory_rate": ("breaths/min", {"breaths/min": 1.0, "/min": 1.0}),
+}
+
+# Metrics written in more than one unit, whose readings are skipped when no unit
+# is written rather than assumed to be in the canonical one
+UNIT_REQUIRED = {"weight", "height", "temperature", "glucose"}
+
+# Numbers may use commas as thousands separators, as in "1,200 lbs"
+_NUMBER = r"(\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?)"
+# A comma between digits belongs to a number, not between two readings
+_SEGMENT_SEPARATOR = re.compile(r"[;\n]+|,(?!\d)")
+_LABEL_AND_REST = re.compile(r"^\s*([a-z][a-z0-9 ]*?)\s*(?:[:=]\s*|\s)(\d.*)$")
+_BLOOD_PRESSURE = re.compile(rf"^{_NUMBER}\s*/\s*{_NUMBER}\s*(mmhg)?\s*$")
+_VALUE_AND_UNIT = re.compile(rf"^{_NUMBER}\s*([^\d\s][^\s]*)?\s*$")
+
+_LABEL_TO_METRIC = {
+    label: metric for metric, labels in METRIC_LABELS.items() for label in labels
+}
+
+
+def _to_float(number: str) -> float:
+    return float(number.replace(",", ""))
+
+
+def _parse_temperature(value: float, unit: str | None) -> ParsedMetric | None:
+    if unit in ("f", "°f"):
+        return ParsedMetric("temperature", round((value - 32) * 5 / 9, 2), "C")
+    if unit in METRIC_UNITS["temperature"][1]:
+        return ParsedMetric("temperature", value, "C")
+    return None
+
+
+def _parse_segment(segment: str) -> list[ParsedMetric]:
+    match = _LABEL_AND_REST.match(segment.lower())
+    if not match:
+        return []
+
+    label, rest = match.groups()
+    metric = _LABEL_TO_METRIC.get(label)
+    if metric is None:
+        return []
+
+    if metric == "blood_pressure":
+        bp = _BLOOD_PRESSURE.match(rest)
+        if not bp:
+            return []
+        return [
+            ParsedMetric("bp_systolic", _to_float(bp.group(1)), "mmHg"),
+            ParsedMetric("bp_diastolic", _to_float(bp.group(2)), "mmHg"),
+        ]
+
+    value_unit = _VALUE_AND_UNIT.match(rest)
+    if not value_unit:
+        return []
+    value = _to_float(value_unit.group(1))
+    unit = value_unit.group(2)
+    if unit is None and metric in UNIT_REQUIRED:
+        return []
+
+    if metric == "temperature":
+        parsed = _parse_temperature(value, unit)
+        return [parsed] if parsed else []
+
+    canonical_unit, factors = METRIC_UNITS[metric]
+    if unit is None:
+        return [ParsedMetric(metric, value, canonical_unit)]
+    if unit not in factors:
+        return []
+    return [ParsedMetric(metric, round(value * factors[unit], 4), canonical_unit)]
+
+
+def parse_measurements(measurements: str) -> list[ParsedMetric]:
+    """
+    Split a free-text measurement entry into typed metrics in canonical units.
+
+    Entries that cannot be parsed unambiguously are skipped, so the original text
+    stays the source of truth. That includes readings without a unit for metrics
+    in UNIT_REQUIRED, such as "Weight: 150", which could be kg or lbs.
+
+    Examples:
+        "BP: 120/80, HR: 75 bpm" -> bp_systolic=120, bp_diastolic=80, heart_rate=75
+        "Weight: 150 lbs" -> weight=68.0389 kg
+        "Temperature: 99.2°F" -> temperature=37.33 C
+
+    Args:
+        measurements: The free-text measurement entry
+
+    Returns:
+        The parsed metrics, at most one per metric code
+    """
+    parsed: dict[str, ParsedMetric] = {}
+    for segment in _SEGMENT_SEPARATOR.split(measurements):
+        for metric in _parse_segment(segment):
+            parsed.setdefault(metric.metric, metric)
+    return list(parsed.values())
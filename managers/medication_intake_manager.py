@@ -1,10 +1,21 @@
 from uuid import UUID
+from datetime import datetime
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import exists, func, select
 
 from models.medication_intake_model import MedicationIntakeModel
-from schemas.medication_intake_schemas import MedicationIntakeCreate, MedicationIntake
+from schemas.medication_intake_schemas import (
+    MedicationIntakeCreate,
+    MedicationIntakeUpdate,
+    MedicationIntake,
+    MedicationIntakeSummary,
+)
+from schemas.pagination_schemas import Page
+from managers.pagination import DEFAULT_PAGE_SIZE, fetch_page, filter_time_range
+from managers.search import DEFAULT_SEARCH_LIMIT, fetch_newest, filter_text_match
+from managers.health_snapshot_manager import HealthSnapshotManager
+from managers.statements import insert_returning, update_returning
 
 
 class MedicationIntakeManager:
@@ -28,66 +39,177 @@ class MedicationIntakeManager:
         if intake_dict.get("condition_id"):
             intake_dict["condition_id"] = UUID(intake_dict["condition_id"])
         
-        intake = MedicationIntakeModel(**intake_dict, user_id=UUID(user_id))
-        db.add(intake)
+        intake = await insert_returning(
+            db, MedicationIntakeModel, {**intake_dict, "user_id": UUID(user_id)}
+        )
         await db.commit()
-        await db.refresh(intake)
+        HealthSnapshotManager.invalidate_user_health_snapshot(user_id)
         return MedicationIntake.model_validate(intake)
 
     @staticmethod
     async def select_user_medication_intakes_by_user_id(
-        user_id: str, db: AsyncSession
-    ) -> list[MedicationIntake]:
+        user_id: str,
+        db: AsyncSession,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        source: str | None = None,
+        cursor: str | None = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+    ) -> Page[MedicationIntake]:
         """
-        Retrieve all medication intakes for a specific user, ordered by intake time (most recent first).
+        Retrieve a page of medication intakes for a specific user, ordered by intake time (most recent first).
         
         Args:
             user_id: The user's unique identifier
             db: Database session
+            start: Only include medication intakes taken on or after this time
+            end: Only include medication intakes taken before this time
+            source: Only include medication intakes from this source (e.g. "user", "prescription")
+            cursor: Cursor returned with the previous page
+            limit: Maximum number of medication intakes to return (capped at MAX_PAGE_SIZE)
             
         Returns:
-            List of all medication intakes for the user
+            A page of medication intakes for the user
         """
-        intakes = (
-            (
-                await db.execute(
-                    select(MedicationIntakeModel)
-                    .where(MedicationIntakeModel.user_id == UUID(user_id))
-                    .order_by(MedicationIntakeModel.intake_datetime.desc())
-                )
-            )
-            .scalars()
-            .all()
+        stmt = select(MedicationIntakeModel).where(MedicationIntakeModel.user_id == UUID(user_id))
+        stmt = filter_time_range(stmt, MedicationIntakeModel.intake_datetime, start, end)
+        if source is not None:
+            stmt = stmt.where(MedicationIntakeModel.source == source)
+        return await fetch_page(
+            db,
+            stmt,
+            MedicationIntakeModel.intake_datetime,
+            MedicationIntakeModel.id,
+            MedicationIntake,
+            cursor,
+            limit,
         )
-        return [MedicationIntake.model_validate(intake) for intake in intakes]
 
     @staticmethod
     async def select_medication_intakes_by_condition(
-        condition_id: str, user_id: str, db: AsyncSession
-    ) -> list[MedicationIntake]:
+        condition_id: str,
+        user_id: str,
+        db: AsyncSession,
+        cursor: str | None = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+    ) -> Page[MedicationIntake]:
         """
-        Retrieve all medication intakes for a specific condition.
+        Retrieve a page of medication intakes for a specific condition, most recent first.
         
         Args:
             condition_id: The condition's unique identifier
             user_id: The user's unique identifier (for security)
             db: Database session
+            cursor: Cursor returned with the previous page
+            limit: Maximum number of medication intakes to return (capped at MAX_PAGE_SIZE)
+            
+        Returns:
+            A page of medication intakes for the specific condition
+        """
+        stmt = select(MedicationIntakeModel).where(
+            MedicationIntakeModel.condition_id == UUID(condition_id),
+            MedicationIntakeModel.user_id == UUID(user_id)
+        )
+        return await fetch_page(
+            db,
+            stmt,
+            MedicationIntakeModel.intake_datetime,
+            MedicationIntakeModel.id,
+            MedicationIntake,
+            cursor,
+            limit,
+        )
+
+    @staticmethod
+    async def search_user_medication_intakes(
+        user_id: str,
+        db: AsyncSession,
+        medication_name: str | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        limit: int = DEFAULT_SEARCH_LIMIT,
+    ) -> list[MedicationIntakeSummary]:
+        """
+        Find a user's medication intakes, most recent first, with only the fields the agent needs.
+        
+        Args:
+            user_id: The user's unique identifier
+            db: Database session
+            medication_name: Only include intakes whose medication name contains this text
+            start: Only include intakes on or after this time
+            end: Only include intakes before this time
+            limit: Maximum number of intakes to return (capped at MAX_SEARCH_LIMIT)
             
         Returns:
-            List of medication intakes for the specific condition
+            The matching medication intakes
+        """
+        stmt = select(
+            MedicationIntakeModel.id,
+            MedicationIntakeModel.intake_datetime,
+            MedicationIntakeModel.medication_name,
+            MedicationIntakeModel.dosage,
+            MedicationIntakeModel.reason,
+        ).where(MedicationIntakeModel.user_id == UUID(user_id))
+        stmt = filter_time_range(stmt, MedicationIntakeModel.intake_datetime, start, end)
+        stmt = filter_text_match(stmt, [MedicationIntakeModel.medication_name], medication_name)
+        return await fetch_newest(
+            db,
+            stmt,
+            MedicationIntakeModel.intake_datetime,
+            MedicationIntakeModel.id,
+            MedicationIntakeSummary,
+            limit,
+        )
+
+    @staticmethod
+    async def has_user_medication_intake(
+        user_id: str, medication_name: str, db: AsyncSession
+    ) -> bool:
         """
-        intakes = (
-            (
-                await db.execute(
-                    select(MedicationIntakeModel)
-                    .where(
-                        MedicationIntakeModel.condition_id == UUID(condition_id),
-                        MedicationIntakeModel.user_id == UUID(user_id)
-                    )
-                    .order_by(MedicationIntakeModel.intake_datetime.desc())
-                )
+        Check whether a user has recorded an intake of a medication before.
+        
+        Args:
+            user_id: The user's unique identifier
+            medication_name: The medication name, compared case-insensitively
+            db: Database session
+            
+        Returns:
+            True if the user has an intake with that medication name
+        """
+        stmt = select(
+            exists().where(
+                MedicationIntakeModel.user_id == UUID(user_id),
+                func.lower(MedicationIntakeModel.medication_name) == medication_name.lower(),
             )
-            .scalars()
-            .all()
         )
-        return [MedicationIntake.model_validate(intake) for intake in intakes]
\ No newline at end of file
+        return (await db.execute(stmt)).scalar_one()
+
+    @staticmethod
+    async def update_medication_intake(
+        intake_id: str, intake_data: MedicationIntakeUpdate, user_id: str, db: AsyncSession
+    ) -> MedicationIntake | None:
+        """
+        Update an existing medication intake record.
+        
+        Args:
+            intake_id: The medication intake's unique identifier
+            intake_data: The updated medication intake data
+            user_id: The user's unique identifier (for security)
+            db: Database session
+            
+        Returns:
+            The updated medication intake record, or None if not found
+        """
+        # Only update fields that are not None
+        update_data = {k: v for k, v in intake_data.model_dump().items() if v is not None}
+        
+        if not update_data:
+            return None
+
+        if update_data.get("condition_id"):
+            update_data["condition_id"] = UUID(update_data["condition_id"])
+
+        intake = await update_returning(db, MedicationIntakeModel, intake_id, user_id, update_data)
+        await db.commit()
+        HealthSnapshotManager.invalidate_user_health_snapshot(user_id)
+        return MedicationIntake.model_validate(intake) if intake else None
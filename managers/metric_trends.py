@@ -0,0 +1,97 @@
+from datetime import datetime
+
+import numpy as np
+
+from schemas.health_metric_schemas import MetricBucket, MetricTrend, TrendBucket
+
+
+BUCKET_SECONDS = {"hour": 3600, "day": 86400, "week": 7 * 86400}
+# Epoch is a Thursday; weekly buckets start on Monday (1970-01-05)
+BUCKET_ORIGIN = {"hour": 0, "day": 0, "week": 4 * 86400}
+PERCENTILES = (5, 25, 50, 75, 95)
+
+
+def _to_datetimes(epoch_seconds: np.ndarray) -> list[datetime]:
+    return epoch_seconds.astype("datetime64[s]").astype(datetime).tolist()
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing mean over `window` points, expanding over the first `window - 1`."""
+    cumulative = np.concatenate(([0.0], np.cumsum(values)))
+    index = np.arange(1, len(values) + 1)
+    lower = np.maximum(index - window, 0)
+    return (cumulative[index] - cumulative[lower]) / (index - lower)
+
+
+def compute_metric_trend(
+    metric: str,
+    unit: str,
+    timestamps: np.ndarray,
+    values: np.ndarray,
+    bucket: TrendBucket,
+    window: int,
+) -> MetricTrend:
+    """
+    Compute summary statistics and a bucketed series for one metric.
+
+    Args:
+        metric: The metric code
+        unit: The metric's canonical unit
+        timestamps: Epoch seconds of each reading, sorted ascending
+        values: Reading values aligned with `timestamps`
+        bucket: Bucket width of the series
+        window: Number of buckets in the rolling mean
+
+    Returns:
+        The metric's trend
+    """
+    size = BUCKET_SECONDS[bucket]
+    origin = BUCKET_ORIGIN[bucket]
+
+    # Timestamps are sorted, so each bucket is a contiguous run of readings
+    keys = np.floor_divide(timestamps - origin, size).astype(np.int64)
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(keys)) + 1))
+    counts = np.diff(np.concatenate((starts, [len(values)])))
+    means = np.add.reduceat(values, starts) / counts
+    mins = np.minimum.reduceat(values, starts)
+    maxs = np.maximum.reduceat(values, starts)
+    rolling = rolling_mean(means, window)
+    bucket_starts = _to_datetimes(keys[starts] * size + origin)
+
+    slope_per_day = None
+    if timestamps[-1] > timestamps[0]:
+        days = (timestamps - timestamps[0]) / 86400
+        slope_per_day = float(np.polyfit(days, values, 1)[0])
+
+    first_recorded_at, last_recorded_at = _to_datetimes(timestamps[[0, -1]])
+    return MetricTrend(
+        metric=metric,
+        unit=unit,
+        count=len(values),
+        first_recorded_at=first_recorded_at,
+        last_recorded_at=last_recorded_at,
+        latest=float(values[-1]),
+        mean=float(values.mean()),
+        min=float(values.min()),
+        max=float(values.max()),
+        percentiles=dict(
+            zip(
+                (f"p{p}" for p in PERCENTILES),
+                np.percentile(values, PERCENTILES).tolist(),
+            )
+        ),
+        slope_per_day=slope_per_day,
+        buckets=[
+            MetricBucket(
+                start=start, count=count, mean=mean, min=low, max=high, rolling_mean=avg
+            )
+            for start, count, mean, low, high, avg in zip(
+                bucket_starts,
+                counts.tolist(),
+                means.tolist(),
+                mins.tolist(),
+                maxs.tolist(),
+                rolling.tolist(),
+            )
+        ],
+    )
@@ -0,0 +1,111 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import UTC, datetime
+from uuid import UUID
+
+from pydantic import BaseModel
+from sqlalchemy import Select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from schemas.pagination_schemas import Page
+
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+def encode_cursor(timestamp: datetime, record_id: UUID) -> str:
+    """Encode the (timestamp, id) seek position of a record as an opaque string."""
+    raw = f"{timestamp.isoformat()}|{record_id}".encode()
+    return urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    """Decode a cursor produced by `encode_cursor`."""
+    try:
+        raw = urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        timestamp, record_id = raw.split("|")
+        return datetime.fromisoformat(timestamp), UUID(record_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise InvalidCursorError("Invalid pagination cursor") from e
+
+
+def clamp_page_size(limit: int) -> int:
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def strip_timezone(value: datetime | None) -> datetime | None:
+    # Record timestamps are stored as TIMESTAMP WITHOUT TIME ZONE in UTC, so an
+    # offset is applied rather than dropped
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        return value.astimezone(UTC).replace(tzinfo=None)
+    return value
+
+
+def filter_time_range(
+    stmt: Select, time_column, start: datetime | None, end: datetime | None
+) -> Select:
+    """Restrict a query to records with `start <= time_column < end`."""
+    if start is not None:
+        stmt = stmt.where(time_column >= strip_timezone(start))
+    if end is not None:
+        stmt = stmt.where(time_column < strip_timezone(end))
+    return stmt
+
+
+async def fetch_page(
+    db: AsyncSession,
+    stmt: Select,
+    time_column,
+    id_column,
+    schema: type[BaseModel],
+    cursor: str | None,
+    limit: int,
+) -> Page:
+    """
+    Execute a keyset-paginated query ordered by (time_column, id_column) descending.
+
+    Args:
+        db: Database session
+        stmt: Select statement with all filters already applied
+        time_column: Timestamp column the records are sorted by
+        id_column: Primary key column used as the tie-breaker
+        schema: Pydantic schema each row is validated into
+        cursor: Cursor returned with the previous page, or None for the first page
+        limit: Requested page size, capped at MAX_PAGE_SIZE
+
+    Returns:
+        The page of records and the cursor for the next one
+
+    Raises:
+        InvalidCursorError: If the cursor cannot be decoded
+    """
+    limit = clamp_page_size(limit)
+    if cursor is not None:
+        timestamp, record_id = decode_cursor(cursor)
+        stmt = stmt.where(tuple_(time_column, id_column) < tuple_(timestamp, record_id))
+
+    # Fetch one extra row to know whether another page exists
+    records = (
+        (
+            await db.execute(
+                stmt.order_by(time_column.desc(), id_column.desc()).limit(limit + 1)
+            )
+        )
+        .scalars()
+        .all()
+    )
+
+    next_cursor = None
+    if len(records) > limit:
+        records = records[:limit]
+        last = records[-1]
+        next_cursor = encode_cursor(getattr(last, time_column.key), getattr(last, id_column.key))
+
+    return Page(
+        items=[schema.model_validate(record) for record in records],
+        next_cursor=next_cursor,
+    )
@@ -2,7 +2,8 @@ from uuid import UUID
 from typing import Optional
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import update, select
+from sqlalchemy import func, literal_column, select
+from sqlalchemy.dialects.postgresql import insert
 
 from schemas.profile_schemas import ProfileData, Profile
 from models.profile_model import ProfileModel
@@ -10,27 +11,36 @@ from models.profile_model import ProfileModel
 
 class ProfileManager:
     @staticmethod
-    async def update_user_profile(
-        profile_data: ProfileData, profile_id: str, db: AsyncSession
-    ) -> Profile:
-        stmt = (
-            update(ProfileModel)
-            .where(ProfileModel.id == profile_id)
-            .values(**profile_data.model_dump())
-        )
-        result = await db.execute(stmt)
-        updated_profile = result.scalar_one()
-        await db.commit()
-        return Profile.model_validate(updated_profile)
-
-    @staticmethod
-    async def insert_user_profile(
+    async def upsert_user_profile(
         profile_data: ProfileData, user_id: str, db: AsyncSession
-    ) -> Profile:
-        profile = ProfileModel(**profile_data.model_dump(), user_id=UUID(user_id))
-        db.add(profile)
+    ) -> tuple[Profile, bool]:
+        """
+        Create the user's profile, or overwrite it if one exists, in a single statement.
+        
+        Relies on the unique constraint on profiles.user_id, so concurrent calls for
+        the same user cannot create duplicate profiles.
+        
+        Args:
+            profile_data: The profile data to store
+            user_id: The user's unique identifier
+            db: Database session
+            
+        Returns:
+            The stored profile, and whether it was newly created
+        """
+        values = profile_data.model_dump()
+        stmt = insert(ProfileModel).values(**values, user_id=UUID(user_id))
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ProfileModel.user_id],
+            set_={**values, "updated_at": func.now()},
+        ).returning(
+            ProfileModel.id,
+            # xmax is only zero on a row version that was inserted, not updated
+            literal_column("xmax = 0").label("created"),
+        )
+        result = (await db.execute(stmt)).one()
         await db.commit()
-        return Profile.model_validate(profile)
+        return Profile.model_validate(result), result.created
 
     @staticmethod
     async def select_user_profile(user_id: str, db: AsyncSession) -> Optional[Profile]:
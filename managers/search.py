@@ -0,0 +1,48 @@
+from pydantic import BaseModel
+from sqlalchemy import Select, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 50
+
+
+def filter_text_match(stmt: Select, columns: list, query: str | None) -> Select:
+    """Restrict a query to rows where any of `columns` contains `query`, ignoring case."""
+    if not query:
+        return stmt
+    # LIKE wildcards in the query are matched literally
+    escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return stmt.where(or_(*(column.ilike(f"%{escaped}%") for column in columns)))
+
+
+async def fetch_newest(
+    db: AsyncSession,
+    stmt: Select,
+    time_column,
+    id_column,
+    schema: type[BaseModel],
+    limit: int,
+) -> list:
+    """
+    Execute a column projection newest first and validate each row into `schema`.
+
+    With the user filter already applied, the per-user (time, id) indexes serve the
+    order, so the scan stops after `limit` matching rows.
+
+    Args:
+        db: Database session
+        stmt: Select of the projected columns with all filters already applied
+        time_column: Timestamp column the records are sorted by
+        id_column: Primary key column used as the tie-breaker
+        schema: Pydantic schema each row is validated into
+        limit: Requested number of rows, capped at MAX_SEARCH_LIMIT
+
+    Returns:
+        The matching rows, most recent first
+    """
+    limit = max(1, min(limit, MAX_SEARCH_LIMIT))
+    rows = await db.execute(
+        stmt.order_by(time_column.desc(), id_column.desc()).limit(limit)
+    )
+    return [schema.model_validate(row._mapping) for row in rows]
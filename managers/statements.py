@@ -0,0 +1,60 @@
+from uuid import UUID
+
+from sqlalchemy import Row, insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db import Base
+
+
+async def insert_returning(db: AsyncSession, model: type[Base], values: dict) -> Row:
+    """
+    INSERT a row and read it back, server defaults included, in a single statement.
+
+    None values for columns with a server default are left out so the default applies.
+    The caller is responsible for committing.
+
+    Args:
+        db: Database session
+        model: Model of the table to insert into
+        values: Column values of the new row
+
+    Returns:
+        Every column of the inserted row
+    """
+    table = model.__table__
+    values = {
+        key: value
+        for key, value in values.items()
+        if value is not None or table.c[key].server_default is None
+    }
+    result = await db.execute(insert(table).values(**values).returning(*table.c))
+    return result.one()
+
+
+async def update_returning(
+    db: AsyncSession, model: type[Base], record_id: str, user_id: str, values: dict
+) -> Row | None:
+    """
+    UPDATE one of a user's rows and read it back in a single statement.
+
+    Ownership is enforced in the WHERE clause, so a row belonging to another user
+    is neither changed nor returned. The caller is responsible for committing.
+
+    Args:
+        db: Database session
+        model: Model of the table to update
+        record_id: The row's unique identifier
+        user_id: The owning user's unique identifier
+        values: Column values to set
+
+    Returns:
+        Every column of the updated row, or None if the user has no such row
+    """
+    table = model.__table__
+    result = await db.execute(
+        update(table)
+        .where(table.c.id == UUID(record_id), table.c.user_id == UUID(user_id))
+        .values(**values)
+        .returning(*table.c)
+    )
+    return result.one_or_none()
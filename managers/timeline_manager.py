@@ -0,0 +1,131 @@
+from uuid import UUID
+from datetime import datetime
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, literal_column, select, tuple_, union_all
+from sqlalchemy.dialects.postgresql import JSONB
+
+from models.visit_model import DoctorVisitModel
+from models.condition_model import ConditionModel
+from models.health_measurement_model import HealthMeasurementModel
+from models.diagnostic_procedure_model import DiagnosticProcedureModel
+from models.medication_intake_model import MedicationIntakeModel
+from schemas.visit_schemas import Visit
+from schemas.condition_schemas import Condition
+from schemas.health_measurement_schemas import HealthMeasurement
+from schemas.diagnostic_procedure_schemas import DiagnosticProcedure
+from schemas.medication_intake_schemas import MedicationIntake
+from schemas.timeline_schemas import TimelineEvent, TimelineEventType
+from schemas.pagination_schemas import Page
+from managers.pagination import (
+    DEFAULT_PAGE_SIZE,
+    clamp_page_size,
+    decode_cursor,
+    encode_cursor,
+    filter_time_range,
+)
+
+
+# Event type -> (model, event time column, response schema)
+TIMELINE_SOURCES = {
+    "visit": (DoctorVisitModel, DoctorVisitModel.visit_datetime, Visit),
+    "condition": (ConditionModel, ConditionModel.event_date, Condition),
+    "measurement": (
+        HealthMeasurementModel,
+        HealthMeasurementModel.recorded_at,
+        HealthMeasurement,
+    ),
+    "procedure": (
+        DiagnosticProcedureModel,
+        DiagnosticProcedureModel.procedure_datetime,
+        DiagnosticProcedure,
+    ),
+    "medication_intake": (
+        MedicationIntakeModel,
+        MedicationIntakeModel.intake_datetime,
+        MedicationIntake,
+    ),
+}
+
+
+class TimelineManager:
+    @staticmethod
+    async def select_user_timeline(
+        user_id: str,
+        db: AsyncSession,
+        types: list[TimelineEventType] | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        cursor: str | None = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+    ) -> Page[TimelineEvent]:
+        """
+        Retrieve a page of the user's health records of every type, ordered by event time (most recent first).
+        
+        All record types are read with a single UNION ALL query. Each branch is
+        keyset-limited on its own (user_id, time) index, so a page never reads more
+        than `limit + 1` rows per record type.
+        
+        Args:
+            user_id: The user's unique identifier
+            db: Database session
+            types: Record types to include, or None for all of them
+            start: Only include records on or after this time
+            end: Only include records before this time
+            cursor: Cursor returned with the previous page
+            limit: Maximum number of records to return (capped at MAX_PAGE_SIZE)
+            
+        Returns:
+            A page of timeline events for the user
+            
+        Raises:
+            InvalidCursorError: If the cursor cannot be decoded
+        """
+        limit = clamp_page_size(limit)
+        seek = decode_cursor(cursor) if cursor is not None else None
+
+        branches = []
+        for event_type, (model, time_column, _) in TIMELINE_SOURCES.items():
+            if types and event_type not in types:
+                continue
+            branch = select(
+                literal_column(f"'{event_type}'").label("type"),
+                model.id.label("id"),
+                time_column.label("occurred_at"),
+                func.to_jsonb(model.__table__.table_valued(), type_=JSONB).label("record"),
+            ).where(model.user_id == UUID(user_id))
+            branch = filter_time_range(branch, time_column, start, end)
+            if seek is not None:
+                branch = branch.where(tuple_(time_column, model.id) < tuple_(*seek))
+            branches.append(
+                branch.order_by(time_column.desc(), model.id.desc()).limit(limit + 1)
+            )
+
+        if not branches:
+            return Page(items=[])
+
+        timeline = union_all(*(branch.subquery().select() for branch in branches)).subquery()
+        rows = (
+            await db.execute(
+                select(timeline)
+                .order_by(timeline.c.occurred_at.desc(), timeline.c.id.desc())
+                .limit(limit + 1)
+            )
+        ).all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1].occurred_at, rows[-1].id)
+
+        return Page(
+            items=[
+                TimelineEvent(
+                    type=row.type,
+                    occurred_at=row.occurred_at,
+                    record=TIMELINE_SOURCES[row.type][2].model_validate(row.record),
+                )
+                for row in rows
+            ],
+            next_cursor=next_cursor,
+        )
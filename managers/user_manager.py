@@ -6,6 +6,7 @@ from sqlalchemy.orm.exc import NoResultFound
 
 from models.user_model import UserModel
 from schemas.user_schemas import User, UserCreate
+from managers.statements import insert_returning
 
 
 class UserManager:
@@ -47,7 +48,6 @@ class UserManager:
 
     @staticmethod
     async def insert_user(user_data: UserCreate, db: AsyncSession) -> UserModel:
-        user = UserModel(**user_data.model_dump())
-        db.add(user)
+        user = await insert_returning(db, UserModel, user_data.model_dump())
         await db.commit()
         return User.model_validate(user)
@@ -1,10 +1,16 @@
 from uuid import UUID
+from datetime import datetime
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update
+from sqlalchemy import select
 
 from models.visit_model import DoctorVisitModel
-from schemas.visit_schemas import VisitCreate, VisitUpdate, Visit
+from schemas.visit_schemas import VisitCreate, VisitUpdate, Visit, VisitSummary
+from schemas.pagination_schemas import Page
+from managers.pagination import DEFAULT_PAGE_SIZE, fetch_page, filter_time_range
+from managers.search import DEFAULT_SEARCH_LIMIT, fetch_newest, filter_text_match
+from managers.health_snapshot_manager import HealthSnapshotManager
+from managers.statements import insert_returning, update_returning
 
 
 class VisitManager:
@@ -23,38 +29,82 @@ class VisitManager:
         Returns:
             The created doctor visit record
         """
-        visit = DoctorVisitModel(**visit_data.model_dump(), user_id=UUID(user_id))
-        db.add(visit)
+        visit = await insert_returning(
+            db, DoctorVisitModel, {**visit_data.model_dump(), "user_id": UUID(user_id)}
+        )
         await db.commit()
-        await db.refresh(visit)
+        HealthSnapshotManager.invalidate_user_health_snapshot(user_id)
         return Visit.model_validate(visit)
 
     @staticmethod
     async def select_user_doctor_visits_by_user_id(
-        user_id: str, db: AsyncSession
-    ) -> list[Visit]:
+        user_id: str,
+        db: AsyncSession,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        cursor: str | None = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+    ) -> Page[Visit]:
+        """
+        Retrieve a page of doctor visits for a specific user, ordered by visit date (most recent first).
+        
+        Args:
+            user_id: The user's unique identifier
+            db: Database session
+            start: Only include visits on or after this time
+            end: Only include visits before this time
+            cursor: Cursor returned with the previous page
+            limit: Maximum number of visits to return (capped at MAX_PAGE_SIZE)
+            
+        Returns:
+            A page of doctor visits for the user
+        """
+        stmt = select(DoctorVisitModel).where(DoctorVisitModel.user_id == UUID(user_id))
+        stmt = filter_time_range(stmt, DoctorVisitModel.visit_datetime, start, end)
+        return await fetch_page(
+            db, stmt, DoctorVisitModel.visit_datetime, DoctorVisitModel.id, Visit, cursor, limit
+        )
+
+    @staticmethod
+    async def search_user_doctor_visits(
+        user_id: str,
+        db: AsyncSession,
+        text: str | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        limit: int = DEFAULT_SEARCH_LIMIT,
+    ) -> list[VisitSummary]:
         """
-        Retrieve all doctor visits for a specific user, ordered by visit date (most recent first).
+        Find a user's doctor visits, most recent first, with only the fields the agent needs.
         
         Args:
             user_id: The user's unique identifier
             db: Database session
+            text: Only include visits whose reason, doctor or diagnosis contains this text
+            start: Only include visits on or after this time
+            end: Only include visits before this time
+            limit: Maximum number of visits to return (capped at MAX_SEARCH_LIMIT)
             
         Returns:
-            List of all doctor visits for the user
+            The matching doctor visits
         """
-        visits = (
-            (
-                await db.execute(
-                    select(DoctorVisitModel)
-                    .where(DoctorVisitModel.user_id == UUID(user_id))
-                    .order_by(DoctorVisitModel.visit_datetime.desc())
-                )
-            )
-            .scalars()
-            .all()
+        stmt = select(
+            DoctorVisitModel.id,
+            DoctorVisitModel.visit_datetime,
+            DoctorVisitModel.reason,
+            DoctorVisitModel.doctor_name,
+            DoctorVisitModel.diagnosis,
+            DoctorVisitModel.treatment,
+        ).where(DoctorVisitModel.user_id == UUID(user_id))
+        stmt = filter_time_range(stmt, DoctorVisitModel.visit_datetime, start, end)
+        stmt = filter_text_match(
+            stmt,
+            [DoctorVisitModel.reason, DoctorVisitModel.doctor_name, DoctorVisitModel.diagnosis],
+            text,
+        )
+        return await fetch_newest(
+            db, stmt, DoctorVisitModel.visit_datetime, DoctorVisitModel.id, VisitSummary, limit
         )
-        return [Visit.model_validate(visit) for visit in visits]
 
     @staticmethod
     async def update_doctor_visit(
@@ -77,23 +127,8 @@ class VisitManager:
         
         if not update_data:
             return None
-            
-        await db.execute(
-            update(DoctorVisitModel)
-            .where(
-                DoctorVisitModel.id == UUID(visit_id),
-                DoctorVisitModel.user_id == UUID(user_id)
-            )
-            .values(**update_data)
-        )
+
+        visit = await update_returning(db, DoctorVisitModel, visit_id, user_id, update_data)
         await db.commit()
-        
-        # Fetch and return updated record
-        result = await db.execute(
-            select(DoctorVisitModel).where(
-                DoctorVisitModel.id == UUID(visit_id),
-                DoctorVisitModel.user_id == UUID(user_id)
-            )
-        )
-        visit = result.scalar_one_or_none()
-        return Visit.model_validate(visit) if visit else None
\ No newline at end of file
+        HealthSnapshotManager.invalidate_user_health_snapshot(user_id)
+        return Visit.model_validate(visit) if visit else None
@@ -0,0 +1,227 @@
+"""Prometheus metrics, served at /metrics when METRICS_ENABLED is set.
+
+Nothing here is hooked in unless metrics are enabled: no middleware, engine
+listeners, Mongo listeners, trace processor or session wrapper is installed,
+so a disabled app pays nothing beyond one flag check per chat session.
+
+Metrics are per worker process; scrape each worker, or aggregate by instance.
+"""
+import os
+import sys
+import time
+from typing import Any, Callable
+
+import greenlet
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Histogram, generate_latest
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.registry import Collector
+from pymongo import monitoring
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from agents.tracing import Span, Trace, TracingProcessor
+from agents.tracing.span_data import FunctionSpanData, GenerationSpanData, ResponseSpanData
+
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "Time to answer an HTTP request, to the end of the body for streams",
+    ["method", "route", "status"],
+)
+DB_QUERY_SECONDS = Histogram(
+    "db_query_duration_seconds",
+    "Time of one SQL statement, by the manager method that ran it",
+    ["operation"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+MONGO_COMMAND_SECONDS = Histogram(
+    "mongo_command_duration_seconds",
+    "Time of one Mongo command, as measured by the driver",
+    ["command", "outcome"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+AGENT_STAGE_SECONDS = Histogram(
+    "agent_run_stage_duration_seconds",
+    "Time of one stage of an agent run: history_load, model_call, history_save or history_flush",
+    ["stage"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+AGENT_TOOL_SECONDS = Histogram(
+    "agent_tool_call_duration_seconds",
+    "Time of one agent tool call",
+    ["tool"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+
+_MANAGERS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "managers") + os.sep
+_SQL_SESSION_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sql_alchemy_session.py")
+
+
+class RequestTimingMiddleware:
+    """Records REQUEST_SECONDS by route template, so /records/{id} is one series."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            REQUEST_SECONDS.labels(scope["method"], _route_label(scope), str(status)).observe(
+                time.perf_counter() - started
+            )
+
+
+def _route_label(scope: Scope) -> str:
+    # FastAPI stores the matched API route in the scope. Plain Starlette routes,
+    # like /docs and /metrics, only leave their endpoint and have static paths.
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    if "endpoint" in scope:
+        return scope["path"]
+    return "unmatched"
+
+
+def _query_operation() -> str:
+    """Name of the manager method, or chat session method, running the current query."""
+    # Queries run in a greenlet spawned by the AsyncSession, so the awaiting
+    # coroutines are found through the parent greenlet's frames
+    frame = sys._getframe(2)
+    current = greenlet.getcurrent()
+    while True:
+        while frame is not None:
+            filename = frame.f_code.co_filename
+            if filename.startswith(_MANAGERS_DIR) or filename == _SQL_SESSION_FILE:
+                return frame.f_code.co_qualname
+            frame = frame.f_back
+        current = current.parent
+        if current is None:
+            return "other"
+        frame = current.gr_frame
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Time every statement of the engine into DB_QUERY_SECONDS."""
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_operation = _query_operation()
+        context._metrics_started = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        DB_QUERY_SECONDS.labels(context._metrics_operation).observe(
+            time.perf_counter() - context._metrics_started
+        )
+
+
+class MongoCommandTimer(monitoring.CommandListener):
+    """Records MONGO_COMMAND_SECONDS from the driver's command monitoring events."""
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        pass
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        MONGO_COMMAND_SECONDS.labels(event.command_name, "succeeded").observe(
+            event.duration_micros / 1e6
+        )
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        MONGO_COMMAND_SECONDS.labels(event.command_name, "failed").observe(
+            event.duration_micros / 1e6
+        )
+
+
+class AgentSpanTimer(TracingProcessor):
+    """Records model calls and tool calls from the agents SDK's tracing spans.
+
+    Spans are only produced while tracing is enabled, which is the SDK default.
+    """
+
+    def __init__(self):
+        self._started: dict[str, float] = {}
+
+    def on_trace_start(self, trace: Trace) -> None:
+        pass
+
+    def on_trace_end(self, trace: Trace) -> None:
+        pass
+
+    def on_span_start(self, span: Span[Any]) -> None:
+        if isinstance(span.span_data, (ResponseSpanData, GenerationSpanData, FunctionSpanData)):
+            self._started[span.span_id] = time.perf_counter()
+
+    def on_span_end(self, span: Span[Any]) -> None:
+        started = self._started.pop(span.span_id, None)
+        if started is None:
+            return
+        elapsed = time.perf_counter() - started
+        if isinstance(span.span_data, FunctionSpanData):
+            AGENT_TOOL_SECONDS.labels(span.span_data.name).observe(elapsed)
+        else:
+            AGENT_STAGE_SECONDS.labels("model_call").observe(elapsed)
+
+    def shutdown(self) -> None:
+        pass
+
+    def force_flush(self) -> None:
+        pass
+
+
+class TimedChatSession:
+    """Wraps a chat session to time the runner's history reads and writes."""
+
+    def __init__(self, session):
+        self._session = session
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._session, name)
+
+    async def get_items(self, limit: int | None = None) -> list:
+        with AGENT_STAGE_SECONDS.labels("history_load").time():
+            return await self._session.get_items(limit)
+
+    async def add_items(self, items: list) -> None:
+        with AGENT_STAGE_SECONDS.labels("history_save").time():
+            await self._session.add_items(items)
+
+    async def flush(self) -> None:
+        with AGENT_STAGE_SECONDS.labels("history_flush").time():
+            await self._session.flush()
+
+
+class SummaryCollector(Collector):
+    """Exports the numeric fields of a stats summary dict as gauges, read on each scrape."""
+
+    def __init__(self, prefix: str, summary: Callable[[], dict[str, Any]]):
+        self.prefix = prefix
+        self.summary = summary
+
+    def collect(self):
+        for name, value in self.summary().items():
+            if isinstance(value, (int, float)):
+                yield GaugeMetricFamily(f"{self.prefix}_{name}", f"{self.prefix} {name}", value=value)
+
+
+def register_summary(prefix: str, summary: Callable[[], dict[str, Any]]) -> None:
+    REGISTRY.register(SummaryCollector(prefix, summary))
+
+
+async def metrics_endpoint(request: Request) -> Response:
+    return Response(generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,13 @@
+CREATE TABLE health_metrics (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    measurement_id UUID NOT NULL REFERENCES health_measurements(id) ON DELETE CASCADE,
+    metric TEXT NOT NULL,
+    value DOUBLE PRECISION NOT NULL,
+    unit TEXT NOT NULL,
+    recorded_at TIMESTAMP NOT NULL DEFAULT now(),
+    UNIQUE (measurement_id, metric)
+);
+
+CREATE INDEX ix_health_metrics_user_metric_recorded_at
+    ON health_metrics (user_id, metric, recorded_at);
@@ -0,0 +1,21 @@
+-- Composite indexes behind the per-user, newest-first record lists.
+-- CONCURRENTLY avoids locking the tables for writes, so run this file
+-- outside a transaction block (e.g. psql -f, not inside BEGIN/COMMIT).
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_conditions_user_id_event_date
+    ON conditions (user_id, event_date DESC, id DESC);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_doctor_visits_user_id_visit_datetime
+    ON doctor_visits (user_id, visit_datetime DESC, id DESC);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_health_measurements_user_id_recorded_at
+    ON health_measurements (user_id, recorded_at DESC, id DESC);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_diagnostic_procedures_user_id_procedure_datetime
+    ON diagnostic_procedures (user_id, procedure_datetime DESC, id DESC);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_medication_intakes_user_id_intake_datetime
+    ON medication_intakes (user_id, intake_datetime DESC, id DESC);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_medication_intakes_user_id_condition_id
+    ON medication_intakes (user_id, condition_id, intake_datetime DESC, id DESC);
@@ -0,0 +1,8 @@
+-- Keep only the most recently updated profile per user before enforcing one profile per user.
+DELETE FROM profiles p
+USING profiles newer
+WHERE p.user_id = newer.user_id
+  AND (COALESCE(p.updated_at, 'epoch'), p.id)
+      < (COALESCE(newer.updated_at, 'epoch'), newer.id);
+
+ALTER TABLE profiles ADD CONSTRAINT profiles_user_id_key UNIQUE (user_id);
@@ -0,0 +1,6 @@
+-- Newest-first index behind the agent's reading search across all metrics.
+-- CONCURRENTLY avoids locking the table for writes, so run this file
+-- outside a transaction block (e.g. psql -f, not inside BEGIN/COMMIT).
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_health_metrics_user_id_recorded_at
+    ON health_metrics (user_id, recorded_at DESC, id DESC);
@@ -0,0 +1,9 @@
+-- Rolling compaction of chat history: older messages are replaced by the
+-- session's summary and kept in agent_messages with archived = true.
+
+ALTER TABLE agent_sessions
+    ADD COLUMN summary TEXT,
+    ADD COLUMN summary_version INTEGER NOT NULL DEFAULT 0;
+
+ALTER TABLE agent_messages
+    ADD COLUMN archived BOOLEAN NOT NULL DEFAULT false;
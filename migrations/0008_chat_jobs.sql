@@ -0,0 +1,17 @@
+-- Chat messages submitted as background jobs, see POST /chat/jobs.
+
+CREATE TABLE chat_jobs (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    conversation_id TEXT NOT NULL,
+    message TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    response JSONB,
+    error TEXT,
+    created_at TIMESTAMP NOT NULL DEFAULT now(),
+    started_at TIMESTAMP,
+    finished_at TIMESTAMP
+);
+
+CREATE INDEX ix_chat_jobs_status_created_at
+    ON chat_jobs (status, created_at);
@@ -0,0 +1,18 @@
+-- Per-conversation lease that serializes chat turns across workers, and the
+-- inbox of messages waiting for the conversation's next turn.
+
+ALTER TABLE agent_sessions
+    ADD COLUMN lease_owner TEXT,
+    ADD COLUMN lease_expires_at TIMESTAMP;
+
+CREATE TABLE agent_inbox (
+    id UUID PRIMARY KEY,
+    session_id TEXT NOT NULL REFERENCES agent_sessions(session_id) ON DELETE CASCADE,
+    message TEXT NOT NULL,
+    taken BOOLEAN NOT NULL DEFAULT false,
+    reply JSONB,
+    created_at TIMESTAMP NOT NULL DEFAULT now()
+);
+
+CREATE INDEX ix_agent_inbox_session_id_created_at
+    ON agent_inbox (session_id, created_at);
@@ -0,0 +1,70 @@
+from sqlalchemy import (
+    BigInteger, Boolean, Column, Identity, Index, Integer, Text, TIMESTAMP, ForeignKey, func
+)
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+
+from db import Base
+
+
+class AgentSessionModel(Base):
+    """A chat conversation whose history is stored in agent_messages."""
+
+    __tablename__ = "agent_sessions"
+
+    session_id = Column(Text, primary_key=True)         # The conversation id
+
+    summary = Column(Text)                              # Stands in for the archived messages
+    summary_version = Column(Integer, server_default="0", nullable=False)   # Bumped on each compaction
+
+    lease_owner = Column(Text)                          # Holder of the lease that serializes turns
+    lease_expires_at = Column(TIMESTAMP)
+
+    created_at = Column(TIMESTAMP, server_default=func.now(), nullable=False)
+    updated_at = Column(TIMESTAMP, server_default=func.now(), nullable=False)
+
+
+class AgentMessageModel(Base):
+    """One agent input item in a conversation's history."""
+
+    __tablename__ = "agent_messages"
+
+    id = Column(BigInteger, Identity(), primary_key=True)   # Increases in insertion order
+
+    session_id = Column(
+        Text,
+        ForeignKey("agent_sessions.session_id", ondelete="CASCADE"),
+        nullable=False,
+    )
+
+    message_data = Column(JSONB, nullable=False)        # The item as the agents SDK produced it
+    archived = Column(Boolean, server_default="false", nullable=False)  # Folded into the summary
+
+    created_at = Column(TIMESTAMP, server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_agent_messages_session_id_id", "session_id", id.desc()),
+    )
+
+
+class AgentInboxModel(Base):
+    """A user message waiting for, or answered by, the conversation's next turn."""
+
+    __tablename__ = "agent_inbox"
+
+    id = Column(UUID(as_uuid=True), primary_key=True)
+
+    session_id = Column(
+        Text,
+        ForeignKey("agent_sessions.session_id", ondelete="CASCADE"),
+        nullable=False,
+    )
+
+    message = Column(Text, nullable=False)
+    taken = Column(Boolean, server_default="false", nullable=False)     # Picked up by a turn
+    reply = Column(JSONB, nullable=True)                # The ChatResponse of that turn
+
+    created_at = Column(TIMESTAMP, server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_agent_inbox_session_id_created_at", "session_id", "created_at"),
+    )
@@ -0,0 +1,32 @@
+import uuid
+
+from sqlalchemy import Column, Index, Text, TIMESTAMP, ForeignKey, func
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+
+from db import Base
+
+
+class ChatJobModel(Base):
+    """A chat message answered in the background and fetched by polling."""
+
+    __tablename__ = "chat_jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+
+    user_id = Column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+
+    conversation_id = Column(Text, nullable=False)
+    message = Column(Text, nullable=False)
+    status = Column(Text, server_default="queued", nullable=False)   # queued, running, succeeded or failed
+    response = Column(JSONB, nullable=True)             # The ChatResponse once succeeded
+    error = Column(Text, nullable=True)                 # Why the job failed
+
+    created_at = Column(TIMESTAMP, server_default=func.now(), nullable=False)
+    started_at = Column(TIMESTAMP, nullable=True)
+    finished_at = Column(TIMESTAMP, nullable=True)
+
+    __table_args__ = (
+        Index("ix_chat_jobs_status_created_at", "status", "created_at"),
+    )
@@ -1,6 +1,6 @@
 import uuid
 
-from sqlalchemy import Column, Text, TIMESTAMP, ForeignKey, func
+from sqlalchemy import Column, Index, Text, TIMESTAMP, ForeignKey, func
 from sqlalchemy.dialects.postgresql import UUID
 
 from db import Base
@@ -22,4 +22,13 @@ class ConditionModel(Base):
     outcome = Column(Text, nullable=True)              
     source = Column(Text, server_default="user", nullable=False) 
 
-    created_at = Column(TIMESTAMP, server_default=func.now(), nullable=False)
\ No newline at end of file
+    created_at = Column(TIMESTAMP, server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index(
+            "ix_conditions_user_id_event_date",
+            "user_id",
+            event_date.desc(),
+            id.desc(),
+        ),
+    )
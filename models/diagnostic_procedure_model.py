@@ -1,6 +1,6 @@
 import uuid
 
-from sqlalchemy import Column, Text, TIMESTAMP, ForeignKey, func
+from sqlalchemy import Column, Index, Text, TIMESTAMP, ForeignKey, func
 from sqlalchemy.dialects.postgresql import UUID
 from db import Base
 
@@ -22,4 +22,12 @@ class DiagnosticProcedureModel(Base):
     notes = Column(Text, nullable=True)                 # Additional notes or observations
 
     created_at = Column(TIMESTAMP, server_default=func.now(), nullable=False)
-    
\ No newline at end of file
+
+    __table_args__ = (
+        Index(
+            "ix_diagnostic_procedures_user_id_procedure_datetime",
+            "user_id",
+            procedure_datetime.desc(),
+            id.desc(),
+        ),
+    )
@@ -1,6 +1,6 @@
 import uuid
 
-from sqlalchemy import Column, Text, TIMESTAMP, ForeignKey, func
+from sqlalchemy import Column, Index, Text, TIMESTAMP, ForeignKey, func
 from sqlalchemy.dialects.postgresql import UUID
 from db import Base
 
@@ -20,4 +20,13 @@ class HealthMeasurementModel(Base):
     notes = Column(Text, nullable=True)                 # Additional observations or comments
     source = Column(Text, server_default="user", nullable=False)  # e.g. "user", "device", "doctor"
 
-    created_at = Column(TIMESTAMP, server_default=func.now(), nullable=False)
\ No newline at end of file
+    created_at = Column(TIMESTAMP, server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index(
+            "ix_health_measurements_user_id_recorded_at",
+            "user_id",
+            recorded_at.desc(),
+            id.desc(),
+        ),
+    )
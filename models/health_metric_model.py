@@ -0,0 +1,52 @@
+import uuid
+
+from sqlalchemy import (
+    Column,
+    Float,
+    Index,
+    Text,
+    TIMESTAMP,
+    ForeignKey,
+    UniqueConstraint,
+    func,
+)
+from sqlalchemy.dialects.postgresql import UUID
+from db import Base
+
+
+class HealthMetricModel(Base):
+    """One typed value parsed out of a free-text health measurement."""
+
+    __tablename__ = "health_metrics"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+
+    user_id = Column(
+        UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    measurement_id = Column(
+        UUID(as_uuid=True),
+        ForeignKey("health_measurements.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+
+    metric = Column(Text, nullable=False)               # e.g. "bp_systolic", "heart_rate", "weight"
+    value = Column(Float, nullable=False)               # Value in the canonical unit
+    unit = Column(Text, nullable=False)                 # e.g. "mmHg", "bpm", "kg"
+    recorded_at = Column(TIMESTAMP, server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("measurement_id", "metric"),
+        Index(
+            "ix_health_metrics_user_metric_recorded_at",
+            "user_id",
+            "metric",
+            "recorded_at",
+        ),
+        Index(
+            "ix_health_metrics_user_id_recorded_at",
+            "user_id",
+            recorded_at.desc(),
+            id.desc(),
+        ),
+    )
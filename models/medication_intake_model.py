@@ -1,6 +1,6 @@
 import uuid
 
-from sqlalchemy import Column, Text, TIMESTAMP, ForeignKey, func
+from sqlalchemy import Column, Index, Text, TIMESTAMP, ForeignKey, func
 from sqlalchemy.dialects.postgresql import UUID
 from db import Base
 
@@ -24,4 +24,20 @@ class MedicationIntakeModel(Base):
     notes = Column(Text, nullable=True)                 # Additional notes or side effects
     source = Column(Text, server_default="user", nullable=False)  # e.g. "user", "prescription", "doctor"
 
-    created_at = Column(TIMESTAMP, server_default=func.now(), nullable=False)
\ No newline at end of file
+    created_at = Column(TIMESTAMP, server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index(
+            "ix_medication_intakes_user_id_intake_datetime",
+            "user_id",
+            intake_datetime.desc(),
+            id.desc(),
+        ),
+        Index(
+            "ix_medication_intakes_user_id_condition_id",
+            "user_id",
+            "condition_id",
+            intake_datetime.desc(),
+            id.desc(),
+        ),
+    )
@@ -1,6 +1,6 @@
 import uuid
 
-from sqlalchemy import Column, Text, TIMESTAMP, ForeignKey, func
+from sqlalchemy import Column, Index, Text, TIMESTAMP, ForeignKey, func
 from sqlalchemy.dialects.postgresql import UUID
 
 from db import Base
@@ -29,3 +29,12 @@ class DoctorVisitModel(Base):
 
     created_at = Column(TIMESTAMP, server_default=func.now(), nullable=False)
     updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index(
+            "ix_doctor_visits_user_id_visit_datetime",
+            "user_id",
+            visit_datetime.desc(),
+            id.desc(),
+        ),
+    )
@@ -2,16 +2,41 @@ from __future__ import annotations
 from agents.memory.session import Session
 from agents.items import TResponseInputItem
 from pymongo.asynchronous.database import AsyncDatabase
-from pymongo import DESCENDING, AsyncMongoClient
+from pymongo import ASCENDING, DESCENDING, AsyncMongoClient
+from pymongo.errors import DuplicateKeyError
+import asyncio
 import json
-from datetime import datetime, UTC
+from datetime import datetime, timedelta, UTC
 from typing import Any
 
+from session_history import assemble_history, estimate_tokens
+
+
+# Messages folded into the session's summary keep archived: True and are no
+# longer replayed to the model.
+ACTIVE_MESSAGES = {"archived": {"$ne": True}}
+
+# Version 2 stores message_data as a BSON subdocument. Legacy rows have no
+# schema_version and hold the item as a JSON string.
+MESSAGE_SCHEMA_VERSION = 2
+
+
+def decode_message(doc: dict[str, Any]) -> TResponseInputItem | None:
+    """Return the item stored in a message document, or None if it is unreadable."""
+    message_data = doc["message_data"]
+    if not isinstance(message_data, str):
+        return message_data
+    try:
+        return json.loads(message_data)
+    except json.JSONDecodeError:
+        return None
+
 
 class MongoDBSession(Session):
     """MongoDB-based implementation of session storage."""
 
-    _initialized = False
+    # (database, sessions, messages and inbox collections) already set up in this process
+    _initialized: set[tuple[str, str, str, str]] = set()
 
     def __init__(
         self,
@@ -19,13 +44,28 @@ class MongoDBSession(Session):
         db: AsyncDatabase,
         sessions_table: str = "agent_sessions",
         messages_table: str = "agent_messages",
+        inbox_table: str = "agent_inbox",
+        history_limit: int | None = None,
+        token_budget: int | None = None,
+        write_behind: bool = False,
     ):
         self.session_id = session_id
         self.db = db
         self.sessions_table = sessions_table
         self.messages_table = messages_table
+        self.inbox_table = inbox_table
+        self.history_limit = history_limit
+        self.token_budget = token_budget
+        # When set, add_items buffers messages until flush() instead of writing them
+        self.write_behind = write_behind
+        self._pending: list[dict[str, Any]] = []
+        # Estimated tokens of the history the last get_items returned, and of
+        # the items added since
+        self.history_tokens: int | None = None
+        self.added_tokens = 0
         self.sessions_collection = db[sessions_table]
         self.messages_collection = db[messages_table]
+        self.inbox_collection = db[inbox_table]
 
     @classmethod
     def from_connection_string(
@@ -41,116 +81,356 @@ class MongoDBSession(Session):
         db = client[db_name]
         return cls(session_id, db, sessions_table, messages_table)
 
-    async def _init_db(self) -> None:
-        """Initialize the database collections."""
-        collection_names = await self.db.list_collection_names()
+    @classmethod
+    async def init_collections(
+        cls,
+        db: AsyncDatabase,
+        sessions_table: str = "agent_sessions",
+        messages_table: str = "agent_messages",
+        inbox_table: str = "agent_inbox",
+    ) -> None:
+        """Create the collections and indexes, once per process and database.
 
-        if self.sessions_table not in collection_names:
-            await self.db.create_collection(self.sessions_table)
-            await self.sessions_collection.create_index("session_id", unique=True)
+        Called from the app lifespan so chat requests never pay for it.
+        """
+        collection_names = await db.list_collection_names()
 
-        if self.messages_table not in collection_names:
-            await self.db.create_collection(self.messages_table)
-            await self.messages_collection.create_index(["session_id", "created_at"])
+        if sessions_table not in collection_names:
+            await db.create_collection(sessions_table)
+        if messages_table not in collection_names:
+            await db.create_collection(messages_table)
+        if inbox_table not in collection_names:
+            await db.create_collection(inbox_table)
+
+        # create_index is a no-op for indexes that already exist
+        await db[sessions_table].create_index("session_id", unique=True)
+        # _id breaks ties between messages written in the same millisecond
+        await db[messages_table].create_index(
+            [("session_id", ASCENDING), ("created_at", ASCENDING), ("_id", ASCENDING)]
+        )
+        await db[inbox_table].create_index(
+            [("session_id", ASCENDING), ("taken", ASCENDING), ("created_at", ASCENDING)]
+        )
+
+        cls._initialized.add((db.name, sessions_table, messages_table, inbox_table))
 
     async def _ensure_initialized(self) -> None:
         """Ensure the database schema is initialized."""
-        if not self._initialized:
-            await self._init_db()
+        tables = (self.sessions_table, self.messages_table, self.inbox_table)
+        if (self.db.name, *tables) not in self._initialized:
+            await self.init_collections(self.db, *tables)
 
     async def get_items(self, limit: int | None = None) -> list[TResponseInputItem]:
         """Retrieve the conversation history for this session.
 
+        Archived messages are left out, and the summary that replaced them
+        comes first.
+
         Args:
-            limit: Maximum number of items to retrieve. If None, retrieves all items.
-                   When specified, returns the latest N items in chronological order.
+            limit: Maximum number of items to retrieve. If None, falls back to the
+                   session's history_limit, and retrieves all items if that is unset.
+                   Returns the latest N items in chronological order.
 
         Returns:
-            List of input items representing the conversation history
+            List of input items representing the conversation history, trimmed to
+            the session's token budget
         """
         await self._ensure_initialized()
 
-        documents = (
-            self.messages_collection.find(
-                {}, {"_id": False, "message_data": True}
-            ).sort("created_at", DESCENDING)
-            if limit is None
-            else self.messages_collection.find({}, {"_id": False, "message_data": True})
-            .sort("created_at", DESCENDING)
-            .limit(limit)
-        )
+        limit = limit if limit is not None else self.history_limit
+        documents = self.messages_collection.find(
+            {"session_id": self.session_id, **ACTIVE_MESSAGES},
+            {"_id": False, "message_data": True},
+        ).sort([("created_at", DESCENDING), ("_id", DESCENDING)])
+        if limit is not None:
+            documents = documents.limit(limit)
+
+        summary, documents = await asyncio.gather(self.get_summary(), documents.to_list())
 
         items = []
-        async for doc in documents:
-            try:
-                item = json.loads(doc["message_data"])
+        for doc in documents:
+            item = decode_message(doc)
+            # Skip legacy rows with invalid JSON
+            if item is not None:
                 items.append(item)
-            except json.JSONDecodeError:
-                # Skip invalid JSON entries
-                continue
 
+        # Documents are read newest first so the limit keeps the latest items
+        items.reverse()
+
+        # Buffered messages are newer than anything stored
+        if self._pending:
+            items.extend(doc["message_data"] for doc in self._pending)
+            if limit is not None:
+                items = items[-limit:]
+
+        items = assemble_history(
+            items, summary[0] if summary else None, self.token_budget
+        )
+        self.history_tokens = sum(estimate_tokens(item) for item in items)
+        self.added_tokens = 0
         return items
 
     async def add_items(self, items: list[TResponseInputItem]) -> None:
         """Add new items to the conversation history.
 
+        With write_behind set, the items are buffered until flush().
+
         Args:
             items: List of input items to add to the history
         """
         if not items:
             return
 
+        self.added_tokens += sum(estimate_tokens(item) for item in items)
+        created_at = datetime.now(UTC)
+        self._pending.extend(
+            {
+                "session_id": self.session_id,
+                "message_data": item,
+                "schema_version": MESSAGE_SCHEMA_VERSION,
+                "created_at": created_at,
+            }
+            for item in items
+        )
+
+        if not self.write_behind:
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Write buffered messages and upsert the session document.
+
+        The two writes go to different collections, so they are sent
+        concurrently and the append costs a single round trip of latency.
+        """
+        if not self._pending:
+            return
+
         await self._ensure_initialized()
 
-        existing_session_entity = await self.sessions_collection.find_one(
-            {"session_id": self.session_id}
+        pending, self._pending = self._pending, []
+        now = datetime.now(UTC)
+        await asyncio.gather(
+            self.messages_collection.insert_many(pending),
+            self.sessions_collection.update_one(
+                {"session_id": self.session_id},
+                {"$set": {"updated_at": now}, "$setOnInsert": {"created_at": now}},
+                upsert=True,
+            ),
+        )
+
+    async def get_summary(self) -> tuple[str, int] | None:
+        """Return the conversation summary and its version, or None if there is none."""
+        session = await self.sessions_collection.find_one(
+            {"session_id": self.session_id}, {"summary": True, "summary_version": True}
         )
-        if not existing_session_entity:
-            await self.sessions_collection.insert_one(
+        if not session or session.get("summary") is None:
+            return None
+        return session["summary"], session["summary_version"]
+
+    async def get_active_items(self) -> list[tuple[Any, TResponseInputItem]]:
+        """Return the stored messages that are not archived, for compaction.
+
+        Returns:
+            (position, item) pairs in chronological order, limited to the latest
+            history_limit messages. A position can be passed to archive_through.
+        """
+        await self._ensure_initialized()
+
+        documents = self.messages_collection.find(
+            {"session_id": self.session_id, **ACTIVE_MESSAGES},
+            {"message_data": True, "created_at": True},
+        ).sort([("created_at", DESCENDING), ("_id", DESCENDING)])
+        if self.history_limit is not None:
+            documents = documents.limit(self.history_limit)
+
+        items = []
+        async for doc in documents:
+            item = decode_message(doc)
+            if item is not None:
+                items.append(((doc["created_at"], doc["_id"]), item))
+        items.reverse()
+        return items
+
+    async def archive_through(self, summary: str, position: Any, summary_version: int) -> bool:
+        """Store a new summary and archive the messages up to position, inclusive.
+
+        Args:
+            summary: Summary of the archived messages and of the previous summary
+            position: Position of the newest message the summary covers
+            summary_version: Version of the summary the new one was built from,
+                             0 if the session had none
+
+        Returns:
+            False if the summary changed in the meantime, in which case nothing
+            is written
+        """
+        await self._ensure_initialized()
+
+        # Matching on the version keeps two compactions of the session from
+        # overwriting each other. Sessions never compacted have no summary_version.
+        updated = await self.sessions_collection.update_one(
+            {"session_id": self.session_id, "summary_version": summary_version or None},
+            {"$set": {"summary": summary, "summary_version": summary_version + 1}},
+        )
+        if not updated.modified_count:
+            return False
+
+        # Written after the summary, so a failure here replays a few messages
+        # the summary already covers rather than losing them
+        created_at, _id = position
+        await self.messages_collection.update_many(
+            {
+                "session_id": self.session_id,
+                **ACTIVE_MESSAGES,
+                "$or": [
+                    {"created_at": {"$lt": created_at}},
+                    {"created_at": created_at, "_id": {"$lte": _id}},
+                ],
+            },
+            {"$set": {"archived": True}},
+        )
+        return True
+
+    async def acquire_lease(self, owner: str, ttl: float) -> bool:
+        """Take or extend the lease on the conversation that serializes its turns.
+
+        Args:
+            owner: Token identifying the holder
+            ttl: Seconds until the lease expires unless it is extended
+
+        Returns:
+            True if owner holds the lease now, False if someone else does
+        """
+        await self._ensure_initialized()
+
+        now = datetime.now(UTC)
+        try:
+            await self.sessions_collection.update_one(
                 {
                     "session_id": self.session_id,
-                    "created_at": datetime.now(UTC),
-                    "updated_at": datetime.now(UTC),
-                }
+                    "$or": [
+                        {"lease_expires_at": {"$not": {"$gt": now}}},
+                        {"lease_owner": owner},
+                    ],
+                },
+                {
+                    "$set": {"lease_owner": owner, "lease_expires_at": now + timedelta(seconds=ttl)},
+                    "$setOnInsert": {"created_at": now, "updated_at": now},
+                },
+                upsert=True,
             )
+        except DuplicateKeyError:
+            # The session exists and the filter did not match it: the lease is held
+            return False
+        return True
+
+    async def release_lease(self, owner: str) -> None:
+        """Give up the lease, if owner still holds it."""
+        await self._ensure_initialized()
+
+        await self.sessions_collection.update_one(
+            {"session_id": self.session_id, "lease_owner": owner},
+            {"$unset": {"lease_owner": "", "lease_expires_at": ""}},
+        )
 
-        message_data = [
+    async def enqueue_message(self, entry_id: str, message: str) -> None:
+        """Queue a user message for the next turn of the conversation."""
+        await self._ensure_initialized()
+
+        await self.inbox_collection.insert_one(
             {
+                "_id": entry_id,
                 "session_id": self.session_id,
-                "message_data": json.dumps(item),
+                "message": message,
+                "taken": False,
                 "created_at": datetime.now(UTC),
             }
-            for item in items
-        ]
+        )
 
-        await self.messages_collection.insert_many(message_data)
+    async def take_queued_messages(self) -> list[tuple[str, str]]:
+        """Mark the queued messages as taken by the lease holder and return them.
 
-        await self.sessions_collection.update_one(
-            {"session_id": self.session_id}, {"$set": {"updated_at": datetime.now(UTC)}}
+        Returns:
+            (entry id, message) pairs, oldest first
+        """
+        await self._ensure_initialized()
+
+        entries = await self.inbox_collection.find(
+            {"session_id": self.session_id, "taken": False}, {"message": True}
+        ).sort([("created_at", ASCENDING), ("_id", ASCENDING)]).to_list()
+        if entries:
+            await self.inbox_collection.update_many(
+                {"_id": {"$in": [entry["_id"] for entry in entries]}}, {"$set": {"taken": True}}
+            )
+        return [(entry["_id"], entry["message"]) for entry in entries]
+
+    async def withdraw_message(self, entry_id: str) -> bool:
+        """Remove a queued message that no turn has taken yet.
+
+        Returns:
+            False if a turn already took the message
+        """
+        await self._ensure_initialized()
+
+        result = await self.inbox_collection.delete_one({"_id": entry_id, "taken": False})
+        return result.deleted_count == 1
+
+    async def requeue_messages(self, entry_ids: list[str]) -> None:
+        """Put taken messages back in the queue, e.g. after their turn failed."""
+        if not entry_ids:
+            return
+        await self._ensure_initialized()
+
+        await self.inbox_collection.update_many(
+            {"_id": {"$in": entry_ids}}, {"$set": {"taken": False}}
         )
 
+    async def delete_message(self, entry_id: str) -> None:
+        """Remove a message from the inbox once its request has its reply."""
+        await self._ensure_initialized()
+
+        await self.inbox_collection.delete_one({"_id": entry_id})
+
+    async def store_reply(self, entry_ids: list[str], reply: dict[str, Any]) -> None:
+        """Store the reply of the turn that took the given messages."""
+        await self._ensure_initialized()
+
+        await self.inbox_collection.update_many(
+            {"_id": {"$in": entry_ids}}, {"$set": {"reply": reply}}
+        )
+
+    async def take_reply(self, entry_id: str) -> dict[str, Any] | None:
+        """Return and remove the reply to a queued message, or None if there is none yet."""
+        await self._ensure_initialized()
+
+        entry = await self.inbox_collection.find_one_and_delete(
+            {"_id": entry_id, "reply": {"$exists": True}}, projection={"reply": True}
+        )
+        return entry["reply"] if entry else None
+
     async def pop_item(self) -> TResponseInputItem | None:
+        if self._pending:
+            return self._pending.pop()["message_data"]
+
         await self._ensure_initialized()
 
         last_message = await self.messages_collection.find_one(
-            {"session_id": self.session_id}, sort=[("created_at", DESCENDING)]
+            {"session_id": self.session_id, **ACTIVE_MESSAGES},
+            sort=[("created_at", DESCENDING), ("_id", DESCENDING)],
         )
 
         if last_message:
-            await self.messages_collection.delete_one({"_id": last_message[""]})
-            message_data = last_message["message_data"]
-            try:
-                item = json.loads(message_data)
-                return item
-            except json.JSONDecodeError:
-                return None
+            await self.messages_collection.delete_one({"_id": last_message["_id"]})
+            return decode_message(last_message)
 
         return None
 
     async def clear_session(self) -> None:
+        self._pending = []
         await self._ensure_initialized()
 
         await self.messages_collection.delete_many({"session_id": self.session_id})
+        await self.inbox_collection.delete_many({"session_id": self.session_id})
         await self.sessions_collection.delete_one({"session_id": self.session_id})
 
     async def close(self) -> None:
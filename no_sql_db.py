@@ -1,8 +1,18 @@
+from fastapi import Request
 from pymongo import AsyncMongoClient
+from pymongo.asynchronous.database import AsyncDatabase
 
-from config import MONGO_APP, MONGO_DB, MONGO_PASS, MONGO_URI, MONGO_USER
+from config import MONGO_APP, MONGO_PASS, MONGO_URI, MONGO_USER
 
 uri = f"mongodb+srv://{MONGO_USER}:{MONGO_PASS}@{MONGO_URI}/?retryWrites=true&w=majority&appName={MONGO_APP}"
-# Create a new client and connect to the server
-client = AsyncMongoClient(uri, tls=True, tlsAllowInvalidCertificates=True)
-db = client[MONGO_DB]
+
+
+def create_mongo_client(**kwargs) -> AsyncMongoClient:
+    # The client connects lazily, on its first operation
+    return AsyncMongoClient(uri, tls=True, tlsAllowInvalidCertificates=True, **kwargs)
+
+
+def get_nosql_db(request: Request) -> AsyncDatabase | None:
+    # The client is created once per worker in the app lifespan, and only
+    # when chat history is stored in Mongo
+    return request.app.state.nosql_db
@@ -1,16 +1,163 @@
-from fastapi import APIRouter, status, Depends
-from sqlalchemy.ext.asyncio import AsyncSession
+import json
+import logging
+import math
+import time
+from typing import AsyncIterator
+from uuid import UUID, uuid4
 
-from db import get_db
+from agents import RunConfig
+from fastapi import APIRouter, HTTPException, Query, status, Depends
+from fastapi.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+from pymongo.asynchronous.database import AsyncDatabase
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from config import CHAT_JOB_MAX_WAIT_SECONDS
+from db import get_db, get_sessionmaker
+from no_sql_db import get_nosql_db
 from auth.token import get_current_user_id
-from schemas.chat_schemas import ChatRequest, ChatResponse
-from ai.ai_agents import process_text_message
+from schemas.chat_schemas import ChatJob, ChatRequest, ChatResponse
+from managers.chat_job_manager import FINISHED_STATUSES, ChatJobManager
+from ai.admission import Admission, AdmissionRejected, chat_admission
+from ai.ai_agents import process_text_message, stream_text_message
+from ai.conversation_lease import ConversationBusy
+from ai.chat_jobs import chat_job_pool
 
 
 router = APIRouter(prefix="/chat", tags=["Chat"])
 
+logger = logging.getLogger(__name__)
+
+
+def format_sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def admission_rejected(e: AdmissionRejected) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail=e.reason,
+        headers={"Retry-After": str(e.retry_after)},
+    )
+
+
+async def admit_chat_run(user_id: str) -> Admission:
+    """Wait for a chat slot, or answer 429 with Retry-After when saturated."""
+    try:
+        return await chat_admission.acquire(user_id)
+    except AdmissionRejected as e:
+        raise admission_rejected(e)
+
+
+async def stream_sse_events(
+    chat_req: ChatRequest,
+    sessionmaker: async_sessionmaker[AsyncSession],
+    nosql_db: AsyncDatabase | None,
+    user_id: str,
+    run_config: RunConfig | None = None,
+) -> AsyncIterator[str]:
+    """The body of /chat/stream: the run's events as SSE, failures as an "error" event."""
+    # Sessions are opened inside the stream, since get_db's cleanup runs
+    # before the response body is sent
+    try:
+        async for event, data in stream_text_message(
+            chat_req, sessionmaker, nosql_db, user_id, run_config
+        ):
+            yield format_sse(event, data)
+    except ConversationBusy as e:
+        yield format_sse("error", {"detail": str(e), "retry_after": e.retry_after})
+    except Exception:
+        # The 200 status is already sent, so report the failure in the stream
+        logger.exception("Streamed chat run failed")
+        yield format_sse("error", {"detail": "The assistant failed to respond"})
+
+
+class AdmittedStreamingResponse(StreamingResponse):
+    """Releases the chat slot once the stream is over, however it ends.
+
+    The body generator cannot do it, since it never runs if the client
+    disconnects before the first chunk.
+    """
+
+    def __init__(self, content, admission: Admission, **kwargs):
+        super().__init__(content, **kwargs)
+        self.admission = admission
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.admission.release()
+
 
 @router.post("/text", response_model=ChatResponse, status_code=status.HTTP_201_CREATED)
-async def post_text_message(chat_req: ChatRequest, db: AsyncSession = Depends(get_db), user_id: str = Depends(get_current_user_id)):
-    resp = await process_text_message(chat_req, db, user_id)
+async def post_text_message(chat_req: ChatRequest, sessionmaker: async_sessionmaker[AsyncSession] = Depends(get_sessionmaker), nosql_db: AsyncDatabase | None = Depends(get_nosql_db), user_id: str = Depends(get_current_user_id)):
+    # The slot is taken once the conversation's lease is held, by the request
+    # that runs the turn
+    try:
+        resp = await process_text_message(
+            chat_req, sessionmaker, nosql_db, user_id, chat_admission
+        )
+    except AdmissionRejected as e:
+        raise admission_rejected(e)
+    except ConversationBusy as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)},
+        )
     return resp
+
+
+@router.post("/stream")
+async def post_stream_message(chat_req: ChatRequest, sessionmaker: async_sessionmaker[AsyncSession] = Depends(get_sessionmaker), nosql_db: AsyncDatabase | None = Depends(get_nosql_db), user_id: str = Depends(get_current_user_id)):
+    # Admitted before the response starts, so saturation is still a real 429
+    admission = await admit_chat_run(user_id)
+
+    return AdmittedStreamingResponse(
+        stream_sse_events(chat_req, sessionmaker, nosql_db, user_id),
+        admission,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/jobs", response_model=ChatJob, status_code=status.HTTP_202_ACCEPTED)
+async def post_chat_job(chat_req: ChatRequest, db: AsyncSession = Depends(get_db), user_id: str = Depends(get_current_user_id)):
+    if chat_job_pool.is_full:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many chat jobs are waiting",
+            headers={"Retry-After": str(math.ceil(chat_job_pool.run_timeout / 4))},
+        )
+
+    # Chosen now so the client knows the conversation before the reply exists
+    conversation_id = chat_req.conversation_id or str(uuid4())
+    job = await ChatJobManager.insert_chat_job(chat_req, conversation_id, user_id, db)
+    chat_job_pool.submit(str(job.id))
+    return job
+
+
+@router.get("/jobs/{job_id}", response_model=ChatJob)
+async def get_chat_job(
+    job_id: UUID,
+    wait: float = Query(0, ge=0, le=CHAT_JOB_MAX_WAIT_SECONDS),
+    sessionmaker: async_sessionmaker[AsyncSession] = Depends(get_sessionmaker),
+    user_id: str = Depends(get_current_user_id),
+):
+    """Return the job, waiting up to `wait` seconds for it to finish (long poll)."""
+    deadline = time.monotonic() + wait
+    while True:
+        # A session per read, so a long poll does not hold a pooled connection
+        async with sessionmaker() as db:
+            job = await ChatJobManager.select_user_chat_job(
+                str(job_id), user_id, db, chat_job_pool.stale_after
+            )
+        if job is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Chat job not found")
+
+        remaining = deadline - time.monotonic()
+        if job.status in FINISHED_STATUSES or remaining <= 0:
+            return job
+        await chat_job_pool.wait(str(job_id), min(remaining, 1.0))
+
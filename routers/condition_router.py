@@ -0,0 +1,34 @@
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from schemas.condition_schemas import Condition
+from schemas.pagination_schemas import Page
+from managers.condition_manager import ConditionManager
+from managers.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, InvalidCursorError
+from auth.token import get_current_user_id
+from db import get_db
+
+
+condition_router = APIRouter(prefix="/conditions")
+
+
+@condition_router.get("/user-conditions", response_model=Page[Condition])
+async def get_user_conditions(
+    start: datetime | None = None,
+    end: datetime | None = None,
+    source: str | None = None,
+    cursor: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+):
+    try:
+        conditions = await ConditionManager.select_user_conditions_by_user_id(
+            user_id, db, start=start, end=end, source=source, cursor=cursor, limit=limit
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return conditions
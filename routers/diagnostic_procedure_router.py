@@ -0,0 +1,37 @@
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from schemas.diagnostic_procedure_schemas import DiagnosticProcedure
+from schemas.pagination_schemas import Page
+from managers.diagnostic_procedure_manager import DiagnosticProcedureManager
+from managers.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, InvalidCursorError
+from auth.token import get_current_user_id
+from db import get_db
+
+
+diagnostic_procedure_router = APIRouter(prefix="/procedures")
+
+
+@diagnostic_procedure_router.get(
+    "/user-procedures", response_model=Page[DiagnosticProcedure]
+)
+async def get_user_diagnostic_procedures(
+    start: datetime | None = None,
+    end: datetime | None = None,
+    cursor: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+):
+    try:
+        procedures = (
+            await DiagnosticProcedureManager.select_user_diagnostic_procedures_by_user_id(
+                user_id, db, start=start, end=end, cursor=cursor, limit=limit
+            )
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return procedures
@@ -0,0 +1,205 @@
+import json
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from schemas.health_measurement_schemas import (
+    BulkMeasurementItemStatus,
+    BulkMeasurementResponse,
+    HealthMeasurement,
+    HealthMeasurementCreate,
+)
+from schemas.health_metric_schemas import MetricTrend, TrendBucket
+from schemas.pagination_schemas import Page
+from managers.health_measurement_manager import HealthMeasurementManager
+from managers.health_metric_manager import HealthMetricManager
+from managers.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, InvalidCursorError
+from auth.token import get_current_user_id
+from db import get_db
+
+
+health_measurement_router = APIRouter(prefix="/measurements")
+
+MAX_BULK_MEASUREMENTS = 5000
+# About 1 KiB per reading, so an oversized upload is refused before it is parsed
+MAX_BULK_BODY_BYTES = MAX_BULK_MEASUREMENTS * 1024
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/ndjson")
+
+# The body is read from the request to stream NDJSON, so its schema is declared here
+BULK_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "description": (
+            "Readings as a JSON array, or as NDJSON with one reading object per line. "
+            f"At most {MAX_BULK_MEASUREMENTS} readings."
+        ),
+        "content": {
+            "application/json": {
+                "schema": {
+                    "type": "array",
+                    "items": HealthMeasurementCreate.model_json_schema(),
+                    "maxItems": MAX_BULK_MEASUREMENTS,
+                }
+            },
+            **{
+                content_type: {
+                    "schema": {"type": "string"},
+                    "example": (
+                        '{"measurements": "BP: 120/80", "recorded_at": "2026-10-01T08:00:00Z"}\n'
+                        '{"measurements": "HR: 72 bpm", "recorded_at": "2026-10-01T08:05:00Z"}\n'
+                    ),
+                }
+                for content_type in NDJSON_CONTENT_TYPES
+            },
+        },
+    }
+}
+
+
+def upload_too_large(detail: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=detail)
+
+
+async def read_bulk_body(request: Request) -> bytes:
+    """Read the upload, refusing it as soon as it is known to exceed MAX_BULK_BODY_BYTES."""
+    too_large = upload_too_large(f"Uploads are limited to {MAX_BULK_BODY_BYTES} bytes")
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > MAX_BULK_BODY_BYTES:
+        raise too_large
+
+    # Chunked uploads have no Content-Length, so the limit is also applied while reading
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > MAX_BULK_BODY_BYTES:
+            raise too_large
+    return bytes(body)
+
+
+def parse_bulk_body(body: bytes, content_type: str) -> list:
+    """Split a JSON array or NDJSON body into readings; unreadable NDJSON lines become errors."""
+    too_many = upload_too_large(f"At most {MAX_BULK_MEASUREMENTS} readings per upload")
+    if content_type in NDJSON_CONTENT_TYPES:
+        lines = [line for line in body.splitlines() if line.strip()]
+        # Counted before any line is decoded
+        if len(lines) > MAX_BULK_MEASUREMENTS:
+            raise too_many
+        payloads = []
+        for line in lines:
+            try:
+                payloads.append(json.loads(line))
+            except json.JSONDecodeError as e:
+                payloads.append(e)
+        return payloads
+
+    try:
+        payloads = json.loads(body)
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid JSON body")
+    if not isinstance(payloads, list):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Expected a JSON array of readings"
+        )
+    if len(payloads) > MAX_BULK_MEASUREMENTS:
+        raise too_many
+    return payloads
+
+
+@health_measurement_router.post(
+    "/bulk",
+    response_model=BulkMeasurementResponse,
+    status_code=status.HTTP_201_CREATED,
+    openapi_extra=BULK_REQUEST_BODY,
+)
+async def post_bulk_measurements(
+    request: Request,
+    user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+):
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    payloads = parse_bulk_body(await read_bulk_body(request), content_type)
+
+    items: list[BulkMeasurementItemStatus] = []
+    valid: list[tuple[int, HealthMeasurementCreate]] = []
+    for index, payload in enumerate(payloads):
+        if isinstance(payload, json.JSONDecodeError):
+            items.append(
+                BulkMeasurementItemStatus(
+                    index=index, status="invalid", errors=[f"Invalid JSON: {payload.msg}"]
+                )
+            )
+            continue
+        try:
+            valid.append((index, HealthMeasurementCreate.model_validate(payload)))
+        except ValidationError as e:
+            items.append(
+                BulkMeasurementItemStatus(
+                    index=index,
+                    status="invalid",
+                    errors=[
+                        f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+                        for error in e.errors()
+                    ],
+                )
+            )
+
+    ids = await HealthMeasurementManager.insert_health_measurements_bulk(
+        [measurement for _, measurement in valid], user_id, db
+    )
+    items.extend(
+        BulkMeasurementItemStatus(index=index, status="created", id=measurement_id)
+        for (index, _), measurement_id in zip(valid, ids)
+    )
+    items.sort(key=lambda item: item.index)
+
+    return BulkMeasurementResponse(
+        created=len(ids), invalid=len(payloads) - len(ids), items=items
+    )
+
+
+@health_measurement_router.get(
+    "/user-measurements", response_model=Page[HealthMeasurement]
+)
+async def get_user_health_measurements(
+    start: datetime | None = None,
+    end: datetime | None = None,
+    source: str | None = None,
+    cursor: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+):
+    try:
+        measurements = (
+            await HealthMeasurementManager.select_user_health_measurements_by_user_id(
+                user_id,
+                db,
+                start=start,
+                end=end,
+                source=source,
+                cursor=cursor,
+                limit=limit,
+            )
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return measurements
+
+
+@health_measurement_router.get("/trends", response_model=list[MetricTrend])
+async def get_user_measurement_trends(
+    metric: list[str] | None = Query(None),
+    start: datetime | None = None,
+    end: datetime | None = None,
+    bucket: TrendBucket = "day",
+    window: int = Query(7, ge=1, le=365),
+    user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+):
+    trends = await HealthMetricManager.select_user_metric_trends(
+        user_id, db, metrics=metric, start=start, end=end, bucket=bucket, window=window
+    )
+    return trends
@@ -4,6 +4,11 @@ from routers import (
     google_auth_router,
     user_router,
     visit_router,
+    condition_router,
+    health_measurement_router,
+    diagnostic_procedure_router,
+    medication_intake_router,
+    timeline_router,
     profile_router,
     chat_router,
 )
@@ -13,5 +18,10 @@ main_router = APIRouter()
 main_router.include_router(google_auth_router.google_auth_router)
 main_router.include_router(user_router.user_router)
 main_router.include_router(visit_router.visit_router)
+main_router.include_router(condition_router.condition_router)
+main_router.include_router(health_measurement_router.health_measurement_router)
+main_router.include_router(diagnostic_procedure_router.diagnostic_procedure_router)
+main_router.include_router(medication_intake_router.medication_intake_router)
+main_router.include_router(timeline_router.timeline_router)
 main_router.include_router(profile_router.profile_router)
 main_router.include_router(chat_router.router)
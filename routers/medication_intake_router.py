@@ -0,0 +1,55 @@
+from datetime import datetime
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from schemas.medication_intake_schemas import MedicationIntake
+from schemas.pagination_schemas import Page
+from managers.medication_intake_manager import MedicationIntakeManager
+from managers.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, InvalidCursorError
+from auth.token import get_current_user_id
+from db import get_db
+
+
+medication_intake_router = APIRouter(prefix="/medication-intakes")
+
+
+@medication_intake_router.get("/user-intakes", response_model=Page[MedicationIntake])
+async def get_user_medication_intakes(
+    start: datetime | None = None,
+    end: datetime | None = None,
+    source: str | None = None,
+    cursor: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+):
+    try:
+        intakes = await MedicationIntakeManager.select_user_medication_intakes_by_user_id(
+            user_id, db, start=start, end=end, source=source, cursor=cursor, limit=limit
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return intakes
+
+
+@medication_intake_router.get(
+    "/by-condition/{condition_id}", response_model=Page[MedicationIntake]
+)
+async def get_condition_medication_intakes(
+    condition_id: UUID,
+    cursor: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+):
+    try:
+        intakes = await MedicationIntakeManager.select_medication_intakes_by_condition(
+            str(condition_id), user_id, db, cursor=cursor, limit=limit
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return intakes
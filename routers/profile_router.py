@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, status, HTTPException
+from fastapi import APIRouter, Depends, Response, status, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from managers.profile_manager import ProfileManager
@@ -10,23 +10,19 @@ from db import get_db
 profile_router = APIRouter(prefix="/profiles")
 
 
-@profile_router.put("/")
+@profile_router.put("/", response_model=Profile)
 async def put_user_profile(
     profile_data: ProfileData,
+    response: Response,
     user_id: str = Depends(get_current_user_id),
     db: AsyncSession = Depends(get_db),
 ):
-    existing_user_profile = await ProfileManager.select_user_profile(user_id, db)
-    if not existing_user_profile:
-        created_user_profile = await ProfileManager.insert_user_profile(
-            profile_data, user_id, db
-        )
-        return created_user_profile, 201
-
-    updated_user_profile = await ProfileManager.update_user_profile(
-        profile_data, str(existing_user_profile.id), db
+    user_profile, created = await ProfileManager.upsert_user_profile(
+        profile_data, user_id, db
     )
-    return updated_user_profile
+    if created:
+        response.status_code = status.HTTP_201_CREATED
+    return user_profile
 
 
 @profile_router.get("/", response_model=Profile)
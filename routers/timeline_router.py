@@ -0,0 +1,34 @@
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from schemas.timeline_schemas import TimelineEvent, TimelineEventType
+from schemas.pagination_schemas import Page
+from managers.timeline_manager import TimelineManager
+from managers.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, InvalidCursorError
+from auth.token import get_current_user_id
+from db import get_db
+
+
+timeline_router = APIRouter(prefix="/timeline")
+
+
+@timeline_router.get("/", response_model=Page[TimelineEvent])
+async def get_user_timeline(
+    type: list[TimelineEventType] | None = Query(None),
+    start: datetime | None = None,
+    end: datetime | None = None,
+    cursor: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+):
+    try:
+        timeline = await TimelineManager.select_user_timeline(
+            user_id, db, types=type, start=start, end=end, cursor=cursor, limit=limit
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return timeline
@@ -1,8 +1,12 @@
-from fastapi import APIRouter, Depends, status
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from schemas.visit_schemas import VisitCreate, Visit
+from schemas.pagination_schemas import Page
 from managers.visit_manager import VisitManager
+from managers.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, InvalidCursorError
 from auth.token import get_current_user_id
 from db import get_db
 
@@ -16,13 +20,24 @@ async def post_visit(
     user_id: str = Depends(get_current_user_id),
     db: AsyncSession = Depends(get_db),
 ):
-    visit = await VisitManager.insert_visit(visit_data, user_id, db)
+    visit = await VisitManager.insert_doctor_visit(visit_data, user_id, db)
     return visit
 
 
-@visit_router.get("/user-visits", response_model=list[Visit])
+@visit_router.get("/user-visits", response_model=Page[Visit])
 async def get_user_visits(
-    user_id: str = Depends(get_current_user_id), db: AsyncSession = Depends(get_db)
+    start: datetime | None = None,
+    end: datetime | None = None,
+    cursor: str | None = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
 ):
-    visits = await VisitManager.select_user_visits_by_user_id(user_id, db)
+    try:
+        visits = await VisitManager.select_user_doctor_visits_by_user_id(
+            user_id, db, start=start, end=end, cursor=cursor, limit=limit
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
     return visits
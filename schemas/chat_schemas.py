@@ -1,17 +1,46 @@
-from typing import Optional
+from datetime import datetime
+from typing import Literal, Optional
+from uuid import UUID
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, field_serializer
 
 
 class MessageResponse(BaseModel):
     content: str
 
 
+class TurnUsage(BaseModel):
+    """Token counts of one agent turn."""
+    history_tokens: Optional[int] = None    # Estimated tokens of the history replayed into the prompt
+    model_requests: int                     # Model calls made by the turn, each sending the prompt
+    input_tokens: int                       # Prompt tokens of those calls, as the API reported them
+    output_tokens: int
+
+
 class ChatResponse(BaseModel):
     messages: list[MessageResponse]
     conversation_id: str
+    usage: Optional[TurnUsage] = None       # None when the message skipped the agent
 
 
 class ChatRequest(BaseModel):
     conversation_id: Optional[str] = None
     message: str
+
+
+class ChatJob(BaseModel):
+    """A chat message answered in the background. Poll until status is final."""
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    conversation_id: str
+    status: Literal["queued", "running", "succeeded", "failed"]
+    response: Optional[ChatResponse] = None     # Set once succeeded
+    error: Optional[str] = None                 # Set once failed
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    @field_serializer("id")
+    def serialize_uuid(self, uuid_val: UUID, _info):
+        return str(uuid_val)
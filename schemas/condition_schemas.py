@@ -26,6 +26,23 @@ class ConditionCreate(ConditionBase):
 
 
 
+class ConditionUpdate(BaseModel):
+    """Schema for updating an existing condition record."""
+    name: str | None = None
+    severity: str | None = None
+    description: str | None = None
+    outcome: str | None = None
+    event_date: datetime | None = None
+    source: str | None = None
+
+    @field_validator("event_date", mode="after")
+    @classmethod
+    def strip_timezone(cls, v: datetime | None) -> datetime | None:
+        if isinstance(v, datetime) and v.tzinfo is not None:
+            return v.replace(tzinfo=None)
+        return v
+
+
 class Condition(ConditionBase):
     """Complete condition schema with all database fields."""
     model_config = ConfigDict(from_attributes=True)
@@ -39,3 +56,16 @@ class Condition(ConditionBase):
     @field_serializer("id", "user_id")
     def serialize_uuid(self, uuid_val: UUID, _info):
         return str(uuid_val)
+
+
+class ConditionSummary(BaseModel):
+    """Compact condition fields returned by the agent's search tool."""
+    id: UUID
+    event_date: datetime
+    name: str
+    severity: str | None = None
+    outcome: str | None = None
+
+    @field_serializer("id")
+    def serialize_uuid(self, uuid_val: UUID, _info):
+        return str(uuid_val)
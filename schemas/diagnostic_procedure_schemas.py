@@ -18,6 +18,16 @@ class DiagnosticProcedureCreate(DiagnosticProcedureBase):
     type: str = "lab"  # Defaults to "lab" but can be overridden
 
 
+class DiagnosticProcedureUpdate(BaseModel):
+    """Schema for updating an existing diagnostic procedure record."""
+    name: str | None = None
+    provider: str | None = None
+    results: str | None = None
+    notes: str | None = None
+    procedure_datetime: datetime | None = None
+    type: str | None = None
+
+
 class DiagnosticProcedure(DiagnosticProcedureBase):
     """Complete diagnostic procedure schema with all database fields."""
     model_config = ConfigDict(from_attributes=True)
@@ -30,4 +40,16 @@ class DiagnosticProcedure(DiagnosticProcedureBase):
 
     @field_serializer("id", "user_id")
     def serialize_uuid(self, uuid_val: UUID, _info):
-        return str(uuid_val)
\ No newline at end of file
+        return str(uuid_val)
+
+class DiagnosticProcedureSummary(BaseModel):
+    """Compact diagnostic procedure fields returned by the agent's search tool."""
+    id: UUID
+    procedure_datetime: datetime
+    name: str
+    type: str
+    results: str | None = None
+
+    @field_serializer("id")
+    def serialize_uuid(self, uuid_val: UUID, _info):
+        return str(uuid_val)
@@ -1,5 +1,6 @@
 from uuid import UUID
 from datetime import datetime
+from typing import Literal
 
 from pydantic import BaseModel, ConfigDict, field_serializer
 
@@ -17,6 +18,15 @@ class HealthMeasurementCreate(HealthMeasurementBase):
     source: str = "user"  # Defaults to "user" but can be overridden
 
 
+class HealthMeasurementUpdate(BaseModel):
+    """Schema for updating an existing health measurement record."""
+    measurements: str | None = None
+    context: str | None = None
+    notes: str | None = None
+    recorded_at: datetime | None = None
+    source: str | None = None
+
+
 class HealthMeasurement(HealthMeasurementBase):
     """Complete health measurement schema with all database fields."""
     model_config = ConfigDict(from_attributes=True)
@@ -29,4 +39,23 @@ class HealthMeasurement(HealthMeasurementBase):
 
     @field_serializer("id", "user_id")
     def serialize_uuid(self, uuid_val: UUID, _info):
-        return str(uuid_val)
\ No newline at end of file
+        return str(uuid_val)
+
+
+class BulkMeasurementItemStatus(BaseModel):
+    """Outcome of one reading in a bulk upload."""
+    index: int  # Position of the reading in the upload
+    status: Literal["created", "invalid"]
+    id: UUID | None = None
+    errors: list[str] | None = None
+
+    @field_serializer("id")
+    def serialize_uuid(self, uuid_val: UUID | None, _info):
+        return str(uuid_val) if uuid_val else None
+
+
+class BulkMeasurementResponse(BaseModel):
+    """Per-item results of a bulk measurement upload."""
+    created: int
+    invalid: int
+    items: list[BulkMeasurementItemStatus]
@@ -0,0 +1,47 @@
+from datetime import datetime
+from typing import Literal
+from uuid import UUID
+
+from pydantic import BaseModel, field_serializer
+
+
+TrendBucket = Literal["hour", "day", "week"]
+
+
+class MetricBucket(BaseModel):
+    """Aggregated values of one metric within a single time bucket."""
+    start: datetime
+    count: int
+    mean: float
+    min: float
+    max: float
+    rolling_mean: float  # Mean of the bucket means over the trailing window
+
+
+class MetricTrend(BaseModel):
+    """Summary statistics and bucketed series for one metric."""
+    metric: str
+    unit: str
+    count: int
+    first_recorded_at: datetime
+    last_recorded_at: datetime
+    latest: float
+    mean: float
+    min: float
+    max: float
+    percentiles: dict[str, float]  # e.g. {"p5": 61.0, "p50": 72.0, "p95": 88.0}
+    slope_per_day: float | None  # Least-squares trend, None with fewer than two distinct times
+    buckets: list[MetricBucket]
+
+
+class MetricReading(BaseModel):
+    """One typed reading returned by the agent's search tool."""
+    measurement_id: UUID
+    metric: str
+    value: float
+    unit: str
+    recorded_at: datetime
+
+    @field_serializer("measurement_id")
+    def serialize_uuid(self, uuid_val: UUID, _info):
+        return str(uuid_val)
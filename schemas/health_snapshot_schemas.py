@@ -0,0 +1,38 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class SnapshotCondition(BaseModel):
+    name: str
+    severity: Optional[str] = None
+    event_date: datetime
+
+
+class SnapshotMedication(BaseModel):
+    medication_name: str
+    dosage: Optional[str] = None
+    last_taken_at: datetime
+
+
+class SnapshotVital(BaseModel):
+    metric: str
+    value: float
+    unit: str
+    recorded_at: datetime
+
+
+class SnapshotVisit(BaseModel):
+    visit_datetime: datetime
+    reason: str
+    doctor_name: Optional[str] = None
+    diagnosis: Optional[str] = None
+
+
+class HealthSnapshot(BaseModel):
+    """Compact summary of a user's health records, given to the agent up front."""
+    conditions: list[SnapshotCondition]      # Conditions without a recorded outcome
+    medications: list[SnapshotMedication]    # Medications taken recently, latest intake each
+    vitals: list[SnapshotVital]              # Latest reading of each metric
+    visits: list[SnapshotVisit]              # Most recent doctor visits
@@ -19,12 +19,24 @@ class MedicationIntakeCreate(MedicationIntakeBase):
     source: str = "user"  # Defaults to "user" but can be overridden
 
 
+class MedicationIntakeUpdate(BaseModel):
+    """Schema for updating an existing medication intake record."""
+    medication_name: str | None = None
+    dosage: str | None = None
+    reason: str | None = None
+    condition_id: str | None = None
+    notes: str | None = None
+    intake_datetime: datetime | None = None
+    source: str | None = None
+
+
 class MedicationIntake(MedicationIntakeBase):
     """Complete medication intake schema with all database fields."""
     model_config = ConfigDict(from_attributes=True)
 
     id: UUID
     user_id: UUID
+    condition_id: UUID | None = None
     intake_datetime: datetime
     source: str
     created_at: datetime
@@ -32,3 +44,16 @@ class MedicationIntake(MedicationIntakeBase):
     @field_serializer("id", "user_id", "condition_id")
     def serialize_uuid(self, uuid_val: UUID | None, _info):
         return str(uuid_val) if uuid_val else None
+
+
+class MedicationIntakeSummary(BaseModel):
+    """Compact medication intake fields returned by the agent's search tool."""
+    id: UUID
+    intake_datetime: datetime
+    medication_name: str
+    dosage: str | None = None
+    reason: str | None = None
+
+    @field_serializer("id")
+    def serialize_uuid(self, uuid_val: UUID, _info):
+        return str(uuid_val)
@@ -0,0 +1,12 @@
+from typing import Generic, TypeVar
+
+from pydantic import BaseModel
+
+
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    """A single page of records, newest first."""
+    items: list[T]
+    next_cursor: str | None = None  # Opaque cursor for the next page, None on the last one
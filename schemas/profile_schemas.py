@@ -1,11 +1,12 @@
 from uuid import UUID
+from datetime import date
 
 from pydantic import BaseModel, ConfigDict, field_serializer
 
 
 class ProfileBase(BaseModel):
     sex: str
-    birth_date: str
+    birth_date: date
     blood_type: str
 
 
@@ -0,0 +1,22 @@
+from datetime import datetime
+from typing import Literal
+
+from pydantic import BaseModel
+
+from schemas.visit_schemas import Visit
+from schemas.condition_schemas import Condition
+from schemas.health_measurement_schemas import HealthMeasurement
+from schemas.diagnostic_procedure_schemas import DiagnosticProcedure
+from schemas.medication_intake_schemas import MedicationIntake
+
+
+TimelineEventType = Literal[
+    "visit", "condition", "measurement", "procedure", "medication_intake"
+]
+
+
+class TimelineEvent(BaseModel):
+    """A single health record on the user's timeline."""
+    type: TimelineEventType
+    occurred_at: datetime
+    record: Visit | Condition | HealthMeasurement | DiagnosticProcedure | MedicationIntake
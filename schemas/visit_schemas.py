@@ -50,4 +50,17 @@ class Visit(VisitBase):
 
     @field_serializer("id", "user_id")
     def serialize_uuid(self, uuid_val: UUID, _info):
-        return str(uuid_val)
\ No newline at end of file
+        return str(uuid_val)
+
+class VisitSummary(BaseModel):
+    """Compact doctor visit fields returned by the agent's search tool."""
+    id: UUID
+    visit_datetime: datetime
+    reason: str
+    doctor_name: str | None = None
+    diagnosis: str | None = None
+    treatment: str | None = None
+
+    @field_serializer("id")
+    def serialize_uuid(self, uuid_val: UUID, _info):
+        return str(uuid_val)
@@ -0,0 +1,66 @@
+import json
+
+from agents.items import TResponseInputItem
+
+
+def estimate_tokens(item: TResponseInputItem) -> int:
+    """Rough token count of an item, at about four characters per token."""
+    return len(json.dumps(item)) // 4 + 1
+
+
+def apply_token_budget(
+    items: list[TResponseInputItem], token_budget: int | None
+) -> list[TResponseInputItem]:
+    """Keep the newest items that fit in the token budget, starting on a user message.
+
+    Starting on a user message avoids handing the model a tool call output or
+    reasoning item whose originating call was cut off.
+    """
+    start = len(items)
+    if token_budget is not None:
+        used = 0
+        while start > 0:
+            used += estimate_tokens(items[start - 1])
+            if used > token_budget:
+                break
+            start -= 1
+    else:
+        start = 0
+
+    while start < len(items) and items[start].get("role") != "user":
+        start += 1
+    return items[start:]
+
+
+SUMMARY_PREFIX = "Summary of the earlier conversation:\n"
+
+
+def summary_item(summary: str) -> TResponseInputItem:
+    """The item that stands in for the archived part of a conversation."""
+    return {"role": "system", "content": SUMMARY_PREFIX + summary}
+
+
+def compaction_split(items: list[TResponseInputItem], keep_tokens: int) -> int:
+    """Index of the first item kept verbatim when the history is compacted.
+
+    The newest items that fit in keep_tokens are kept, starting on a user
+    message so a turn is never split between the summary and the history.
+    Everything before the index goes into the summary.
+    """
+    return len(items) - len(apply_token_budget(items, keep_tokens))
+
+
+def assemble_history(
+    items: list[TResponseInputItem], summary: str | None, token_budget: int | None
+) -> list[TResponseInputItem]:
+    """The history handed to the model: the summary, if any, then the newest items.
+
+    The summary counts against the token budget and is never trimmed.
+    """
+    if summary is None:
+        return apply_token_budget(items, token_budget)
+
+    summary_message = summary_item(summary)
+    if token_budget is not None:
+        token_budget -= estimate_tokens(summary_message)
+    return [summary_message, *apply_token_budget(items, token_budget)]
@@ -1,131 +1,313 @@
-from typing import TYPE_CHECKING, Protocol, runtime_checkable
-import json
-
-if TYPE_CHECKING:
-    from agents.items import TResponseInputItem
-
+from __future__ import annotations
 from agents.memory.session import Session
+from agents.items import TResponseInputItem
+from datetime import timedelta
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import delete, func, insert, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import text
+
+from models.agent_session_model import AgentInboxModel, AgentMessageModel, AgentSessionModel
+from session_history import assemble_history, estimate_tokens
 
 
 class SQLAlchemySession(Session):
-    """SQLAlchemy-based implementation of session storage."""
+    """Postgres-based implementation of session storage.
+
+    The agent_sessions and agent_messages tables come from
+    migrations/0005_agent_sessions.sql, 0007_agent_session_compaction.sql and
+    0009_agent_session_leases.sql. Items are stored as JSONB.
+    """
 
     def __init__(
         self,
         session_id: str,
         db: AsyncSession,
-        sessions_table: str = "agent_sessions",
-        messages_table: str = "agents_messages",
+        history_limit: int | None = None,
+        token_budget: int | None = None,
     ) -> None:
         self.session_id = session_id
         self.db = db
-        self.sessions_table = sessions_table
-        self.messages_table = messages_table
-
-    async def _init_db_for_connection(self, db: AsyncSession) -> None:
-        """Initialize the database schema for a specific connection."""
-        await db.execute(
-            text(
-                f"""
-            CREATE TABLE IF NOT EXISTS {self.sessions_table} (
-                session_id TEXT PRIMARY KEY,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        self.history_limit = history_limit
+        self.token_budget = token_budget
+        # Estimated tokens of the history the last get_items returned, and of
+        # the items added since
+        self.history_tokens: int | None = None
+        self.added_tokens = 0
+
+    async def get_items(self, limit: int | None = None) -> list[TResponseInputItem]:
+        """Retrieve the conversation history for this session.
+
+        Archived messages are left out, and the summary that replaced them
+        comes first.
+
+        Args:
+            limit: Maximum number of items to retrieve. If None, falls back to the
+                   session's history_limit, and retrieves all items if that is unset.
+                   Returns the latest N items in chronological order.
+
+        Returns:
+            List of input items representing the conversation history, trimmed to
+            the session's token budget
+        """
+        limit = limit if limit is not None else self.history_limit
+        stmt = (
+            select(AgentMessageModel.message_data)
+            .where(
+                AgentMessageModel.session_id == self.session_id,
+                AgentMessageModel.archived.is_(False),
             )
+            .order_by(AgentMessageModel.id.desc())
+        )
+        if limit is not None:
+            stmt = stmt.limit(limit)
+
+        summary = await self.get_summary()
+        # Rows are read newest first so the limit keeps the latest items
+        items = list((await self.db.execute(stmt)).scalars().all())
+        items.reverse()
+
+        items = assemble_history(items, summary[0] if summary else None, self.token_budget)
+        self.history_tokens = sum(estimate_tokens(item) for item in items)
+        self.added_tokens = 0
+        return items
+
+    async def add_items(self, items: list[TResponseInputItem]) -> None:
+        """Add new items to the conversation history.
+
+        Args:
+            items: List of input items to add to the history
         """
+        if not items:
+            return
+
+        self.added_tokens += sum(estimate_tokens(item) for item in items)
+        await self._upsert_session()
+        # One multi-row VALUES statement, in item order so ids follow the history
+        await self.db.execute(
+            insert(AgentMessageModel).values(
+                [{"session_id": self.session_id, "message_data": item} for item in items]
             )
         )
+        await self.db.commit()
 
-        await db.execute(
-            text(
-                f"""
-            CREATE TABLE IF NOT EXISTS {self.messages_table} (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                session_id TEXT NOT NULL,
-                message_data TEXT NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (session_id) REFERENCES {self.sessions_table} (session_id)
-                    ON DELETE CASCADE
+    async def _upsert_session(self) -> None:
+        await self.db.execute(
+            pg_insert(AgentSessionModel)
+            .values(session_id=self.session_id)
+            .on_conflict_do_update(
+                index_elements=[AgentSessionModel.session_id],
+                set_={"updated_at": func.now()},
             )
+        )
+
+    async def flush(self) -> None:
+        """Writes are not buffered, so there is nothing to flush.
+
+        Kept so callers can treat this and MongoDBSession alike.
         """
+
+    async def get_summary(self) -> tuple[str, int] | None:
+        """Return the conversation summary and its version, or None if there is none."""
+        row = (
+            await self.db.execute(
+                select(AgentSessionModel.summary, AgentSessionModel.summary_version).where(
+                    AgentSessionModel.session_id == self.session_id
+                )
             )
-        )
+        ).one_or_none()
+        if row is None or row.summary is None:
+            return None
+        return row.summary, row.summary_version
 
-        await db.execute(
-            text(
-                f"""
-            CREATE INDEX IF NOT EXISTS idx_{self.messages_table}_session_id
-            ON {self.messages_table} (session_id, created_at)
+    async def get_active_items(self) -> list[tuple[Any, TResponseInputItem]]:
+        """Return the stored messages that are not archived, for compaction.
+
+        Returns:
+            (position, item) pairs in chronological order, limited to the latest
+            history_limit messages. A position can be passed to archive_through.
         """
+        stmt = (
+            select(AgentMessageModel.id, AgentMessageModel.message_data)
+            .where(
+                AgentMessageModel.session_id == self.session_id,
+                AgentMessageModel.archived.is_(False),
             )
+            .order_by(AgentMessageModel.id.desc())
         )
+        if self.history_limit is not None:
+            stmt = stmt.limit(self.history_limit)
 
-        await db.commit()
+        rows = (await self.db.execute(stmt)).all()
+        return [(row.id, row.message_data) for row in reversed(rows)]
 
-    async def get_items(self, limit: int | None = None) -> list[TResponseInputItem]:
-        """Retrieve the conversation history for this session.
+    async def archive_through(self, summary: str, position: Any, summary_version: int) -> bool:
+        """Store a new summary and archive the messages up to position, inclusive.
 
         Args:
-            limit: Maximum number of items to retrieve. If None, retrieves all items.
-                   When specified, returns the latest N items in chronological order.
+            summary: Summary of the archived messages and of the previous summary
+            position: Position of the newest message the summary covers
+            summary_version: Version of the summary the new one was built from,
+                             0 if the session had none
 
         Returns:
-            List of input items representing the conversation history
+            False if the summary changed in the meantime, in which case nothing
+            is written
         """
-        if limit is None:
-            result = await self.db.execute(text(f"""
-                SELECT message_data FROM {self.messages_table}
-                WHERE session_id = :session_id
-                ORDER BY created_at DESC
-            """), {"session_id": self.session_id})
-        else:
-            result = await self.db.execute(text(f"""
-                SELECT message_data FROM {self.messages_table}
-                WHERE session_id = :session_id
-                ORDER BY created_at DESC
-                LIMIT :limit
-            """), {"session_id": self.session_id, "limit": limit})
-
-        rows = result.scalars().all()
-
-        items = []
-        for (mesage_data,) in rows:
-            try:
-                item = json.loads(mesage_data)
-                items.append(item)
-            except json.JSONDecodeError:
-                # Skip invalid JSON entries
-                continue
+        # Matching on the version keeps two compactions of the session from
+        # overwriting each other
+        updated = await self.db.execute(
+            update(AgentSessionModel)
+            .where(
+                AgentSessionModel.session_id == self.session_id,
+                AgentSessionModel.summary_version == summary_version,
+            )
+            .values(summary=summary, summary_version=summary_version + 1)
+        )
+        if not updated.rowcount:
+            await self.db.rollback()
+            return False
 
-        return items
+        await self.db.execute(
+            update(AgentMessageModel)
+            .where(
+                AgentMessageModel.session_id == self.session_id,
+                AgentMessageModel.archived.is_(False),
+                AgentMessageModel.id <= position,
+            )
+            .values(archived=True)
+        )
+        await self.db.commit()
+        return True
 
-    async def add_items(self, items: list[TResponseInputItem]) -> None:
-        """Add new items to the conversation history.
+    async def acquire_lease(self, owner: str, ttl: float) -> bool:
+        """Take or extend the lease on the conversation that serializes its turns.
 
         Args:
-            items: List of input items to add to the history
+            owner: Token identifying the holder
+            ttl: Seconds until the lease expires unless it is extended
+
+        Returns:
+            True if owner holds the lease now, False if someone else does
         """
-        if not items:
+        stmt = pg_insert(AgentSessionModel).values(
+            session_id=self.session_id,
+            lease_owner=owner,
+            lease_expires_at=func.now() + timedelta(seconds=ttl),
+        )
+        # The conflict update only happens, and returns the row, when the lease
+        # is free, expired or already owner's
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[AgentSessionModel.session_id],
+            set_={
+                "lease_owner": stmt.excluded.lease_owner,
+                "lease_expires_at": stmt.excluded.lease_expires_at,
+            },
+            where=or_(
+                AgentSessionModel.lease_expires_at.is_(None),
+                AgentSessionModel.lease_expires_at <= func.now(),
+                AgentSessionModel.lease_owner == owner,
+            ),
+        ).returning(AgentSessionModel.session_id)
+        acquired = (await self.db.execute(stmt)).scalar_one_or_none() is not None
+        await self.db.commit()
+        return acquired
+
+    async def release_lease(self, owner: str) -> None:
+        """Give up the lease, if owner still holds it."""
+        await self.db.execute(
+            update(AgentSessionModel)
+            .where(
+                AgentSessionModel.session_id == self.session_id,
+                AgentSessionModel.lease_owner == owner,
+            )
+            .values(lease_owner=None, lease_expires_at=None)
+        )
+        await self.db.commit()
+
+    async def enqueue_message(self, entry_id: str, message: str) -> None:
+        """Queue a user message for the next turn of the conversation."""
+        await self._upsert_session()
+        await self.db.execute(
+            insert(AgentInboxModel).values(
+                id=UUID(entry_id), session_id=self.session_id, message=message
+            )
+        )
+        await self.db.commit()
+
+    async def take_queued_messages(self) -> list[tuple[str, str]]:
+        """Mark the queued messages as taken by the lease holder and return them.
+
+        Returns:
+            (entry id, message) pairs, oldest first
+        """
+        rows = (
+            await self.db.execute(
+                update(AgentInboxModel)
+                .where(
+                    AgentInboxModel.session_id == self.session_id,
+                    AgentInboxModel.taken.is_(False),
+                )
+                .values(taken=True)
+                .returning(AgentInboxModel.id, AgentInboxModel.message, AgentInboxModel.created_at)
+            )
+        ).all()
+        await self.db.commit()
+        rows = sorted(rows, key=lambda row: (row.created_at, str(row.id)))
+        return [(str(row.id), row.message) for row in rows]
+
+    async def withdraw_message(self, entry_id: str) -> bool:
+        """Remove a queued message that no turn has taken yet.
+
+        Returns:
+            False if a turn already took the message
+        """
+        result = await self.db.execute(
+            delete(AgentInboxModel).where(
+                AgentInboxModel.id == UUID(entry_id), AgentInboxModel.taken.is_(False)
+            )
+        )
+        await self.db.commit()
+        return result.rowcount == 1
+
+    async def requeue_messages(self, entry_ids: list[str]) -> None:
+        """Put taken messages back in the queue, e.g. after their turn failed."""
+        if not entry_ids:
             return
-        
-        await self.db.execute(text(
-            f"INSERT OR IGNORE INTO {self.sessions_table} (session_id) VALUES (:session_id)"
-        ), {"session_id": self.session_id})
-
-        message_data = [{"session_id": self.session_id, "message_data": item} for item in items]
-        await self.db.execute(text(f"""
-            INSERT INTO {self.messages_table} (session_id, message_data) VALUES (:session_id, :message_data)
-        """), message_data)
-
-        await self.db.execute(text(f"""
-            UPDATE {self.sessions_table}
-            SET updated_at = CURRENT_TIMESTAMP
-            WHERE session_id = :session_id
-        """), {"session_id": self.session_id})
+        await self.db.execute(
+            update(AgentInboxModel)
+            .where(AgentInboxModel.id.in_([UUID(entry_id) for entry_id in entry_ids]))
+            .values(taken=False)
+        )
+        await self.db.commit()
+
+    async def delete_message(self, entry_id: str) -> None:
+        """Remove a message from the inbox once its request has its reply."""
+        await self.db.execute(delete(AgentInboxModel).where(AgentInboxModel.id == UUID(entry_id)))
+        await self.db.commit()
 
+    async def store_reply(self, entry_ids: list[str], reply: dict[str, Any]) -> None:
+        """Store the reply of the turn that took the given messages."""
+        await self.db.execute(
+            update(AgentInboxModel)
+            .where(AgentInboxModel.id.in_([UUID(entry_id) for entry_id in entry_ids]))
+            .values(reply=reply)
+        )
+        await self.db.commit()
+
+    async def take_reply(self, entry_id: str) -> dict[str, Any] | None:
+        """Return and remove the reply to a queued message, or None if there is none yet."""
+        reply = (
+            await self.db.execute(
+                delete(AgentInboxModel)
+                .where(AgentInboxModel.id == UUID(entry_id), AgentInboxModel.reply.is_not(None))
+                .returning(AgentInboxModel.reply)
+            )
+        ).scalar_one_or_none()
         await self.db.commit()
+        return reply
 
     async def pop_item(self) -> TResponseInputItem | None:
         """Remove and return the most recent item from the session.
@@ -133,4 +315,30 @@ class SQLAlchemySession(Session):
         Returns:
             The most recent item if it exists, None if the session is empty
         """
-        
\ No newline at end of file
+        latest_id = (
+            select(AgentMessageModel.id)
+            .where(
+                AgentMessageModel.session_id == self.session_id,
+                AgentMessageModel.archived.is_(False),
+            )
+            .order_by(AgentMessageModel.id.desc())
+            .limit(1)
+            .scalar_subquery()
+        )
+        item = (
+            await self.db.execute(
+                delete(AgentMessageModel)
+                .where(AgentMessageModel.id == latest_id)
+                .returning(AgentMessageModel.message_data)
+            )
+        ).scalar_one_or_none()
+        await self.db.commit()
+        return item
+
+    async def clear_session(self) -> None:
+        """Clear all items for this session."""
+        # Messages are removed by ON DELETE CASCADE
+        await self.db.execute(
+            delete(AgentSessionModel).where(AgentSessionModel.session_id == self.session_id)
+        )
+        await self.db.commit()